@@ -8,6 +8,7 @@ from alembic import context
 
 # --- IMPORT Base metadata dari proyek Pyramid ---
 # Pastikan path ini benar sesuai struktur project kamu
+from pyramid_mahasiswa.models.mahasiswa import alembic_include_object
 from pyramid_mahasiswa.models.meta import Base
 
 # -------------------------------------------------------------------------
@@ -33,6 +34,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=alembic_include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,6 +58,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=alembic_include_object,
             compare_type=True,   # penting jika kamu ubah tipe kolom
             compare_server_default=True,
         )
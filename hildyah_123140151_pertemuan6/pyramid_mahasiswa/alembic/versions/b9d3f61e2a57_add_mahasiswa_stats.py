@@ -0,0 +1,117 @@
+"""add mahasiswa stats summary table
+
+Revision ID: b9d3f61e2a57
+Revises: e5b7a2c48f10
+Create Date: 2026-10-18 12:41:09.662310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d3f61e2a57'
+down_revision: Union[str, Sequence[str], None] = 'e5b7a2c48f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_OLD_YEAR = "COALESCE(CAST(substr(old.tanggal_lahir, 1, 4) AS INTEGER), 0)"
+SQLITE_NEW_YEAR = "COALESCE(CAST(substr(new.tanggal_lahir, 1, 4) AS INTEGER), 0)"
+
+SQLITE_STATS_DECREMENT = (
+    "UPDATE mahasiswa_stats SET jumlah = jumlah - 1 "
+    "WHERE jurusan = old.jurusan AND tahun_lahir = {old}; "
+    "DELETE FROM mahasiswa_stats WHERE jurusan = old.jurusan "
+    "AND tahun_lahir = {old} AND jumlah <= 0; "
+).format(old=SQLITE_OLD_YEAR)
+SQLITE_STATS_INCREMENT = (
+    "INSERT INTO mahasiswa_stats (jurusan, tahun_lahir, jumlah) "
+    "VALUES (new.jurusan, {new}, 1) "
+    "ON CONFLICT (jurusan, tahun_lahir) DO UPDATE SET jumlah = jumlah + 1; "
+).format(new=SQLITE_NEW_YEAR)
+
+SQLITE_STATS_DDL = [
+    "CREATE TRIGGER mahasiswa_stats_ai AFTER INSERT ON mahasiswa BEGIN "
+    + SQLITE_STATS_INCREMENT + "END",
+    "CREATE TRIGGER mahasiswa_stats_ad AFTER DELETE ON mahasiswa BEGIN "
+    + SQLITE_STATS_DECREMENT + "END",
+    "CREATE TRIGGER mahasiswa_stats_au AFTER UPDATE OF jurusan, tanggal_lahir "
+    "ON mahasiswa WHEN old.jurusan IS NOT new.jurusan "
+    "OR {old} IS NOT {new} BEGIN ".format(old=SQLITE_OLD_YEAR, new=SQLITE_NEW_YEAR)
+    + SQLITE_STATS_DECREMENT + SQLITE_STATS_INCREMENT + "END",
+]
+
+POSTGRESQL_STATS_DDL = [
+    """CREATE OR REPLACE FUNCTION mahasiswa_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE mahasiswa_stats SET jumlah = jumlah - 1
+        WHERE jurusan = OLD.jurusan
+          AND tahun_lahir = COALESCE(EXTRACT(YEAR FROM OLD.tanggal_lahir)::int, 0);
+        DELETE FROM mahasiswa_stats
+        WHERE jurusan = OLD.jurusan
+          AND tahun_lahir = COALESCE(EXTRACT(YEAR FROM OLD.tanggal_lahir)::int, 0)
+          AND jumlah <= 0;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        INSERT INTO mahasiswa_stats (jurusan, tahun_lahir, jumlah)
+        VALUES (NEW.jurusan, COALESCE(EXTRACT(YEAR FROM NEW.tanggal_lahir)::int, 0), 1)
+        ON CONFLICT (jurusan, tahun_lahir)
+        DO UPDATE SET jumlah = mahasiswa_stats.jumlah + 1;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    "CREATE TRIGGER mahasiswa_stats_aid AFTER INSERT OR DELETE ON mahasiswa "
+    "FOR EACH ROW EXECUTE FUNCTION mahasiswa_stats_trigger()",
+    "CREATE TRIGGER mahasiswa_stats_au AFTER UPDATE OF jurusan, tanggal_lahir "
+    "ON mahasiswa FOR EACH ROW WHEN (OLD.jurusan IS DISTINCT FROM NEW.jurusan "
+    "OR OLD.tanggal_lahir IS DISTINCT FROM NEW.tanggal_lahir) "
+    "EXECUTE FUNCTION mahasiswa_stats_trigger()",
+]
+
+
+BACKFILL = (
+    "INSERT INTO mahasiswa_stats (jurusan, tahun_lahir, jumlah) "
+    "SELECT jurusan, {year} AS tahun_lahir, count(*) FROM mahasiswa "
+    "GROUP BY jurusan, tahun_lahir"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mahasiswa_stats',
+    sa.Column('jurusan', sa.Text(), nullable=False),
+    sa.Column('tahun_lahir', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('jumlah', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('jurusan', 'tahun_lahir', name=op.f('pk_mahasiswa_stats'))
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(BACKFILL.format(
+            year="COALESCE(EXTRACT(YEAR FROM tanggal_lahir)::int, 0)"))
+        for statement in POSTGRESQL_STATS_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        op.execute(BACKFILL.format(
+            year="COALESCE(CAST(substr(tanggal_lahir, 1, 4) AS INTEGER), 0)"))
+        for statement in SQLITE_STATS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP TRIGGER mahasiswa_stats_aid ON mahasiswa")
+        op.execute("DROP TRIGGER mahasiswa_stats_au ON mahasiswa")
+        op.execute("DROP FUNCTION mahasiswa_stats_trigger()")
+    elif dialect == 'sqlite':
+        for trigger in ('mahasiswa_stats_ai', 'mahasiswa_stats_ad', 'mahasiswa_stats_au'):
+            op.execute("DROP TRIGGER %s" % trigger)
+
+    op.drop_table('mahasiswa_stats')
@@ -0,0 +1,38 @@
+"""add mahasiswa version and table_version counter
+
+Revision ID: c3e1f0a9d2b4
+Revises: a7ce85224bb1
+Create Date: 2026-10-18 09:12:05.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f0a9d2b4'
+down_revision: Union[str, Sequence[str], None] = 'a7ce85224bb1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mahasiswa',
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False)
+    )
+    table_version = op.create_table('table_version',
+    sa.Column('name', sa.Text(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', name=op.f('pk_table_version'))
+    )
+    op.bulk_insert(table_version, [{'name': 'mahasiswa', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_version')
+    with op.batch_alter_table('mahasiswa') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,86 @@
+"""add mahasiswa changes log
+
+Revision ID: d4a8c27e6f13
+Revises: b9d3f61e2a57
+Create Date: 2026-10-18 06:56:50.866815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c27e6f13'
+down_revision: Union[str, Sequence[str], None] = 'b9d3f61e2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_CHANGES_DDL = [
+    "CREATE TRIGGER mahasiswa_changes_ai AFTER INSERT ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (new.id, new.nim, 'insert', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER mahasiswa_changes_au AFTER UPDATE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (new.id, new.nim, 'update', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER mahasiswa_changes_ad AFTER DELETE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (old.id, old.nim, 'delete', CURRENT_TIMESTAMP); END",
+]
+
+POSTGRESQL_CHANGES_DDL = [
+    """CREATE OR REPLACE FUNCTION mahasiswa_changes_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at, txid)
+        VALUES (OLD.id, OLD.nim, 'delete', now() AT TIME ZONE 'utc', txid_current());
+    ELSE
+        INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at, txid)
+        VALUES (NEW.id, NEW.nim, lower(TG_OP), now() AT TIME ZONE 'utc',
+                txid_current());
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    "CREATE TRIGGER mahasiswa_changes_aiud AFTER INSERT OR UPDATE OR DELETE "
+    "ON mahasiswa FOR EACH ROW EXECUTE FUNCTION mahasiswa_changes_trigger()",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # log dimulai kosong: consumer melakukan sync penuh sekali, lalu
+    # melanjutkan dengan since=<seq>
+    op.create_table('mahasiswa_changes',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('mahasiswa_id', sa.Integer(), nullable=False),
+    sa.Column('nim', sa.Text(), nullable=False),
+    sa.Column('op', sa.Text(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('txid', sa.BigInteger(), nullable=True),
+    sa.PrimaryKeyConstraint('seq', name=op.f('pk_mahasiswa_changes')),
+    sqlite_autoincrement=True
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRESQL_CHANGES_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_CHANGES_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP TRIGGER mahasiswa_changes_aiud ON mahasiswa")
+        op.execute("DROP FUNCTION mahasiswa_changes_trigger()")
+    elif dialect == 'sqlite':
+        for trigger in ('mahasiswa_changes_ai', 'mahasiswa_changes_au', 'mahasiswa_changes_ad'):
+            op.execute("DROP TRIGGER %s" % trigger)
+
+    op.drop_table('mahasiswa_changes')
@@ -0,0 +1,63 @@
+"""add mahasiswa search indexes
+
+Revision ID: e5b7a2c48f10
+Revises: c3e1f0a9d2b4
+Create Date: 2026-10-18 10:02:41.530977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7a2c48f10'
+down_revision: Union[str, Sequence[str], None] = 'c3e1f0a9d2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE mahasiswa_fts USING fts5("
+    "nama, content='mahasiswa', content_rowid='id')",
+    "CREATE TRIGGER mahasiswa_fts_ai AFTER INSERT ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(rowid, nama) VALUES (new.id, new.nama); END",
+    "CREATE TRIGGER mahasiswa_fts_ad AFTER DELETE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(mahasiswa_fts, rowid, nama) "
+    "VALUES ('delete', old.id, old.nama); END",
+    "CREATE TRIGGER mahasiswa_fts_au AFTER UPDATE OF nama ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(mahasiswa_fts, rowid, nama) "
+    "VALUES ('delete', old.id, old.nama); "
+    "INSERT INTO mahasiswa_fts(rowid, nama) VALUES (new.id, new.nama); END",
+    # isi index dari data yang sudah ada
+    "INSERT INTO mahasiswa_fts(mahasiswa_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_mahasiswa_jurusan'), 'mahasiswa', ['jurusan'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_mahasiswa_nama_trgm ON mahasiswa "
+            "USING gin (lower(nama) gin_trgm_ops)"
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX ix_mahasiswa_nama_trgm")
+    elif dialect == 'sqlite':
+        for trigger in ('mahasiswa_fts_ai', 'mahasiswa_fts_ad', 'mahasiswa_fts_au'):
+            op.execute("DROP TRIGGER %s" % trigger)
+        op.execute("DROP TABLE mahasiswa_fts")
+
+    op.drop_index(op.f('ix_mahasiswa_jurusan'), table_name='mahasiswa')
@@ -0,0 +1,276 @@
+"""Benchmark REST API mahasiswa yang bisa diulang antar commit.
+
+Seed database SQLite (file atau in-memory) dengan N mahasiswa, lalu
+jalankan operasi list, detail, add, delete dan search lewat ``webtest``
+(in-process) dan/atau lewat socket waitress sungguhan. Hasil (throughput
+dan latency p50/p90/p99 per operasi) ditulis ke JSON bersama commit git
+supaya regresi bisa dibandingkan::
+
+    python benchmarks/bench_api.py --sizes 10000 100000 1000000 \\
+        --db file memory --transport webtest waitress \\
+        --output bench-$(git rev-parse --short HEAD).json
+
+    python benchmarks/bench_api.py --sizes 10000 --compare bench-abc123.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from pyramid_mahasiswa import main as make_app  # noqa: E402
+from pyramid_mahasiswa.models.meta import Base  # noqa: E402
+from pyramid_mahasiswa.scripts.initialize_db import insert_missing  # noqa: E402
+
+OPERATIONS = ('list', 'detail', 'search', 'add', 'delete')
+JURUSAN = ('Teknik Informatika', 'Sistem Informasi', 'Sains Data', 'Teknik Elektro')
+NAMA = ('Budi', 'Siti', 'Agus', 'Dewi', 'Rina', 'Andi', 'Putri', 'Joko')
+SEED_CHUNK = 10000
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1,
+                int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def build_app(db, tmpdir, extra_settings=None):
+    if db == 'file':
+        url = 'sqlite:///' + os.path.join(tmpdir, 'bench.sqlite')
+        settings = {'sqlalchemy.url': url}
+    else:
+        # satu koneksi in-memory dibagi semua thread waitress
+        settings = {'sqlalchemy.url': 'sqlite://',
+                    'sqlalchemy.poolclass': 'StaticPool'}
+    settings.update({
+        'mahasiswa.cache.backend': 'none',
+        'sql_profiler.enabled': 'false',
+    })
+    settings.update(extra_settings or {})
+    app = make_app({}, **settings)
+    engine = app.registry['dbsession_factory'].kw['bind']
+    Base.metadata.create_all(engine)
+    return app, engine
+
+
+def seed(engine, size):
+    session = Session(engine)
+    rng = random.Random(42)
+    start = time.perf_counter()
+    for offset in range(0, size, SEED_CHUNK):
+        rows = [{
+            'nim': '1%08d' % i,
+            'nama': '%s %s' % (rng.choice(NAMA), rng.choice(NAMA)),
+            'jurusan': rng.choice(JURUSAN),
+            'tanggal_lahir': None,
+            'alamat': None,
+        } for i in range(offset, min(size, offset + SEED_CHUNK))]
+        insert_missing(session, rows)
+        session.commit()
+    session.close()
+    return time.perf_counter() - start
+
+
+class WebtestClient(object):
+
+    def __init__(self, app):
+        from webtest import TestApp
+        self.app = TestApp(app)
+
+    def request(self, method, path, body=None):
+        if method == 'POST':
+            self.app.post_json(path, body)
+        elif method == 'DELETE':
+            self.app.delete(path)
+        else:
+            self.app.get(path)
+
+    def close(self):
+        pass
+
+
+class WaitressClient(object):
+    """Server waitress di thread terpisah + http.client keep-alive."""
+
+    def __init__(self, app):
+        from waitress.server import create_server
+        self.server = create_server(app, host='127.0.0.1', port=0, threads=4)
+        self.port = self.server.effective_port
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection('127.0.0.1', self.port)
+
+    def request(self, method, path, body=None):
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        response.read()
+        if response.status >= 400:
+            raise RuntimeError('%s %s -> %d' % (method, path, response.status))
+
+    def close(self):
+        self.conn.close()
+        self.server.close()
+
+
+def request_plan(op, size, count, rng, added):
+    """Daftar (method, path, body) untuk satu operasi."""
+    if op == 'list':
+        return [('GET', '/api/mahasiswa?limit=50&after=%d' % rng.randint(0, size - 50), None)
+                for _ in range(count)]
+    if op == 'detail':
+        return [('GET', '/api/mahasiswa/%d' % rng.randint(1, size), None)
+                for _ in range(count)]
+    if op == 'search':
+        return [('GET', '/api/mahasiswa/search?q=%s&jurusan=%s&limit=20' % (
+            rng.choice(NAMA)[:3].lower(), rng.choice(JURUSAN).replace(' ', '+')), None)
+            for _ in range(count)]
+    if op == 'add':
+        plan = []
+        for i in range(count):
+            nim = '9%08d' % (len(added) + i)
+            plan.append(('POST', '/api/mahasiswa',
+                         {'nim': nim, 'nama': 'Bench %d' % i, 'jurusan': JURUSAN[0]}))
+        added.extend(range(size + 1 + len(added), size + 1 + len(added) + count))
+        return plan
+    if op == 'delete':
+        ids, added[:] = added[:count], added[count:]
+        return [('DELETE', '/api/mahasiswa/%d' % i, None) for i in ids]
+    raise ValueError(op)
+
+
+def run_operation(client, plan):
+    latencies = []
+    start = time.perf_counter()
+    for method, path, body in plan:
+        t0 = time.perf_counter()
+        client.request(method, path, body)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_case(size, db, transport, count, operations):
+    tmpdir = tempfile.mkdtemp(prefix='bench-mahasiswa-')
+    app, engine = build_app(db, tmpdir)
+    seed_seconds = seed(engine, size)
+    client = (WebtestClient if transport == 'webtest' else WaitressClient)(app)
+    rng = random.Random(size)
+    added = []
+    results = {}
+    try:
+        for op in operations:
+            plan = request_plan(op, size, count, rng, added)
+            # pemanasan singkat supaya cache statement / halaman SQLite terisi
+            if op in ('list', 'detail', 'search'):
+                run_operation(client, plan[:min(20, len(plan))])
+            results[op] = run_operation(client, plan)
+    finally:
+        client.close()
+        engine.dispose()
+    return {
+        'size': size,
+        'db': db,
+        'transport': transport,
+        'seed_seconds': round(seed_seconds, 3),
+        'operations': results,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    """Cetak perubahan p50 dan throughput relatif terhadap hasil sebelumnya."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    index = {(c['size'], c['db'], c['transport']): c for c in baseline['cases']}
+    for case in current['cases']:
+        old = index.get((case['size'], case['db'], case['transport']))
+        if old is None:
+            continue
+        for op, stats in case['operations'].items():
+            prev = old['operations'].get(op)
+            if not prev:
+                continue
+            print('%-8s %-6s %-8s %-7s p50 %8.3f -> %8.3f ms (%+.1f%%)  rps %+.1f%%' % (
+                case['size'], case['db'], case['transport'], op,
+                prev['p50_ms'], stats['p50_ms'],
+                (stats['p50_ms'] / prev['p50_ms'] - 1) * 100,
+                (stats['requests_per_s'] / prev['requests_per_s'] - 1) * 100))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--db', nargs='+', choices=('file', 'memory'),
+                        default=['file', 'memory'])
+    parser.add_argument('--transport', nargs='+', choices=('webtest', 'waitress'),
+                        default=['webtest', 'waitress'])
+    parser.add_argument('--requests', type=int, default=500,
+                        help='request per operasi (default: %(default)s)')
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS,
+                        default=list(OPERATIONS))
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    parser.add_argument('--compare', help='file JSON hasil sebelumnya')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    result = {
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'requests_per_operation': args.requests,
+        'cases': [],
+    }
+    for size in args.sizes:
+        for db in args.db:
+            for transport in args.transport:
+                case = run_case(size, db, transport, args.requests, args.operations)
+                result['cases'].append(case)
+                print(json.dumps(case), file=sys.stderr)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == '__main__':
+    main()
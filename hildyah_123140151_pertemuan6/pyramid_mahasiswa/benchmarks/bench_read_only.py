@@ -0,0 +1,74 @@
+"""Ukur overhead per request GET dengan dan tanpa mode request read-only.
+
+Dengan ``mahasiswa.read_only_requests = true`` request GET tidak melewati
+transaksi pyramid_tm / retry dan memakai session biasa; tanpa itu setiap
+GET membuat transaksi zope dan data manager zope.sqlalchemy. Benchmark ini
+menjalankan GET detail dan list lewat ``webtest`` untuk kedua mode dan
+mencetak rata-rata waktu per request serta selisihnya::
+
+    python benchmarks/bench_read_only.py --size 10000 --requests 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_api import build_app, seed  # noqa: E402
+
+
+def measure(app, paths, rounds):
+    from webtest import TestApp
+    client = TestApp(app)
+    for path in paths[:200]:
+        client.get(path)
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in paths:
+            client.get(path)
+        elapsed = (time.perf_counter() - start) / len(paths)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='ulangi dan ambil yang tercepat (default: %(default)s)')
+    parser.add_argument('--db', choices=('file', 'memory'), default='memory')
+    args = parser.parse_args(argv[1:])
+
+    rng = random.Random(42)
+    workloads = {
+        'detail': ['/api/mahasiswa/%d' % rng.randint(1, args.size)
+                   for _ in range(args.requests)],
+        'list': ['/api/mahasiswa?limit=20&after=%d' % rng.randint(0, args.size - 20)
+                 for _ in range(args.requests)],
+    }
+    result = {}
+    for mode in ('false', 'true'):
+        app, engine = build_app(args.db, tempfile.mkdtemp(prefix='bench-ro-'),
+                                {'mahasiswa.read_only_requests': mode})
+        seed(engine, args.size)
+        for name, paths in workloads.items():
+            result.setdefault(name, {})['read_only_' + mode] = round(
+                measure(app, paths, args.rounds) * 1e6, 1)
+        engine.dispose()
+
+    for name, us in result.items():
+        us['saved_us'] = round(us['read_only_false'] - us['read_only_true'], 1)
+        us['saved_pct'] = round(us['saved_us'] / us['read_only_false'] * 100, 1)
+    print(json.dumps({'unit': 'us/request', 'size': args.size,
+                      'requests': args.requests, 'db': args.db,
+                      'results': result}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Ukur waktu start-up aplikasi Pyramid dan gagal jika melewati budget.
+
+Setiap putaran menjalankan interpreter baru (cold start seperti worker
+yang baru di-spawn autoscaler), mengimpor paket aplikasi lalu memanggil
+``main()``. Median ``import + main()`` dibandingkan dengan ``--budget-ms``;
+exit code 1 jika lebih lambat, jadi bisa dipakai di CI::
+
+    python benchmarks/bench_startup.py --runs 10 --budget-ms 1500
+    python benchmarks/bench_startup.py --app pyramid_matakuliah \\
+        --path ../pyramid_matakuliah/pyramid_matakuliah
+
+Selain waktu, benchmark juga gagal jika jinja2 ikut diimpor saat start-up
+(renderer template seharusnya lazy).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+t0 = time.perf_counter()
+import importlib
+app_module = importlib.import_module(sys.argv[1])
+t1 = time.perf_counter()
+app_module.main({}, **json.loads(sys.argv[2]))
+t2 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'main_ms': (t2 - t1) * 1000,
+    'jinja2_loaded': 'jinja2' in sys.modules,
+}))
+'''
+
+
+def parse_settings(items):
+    settings = {'sqlalchemy.url': 'sqlite://'}
+    for item in items:
+        key, _, value = item.partition('=')
+        settings[key] = value
+    return settings
+
+
+def boot_once(app, settings, path):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (path, env.get('PYTHONPATH')) if p)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, app, json.dumps(settings)],
+        env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1000
+    result['boot_ms'] = result['import_ms'] + result['main_ms']
+    return result
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='pyramid_mahasiswa',
+                        help='paket dengan main() (default: %(default)s)')
+    parser.add_argument('--path', default=ROOT,
+                        help='direktori yang ditambahkan ke PYTHONPATH')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500,
+                        help='batas median import + main() (default: %(default)s)')
+    parser.add_argument('--setting', action='append', default=[],
+                        metavar='KEY=VALUE', help='setting tambahan untuk main()')
+    args = parser.parse_args(argv[1:])
+
+    settings = parse_settings(args.setting)
+    runs = [boot_once(args.app, settings, args.path) for _ in range(args.runs)]
+    summary = {
+        key: round(statistics.median(r[key] for r in runs), 1)
+        for key in ('import_ms', 'main_ms', 'boot_ms', 'process_ms')
+    }
+    failures = []
+    if summary['boot_ms'] > args.budget_ms:
+        failures.append('median boot %.1f ms melewati budget %.1f ms'
+                        % (summary['boot_ms'], args.budget_ms))
+    if any(r['jinja2_loaded'] for r in runs):
+        failures.append('jinja2 diimpor saat start-up')
+    print(json.dumps({
+        'app': args.app,
+        'runs': args.runs,
+        'budget_ms': args.budget_ms,
+        'median': summary,
+        'ok': not failures,
+        'failures': failures,
+    }, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
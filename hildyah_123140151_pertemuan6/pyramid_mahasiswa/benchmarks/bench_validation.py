@@ -0,0 +1,107 @@
+"""Ukur throughput decode + validasi payload bulk mahasiswa.
+
+Membuat body JSON array berisi ``--size`` mahasiswa (``--invalid`` persen
+di antaranya tidak valid) lalu mengukur, per item:
+
+- ``decode``: hanya ``serializers.loads`` (orjson bila terpasang);
+- ``decode_validate``: decode + validator ter-compile yang di-cache;
+- ``decode_validate_uncached``: decode + compile ulang validator untuk
+  setiap item, pembanding untuk biaya yang dihemat cache::
+
+    python benchmarks/bench_validation.py --size 100000 --invalid 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyramid_mahasiswa import serializers  # noqa: E402
+from pyramid_mahasiswa.schemas import (  # noqa: E402
+    MAHASISWA_SCHEMA,
+    ValidationError,
+    compile_validator,
+)
+
+
+def make_payload(size, invalid_pct, rng):
+    items = []
+    for i in range(size):
+        item = {
+            'nim': '12%07d' % i,
+            'nama': 'Mahasiswa %d' % i,
+            'jurusan': rng.choice(['Teknik Informatika', 'Sistem Informasi']),
+            'tanggal_lahir': '20%02d-%02d-%02d' % (
+                rng.randint(0, 6), rng.randint(1, 12), rng.randint(1, 28)),
+            'alamat': 'Jl. Contoh No. %d' % i,
+        }
+        if rng.random() * 100 < invalid_pct:
+            item[rng.choice(['tanggal_lahir', 'nama', 'umur'])] = (
+                '31-12-2003' if rng.random() < 0.5 else '')
+        items.append(item)
+    return json.dumps(items).encode('utf-8')
+
+
+def run(body, get_validator):
+    items = serializers.loads(body)
+    valid = 0
+    if get_validator is None:
+        return len(items), valid
+    for item in items:
+        try:
+            get_validator()(item)
+            valid += 1
+        except ValidationError:
+            pass
+    return len(items), valid
+
+
+def measure(body, get_validator, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count, valid = run(body, get_validator)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count, valid
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--invalid', type=float, default=5,
+                        help='persen item tidak valid (default: %(default)s)')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='ulangi dan ambil yang tercepat (default: %(default)s)')
+    args = parser.parse_args(argv[1:])
+
+    body = make_payload(args.size, args.invalid, random.Random(42))
+    cached = compile_validator(MAHASISWA_SCHEMA)
+    modes = {
+        'decode': None,
+        'decode_validate': lambda: cached,
+        'decode_validate_uncached':
+            lambda: compile_validator.__wrapped__(MAHASISWA_SCHEMA),
+    }
+    results = {}
+    for name, get_validator in modes.items():
+        per_item, valid = measure(body, get_validator, args.rounds)
+        results[name] = {
+            'us_per_item': round(per_item * 1e6, 3),
+            'items_per_sec': int(1 / per_item),
+        }
+        if get_validator is not None:
+            results[name]['valid'] = valid
+    print(json.dumps({
+        'size': args.size,
+        'body_bytes': len(body),
+        'json': 'orjson' if serializers.orjson is not None else 'json',
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
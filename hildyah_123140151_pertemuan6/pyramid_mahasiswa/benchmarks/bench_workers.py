@@ -0,0 +1,143 @@
+"""Ukur skala throughput endpoint list mahasiswa terhadap jumlah worker prefork.
+
+Seed database SQLite file dengan ``--size`` mahasiswa, lalu untuk setiap
+jumlah worker di ``--workers`` jalankan ``pyramid_mahasiswa.prefork`` dan
+beri beban ``GET /api/mahasiswa?limit=20`` dari ``--clients`` proses
+``loadtest.py`` sekaligus. Hasil: requests/s, p50/p99 dan efisiensi
+dibanding satu worker (1.0 = linear)::
+
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --duration 10
+
+Client dan server berbagi core bila dijalankan di mesin yang sama; untuk
+angka yang bersih jalankan dengan ``--clients`` kecil di mesin dengan core
+lebih banyak dari worker terbesar.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+from bench_api import build_app, seed  # noqa: E402
+
+INI = """\
+[app:main]
+use = call:pyramid_mahasiswa:main
+sqlalchemy.url = {url}
+mahasiswa.cache.backend = none
+mahasiswa.singleflight.enabled = false
+sql_profiler.enabled = false
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server tidak merespons: %s' % url)
+
+
+def run_case(ini, workers, threads, clients, concurrency, duration, tmpdir):
+    port = free_port()
+    url = 'http://127.0.0.1:%d/api/mahasiswa?limit=20' % port
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'pyramid_mahasiswa.prefork', ini,
+         '--listen', '127.0.0.1:%d' % port, '--workers', str(workers),
+         '--threads', str(threads), '--warm', '/api/mahasiswa?limit=20'],
+        env=env, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(url)
+        outputs = [os.path.join(tmpdir, 'w%d-c%d.json' % (workers, i))
+                   for i in range(clients)]
+        procs = [subprocess.Popen(
+            [sys.executable, os.path.join(HERE, 'loadtest.py'), url,
+             '--concurrency', str(max(1, concurrency // clients)),
+             '--duration', str(duration), '--output', output],
+            stdout=subprocess.DEVNULL) for output in outputs]
+        for proc in procs:
+            proc.wait()
+        results = []
+        for output in outputs:
+            with open(output) as f:
+                results.append(json.load(f))
+    finally:
+        server.terminate()
+        server.wait(60)
+
+    errors = {}
+    for r in results:
+        for name, count in r['errors'].items():
+            errors[name] = errors.get(name, 0) + count
+    return {
+        'workers': workers,
+        'requests': sum(r['requests'] for r in results),
+        'requests_per_s': round(sum(r['requests_per_s'] for r in results), 1),
+        # per client; diambil yang terburuk
+        'p50_ms': max(r['p50_ms'] or 0 for r in results),
+        'p99_ms': max(r['p99_ms'] or 0 for r in results),
+        'errors': errors,
+    }
+
+
+def main(argv=sys.argv):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores}))
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=max(1, cores // 2),
+                        help='jumlah proses loadtest (default: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='total koneksi dari semua client')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    args = parser.parse_args(argv[1:])
+
+    tmpdir = tempfile.mkdtemp(prefix='bench-workers-')
+    app, engine = build_app('file', tmpdir)
+    seed(engine, args.size)
+    engine.dispose()
+    ini = os.path.join(tmpdir, 'bench.ini')
+    with open(ini, 'w') as f:
+        f.write(INI.format(url=engine.url.render_as_string(hide_password=False)))
+
+    cases = [run_case(ini, n, args.threads, args.clients, args.concurrency,
+                      args.duration, tmpdir) for n in args.workers]
+    base = next(c for c in cases if c['workers'] == min(args.workers))
+    for case in cases:
+        case['speedup'] = round(
+            case['requests_per_s'] / base['requests_per_s'], 2)
+        case['efficiency'] = round(
+            case['speedup'] / (case['workers'] / base['workers']), 2)
+
+    text = json.dumps({'cores': cores, 'size': args.size,
+                       'concurrency': args.concurrency,
+                       'clients': args.clients, 'results': cases}, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Load test HTTP sederhana (asyncio, tanpa dependency) untuk membandingkan
+deployment waitress (WSGI) dan uvicorn (ASGI).
+
+Contoh::
+
+    pserve production.ini
+    python benchmarks/loadtest.py http://127.0.0.1:6543/api/mahasiswa/1 \\
+        --concurrency 1000 --duration 30 --output waitress.json
+
+    PYRAMID_CONFIG=production.ini uvicorn --factory --port 6544 \\
+        pyramid_mahasiswa.asgi:create_app
+    python benchmarks/loadtest.py http://127.0.0.1:6544/api/mahasiswa/1 \\
+        --concurrency 1000 --duration 30 --output uvicorn.json
+
+Setiap client memakai satu koneksi keep-alive dan mengirim GET berulang
+sampai durasi habis. Hasil: jumlah request, error, requests/s, dan
+latency p50/p90/p99 (ms) dalam JSON.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def read_response(reader):
+    """Baca satu response HTTP/1.1 (Content-Length atau chunked)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('koneksi ditutup server')
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        value = value.strip()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value.lower():
+            chunked = True
+        elif name == 'connection' and value.lower() == 'close':
+            keep_alive = False
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(url, deadline, latencies, errors):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    request = ('GET %s HTTP/1.1\r\nHost: %s:%d\r\nConnection: keep-alive\r\n\r\n'
+               % (path, host, port)).encode('ascii')
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors['http_%d' % status] = errors.get('http_%d' % status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, concurrency, duration):
+    latencies = []
+    errors = {}
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(*[
+        client(url, deadline, latencies, errors) for _ in range(concurrency)
+    ])
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3) if v is not None else None  # noqa: E731
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 3),
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p90_ms': ms(percentile(latencies, 90)),
+        'p99_ms': ms(percentile(latencies, 99)),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    result = asyncio.run(run(args.url, args.concurrency, args.duration))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
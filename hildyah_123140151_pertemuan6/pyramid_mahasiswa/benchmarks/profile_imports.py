@@ -0,0 +1,83 @@
+"""Profil waktu impor start-up memakai ``python -X importtime``.
+
+Menjalankan ``import <app>; <app>.main(...)`` di interpreter baru dengan
+``-X importtime``, lalu meringkas outputnya: modul dengan waktu kumulatif
+terbesar dan total waktu impor (self) per paket top-level::
+
+    python benchmarks/profile_imports.py --top 25
+    python benchmarks/profile_imports.py --app pyramid_matakuliah \\
+        --path ../pyramid_matakuliah/pyramid_matakuliah --raw importtime.txt
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, importlib
+importlib.import_module(sys.argv[1]).main({}, **json.loads(sys.argv[2]))
+'''
+
+
+def run_importtime(app, settings, path):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (path, env.get('PYTHONPATH')) if p)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, app,
+         json.dumps(settings)],
+        env=env, check=True, capture_output=True, text=True)
+    return proc.stderr
+
+
+def parse_importtime(text):
+    """Baris ``import time: self | cumulative | nama`` -> (self_us, cum_us, nama)."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # baris header
+        rows.append((int(self_us), int(cum_us), name.strip()))
+    return rows
+
+
+def by_package(rows):
+    totals = {}
+    for self_us, _, name in rows:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='pyramid_mahasiswa')
+    parser.add_argument('--path', default=ROOT,
+                        help='direktori yang ditambahkan ke PYTHONPATH')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--raw', help='simpan output -X importtime ke file ini')
+    args = parser.parse_args(argv[1:])
+
+    text = run_importtime(args.app, {'sqlalchemy.url': 'sqlite://'}, args.path)
+    if args.raw:
+        with open(args.raw, 'w') as f:
+            f.write(text)
+    rows = parse_importtime(text)
+
+    total = sum(self_us for self_us, _, _ in rows)
+    print('total import time: %.1f ms (%d modules)' % (total / 1000, len(rows)))
+    print('\nslowest modules (cumulative):')
+    for self_us, cum_us, name in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print('  %8.1f ms  %8.1f ms self  %s' % (cum_us / 1000, self_us / 1000, name))
+    print('\nper package (self):')
+    for package, self_us in by_package(rows)[:args.top]:
+        print('  %8.1f ms  %s' % (self_us / 1000, package))
+
+
+if __name__ == '__main__':
+    main()
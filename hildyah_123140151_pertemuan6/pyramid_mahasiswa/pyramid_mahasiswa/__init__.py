@@ -1,20 +1,32 @@
 from pyramid.config import Configurator
+from pyramid.settings import aslist
 
 def main(global_config, **settings):
     """ This function returns a Pyramid WSGI application. """
     with Configurator(settings=settings) as config:
-        # Template engine
-        config.include('pyramid_jinja2')
+        # Template engine (jinja2 baru diimpor saat template pertama dirender)
+        config.include('.templating')
 
         # Tambahkan ini agar request.tm tersedia
         config.include('pyramid_tm')
         config.include('pyramid_retry')
+        config.include('.errors')
 
         # Load database + routes
         config.include('.models')
         config.include('.routes')
+        config.include('.cache')
+        config.include('.changes')
+        config.include('.sql_profiler')
+        config.include('.route_metrics')
+        config.include('.ratelimit')
+        config.include('.singleflight')
+        config.include('.schemas')
 
-        # Scan semua view
-        config.scan('pyramid_mahasiswa.views')
+        # View didaftarkan eksplisit; config.scan hanya untuk paket tambahan
+        # yang memakai @view_config (setting mahasiswa.scan)
+        config.include('.views')
+        for package in aslist(settings.get('mahasiswa.scan', '')):
+            config.scan(package)
 
     return config.make_wsgi_app()
@@ -3,6 +3,7 @@ from alembic import context
 from pyramid.paster import get_appsettings, setup_logging
 from sqlalchemy import engine_from_config
 
+from pyramid_mahasiswa.models.mahasiswa import alembic_include_object
 from pyramid_mahasiswa.models.meta import Base
 
 config = context.config
@@ -25,7 +26,8 @@ def run_migrations_offline():
     script output.
 
     """
-    context.configure(url=settings['sqlalchemy.url'])
+    context.configure(url=settings['sqlalchemy.url'],
+                      include_object=alembic_include_object)
     with context.begin_transaction():
         context.run_migrations()
 
@@ -42,7 +44,8 @@ def run_migrations_online():
     connection = engine.connect()
     context.configure(
         connection=connection,
-        target_metadata=target_metadata
+        target_metadata=target_metadata,
+        include_object=alembic_include_object,
     )
 
     try:
@@ -0,0 +1,296 @@
+"""Mode serving ASGI dengan engine asyncio SQLAlchemy.
+
+Jalankan dengan uvicorn (butuh extra ``asgi``)::
+
+    PYRAMID_CONFIG=production.ini uvicorn --factory pyramid_mahasiswa.asgi:create_app
+
+GET ``/api/mahasiswa`` (termasuk stream NDJSON) dan ``/api/mahasiswa/{id}``
+dijawab langsung secara async lewat ``AsyncSession``. Route lain diteruskan
+ke app WSGI Pyramid dari ``main()`` lewat ``asgiref.wsgi.WsgiToAsgi``,
+jadi API yang dilayani tetap sama dan ``main()`` untuk waitress tidak
+berubah.
+
+Jalur async tidak melewati tween Pyramid. Yang tetap diterapkan di sini:
+rate limit (``ratelimit.limiter``, bucket yang sama dengan tween) dan
+metrik per route (``route_metrics``, nama route sama dengan ``routes.py``).
+Yang dilewati: cache response (setiap request membaca database, 304 tetap
+dari ETag), single-flight, profiler SQL dan replica (selalu membaca dari
+``sqlalchemy.url``/``async_url``, jadi tidak ada lag replica). Set
+``mahasiswa.asgi.fast_path = false`` supaya semua request lewat app WSGI
+beserta seluruh tween-nya.
+
+URL async diturunkan dari ``sqlalchemy.url`` (sqlite -> sqlite+aiosqlite,
+postgresql -> postgresql+asyncpg) atau diisi sendiri lewat
+``sqlalchemy.async_url``.
+"""
+import os
+import re
+import time
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from pyramid.paster import get_appsettings, setup_logging
+from pyramid.settings import asbool
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from webob import Request
+from webob.etag import ETagMatcher
+
+from . import main as wsgi_main
+from . import models
+from . import serializers
+from .ratelimit import limiter
+from .views.mahasiswa import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    STREAM_CHUNK_SIZE,
+    _parse_id,
+    detail_data,
+    detail_etag,
+    detail_statement,
+    list_statement,
+    make_etag,
+    page_payload,
+)
+
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+DETAIL_PATH = re.compile(r'^/api/mahasiswa/(\d+)$')
+
+
+def get_async_engine(settings, prefix='sqlalchemy.'):
+    url = settings.get(prefix + 'async_url')
+    if url:
+        url = make_url(url)
+    else:
+        url = make_url(settings[prefix + 'url'])
+        backend = url.get_backend_name()
+        url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+
+    kw = {}
+    # SQLite :memory: memakai StaticPool, yang tidak menerima opsi QueuePool
+    if not (url.get_backend_name() == 'sqlite'
+            and url.database in (None, '', ':memory:')):
+        for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle'):
+            if prefix + key in settings:
+                kw[key] = int(settings[prefix + key])
+        if prefix + 'pool_pre_ping' in settings:
+            kw['pool_pre_ping'] = asbool(settings[prefix + 'pool_pre_ping'])
+    return create_async_engine(url, **kw)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest('limit dan after harus berupa angka')
+
+
+class MahasiswaASGI(object):
+    """ASGI app: endpoint baca mahasiswa async, sisanya ke app WSGI."""
+
+    def __init__(self, wsgi_app, engine, fast_path=True):
+        self.wsgi_app = wsgi_app
+        self.fallback = WsgiToAsgi(wsgi_app)
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine)
+        self.fast_path = fast_path
+        registry = wsgi_app.registry
+        self.ratelimit = limiter(registry)
+        self.route_metrics = registry.get('route_metrics')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if (self.fast_path and scope['type'] == 'http'
+                and scope['method'] == 'GET'):
+            path = scope['path']
+            if path == '/api/mahasiswa':
+                return await self.dispatch(
+                    scope, send, 'mahasiswa_list', self.mahasiswa_list)
+            match = DETAIL_PATH.match(path)
+            if match:
+                return await self.dispatch(
+                    scope, send, 'mahasiswa_detail', self.mahasiswa_detail,
+                    match.group(1))
+        await self.fallback(scope, receive, send)
+
+    async def dispatch(self, scope, send, route, view, *args):
+        """Rate limit + metrik route untuk jalur async (pengganti tween)."""
+        if self.ratelimit is not None:
+            rejected = self.ratelimit(self.webob_request(scope))
+            if rejected is not None:
+                return await self.send_response(send, rejected)
+
+        start = time.perf_counter()
+        sent = [0]
+
+        async def counting_send(message):
+            sent[0] += len(message.get('body', b''))
+            await send(message)
+        try:
+            await view(scope, counting_send, *args)
+        except BadRequest as e:
+            await self.send_json(counting_send, 400, {'error': str(e)})
+        finally:
+            if self.route_metrics is not None:
+                self.route_metrics.observe(
+                    route, time.perf_counter() - start, 0, sent[0])
+
+    @staticmethod
+    def webob_request(scope):
+        client = scope.get('client') or ('', 0)
+        request = Request.blank(scope['path'], environ={
+            'REMOTE_ADDR': client[0],
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        })
+        for name, value in scope['headers']:
+            request.headers[name.decode('latin-1')] = value.decode('latin-1')
+        return request
+
+    async def send_response(self, send, response):
+        """Kirim Response WebOb (mis. 429 dari rate limit) lewat ASGI."""
+        body = response.body
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                   for name, value in response.headerlist]
+        await send({'type': 'http.response.start',
+                    'status': response.status_int, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def send_json(self, send, status, payload, etag=None):
+        body = serializers.dumps(payload)
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ]
+        if etag:
+            headers.append((b'etag', ('"%s"' % etag).encode('ascii')))
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def send_not_modified(self, scope, send, etag):
+        """Kirim 304 jika If-None-Match cocok; True jika terkirim."""
+        header = dict(scope['headers']).get(b'if-none-match')
+        if header and etag in ETagMatcher.parse(header.decode('latin-1')):
+            await send({'type': 'http.response.start', 'status': 304,
+                        'headers': [(b'etag', ('"%s"' % etag).encode('ascii'))]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return True
+        return False
+
+    @staticmethod
+    def params(scope):
+        return dict(parse_qsl(scope['query_string'].decode('latin-1')))
+
+    @staticmethod
+    def fields(params):
+        try:
+            return serializers.parse_fields(params.get('fields'))
+        except ValueError as e:
+            raise BadRequest(str(e))
+
+    # --- LIST MAHASISWA ---
+    async def mahasiswa_list(self, scope, send):
+        params = self.params(scope)
+        after = _int_param(params, 'after')
+        limit = _int_param(params, 'limit')
+        if limit is not None and limit < 1:
+            raise BadRequest('limit minimal 1')
+        fields = self.fields(params)
+
+        accept = dict(scope['headers']).get(b'accept', b'')
+        if (params.get('stream') in ('1', 'true', 'ndjson')
+                or b'application/x-ndjson' in accept):
+            return await self.stream_rows(send, fields, after, limit)
+
+        limit = min(limit or DEFAULT_LIMIT, MAX_LIMIT)
+        async with self.session_factory() as session:
+            version = await session.scalar(
+                select(models.TableVersion.version)
+                .where(models.TableVersion.name == 'mahasiswa'))
+            etag = make_etag('t%d' % (version or 0), params)
+            if await self.send_not_modified(scope, send, etag):
+                return
+            result = await session.execute(
+                list_statement(fields, after).limit(limit + 1))
+            rows = result.all()
+        await self.send_json(send, 200, page_payload(fields, rows, limit),
+                             etag=etag)
+
+    async def stream_rows(self, send, fields, after, limit):
+        stmt = list_statement(fields, after).execution_options(
+            yield_per=STREAM_CHUNK_SIZE)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/x-ndjson')]})
+        async with self.session_factory() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                chunk = b''.join(
+                    serializers.dumps(serializers.row_to_dict(fields, r)) + b'\n'
+                    for r in rows)
+                await send({'type': 'http.response.body', 'body': chunk,
+                            'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    # --- DETAIL MAHASISWA ---
+    async def mahasiswa_detail(self, scope, send, value):
+        # id di luar rentang kolom (int4) ditolak sebelum sampai ke driver
+        mhs_id = _parse_id(value)
+        if mhs_id is None:
+            return await self.send_json(send, 404, {'error': 'Not found'})
+        params = self.params(scope)
+        fields = self.fields(params)
+        async with self.session_factory() as session:
+            row = (await session.execute(
+                detail_statement(fields, mhs_id))).first()
+        if row is None:
+            return await self.send_json(send, 404, {'error': 'Not found'})
+
+        etag = detail_etag(mhs_id, row, params)
+        if await self.send_not_modified(scope, send, etag):
+            return
+        await self.send_json(send, 200, {
+            'status': 'success',
+            'data': detail_data(fields, row),
+        }, etag=etag)
+
+
+def main(global_config, **settings):
+    """Buat ASGI app dari settings yang sama dengan ``main()`` WSGI."""
+    wsgi_app = wsgi_main(global_config, **settings)
+    return MahasiswaASGI(
+        wsgi_app, get_async_engine(settings),
+        fast_path=asbool(settings.get('mahasiswa.asgi.fast_path', True)))
+
+
+def create_app():
+    """Factory untuk ``uvicorn --factory``; config dari env PYRAMID_CONFIG."""
+    config_uri = os.environ.get('PYRAMID_CONFIG', 'production.ini')
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri)
+    return main({'__file__': config_uri}, **settings)
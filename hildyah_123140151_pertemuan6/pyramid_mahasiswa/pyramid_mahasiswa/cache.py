@@ -0,0 +1,258 @@
+"""Read-through cache untuk response GET mahasiswa.
+
+Backend dipilih lewat settings::
+
+    mahasiswa.cache.backend = memory     # memory | redis | none
+    mahasiswa.cache.max_entries = 10000
+    mahasiswa.cache.ttl = 300
+    mahasiswa.cache.redis_url = redis://localhost:6379/0
+
+``redis_url = local://`` memakai :class:`LocalRedis`, pengganti Redis
+in-process yang mengimplementasikan subset perintah redis-py yang dipakai
+di sini (berguna untuk development dan test tanpa server Redis).
+
+Entry di-invalidate dengan after-commit hook transaksi pyramid_tm, jadi
+cache hanya dibersihkan ketika write benar-benar ter-commit.
+"""
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.response import Response
+
+from .replicas import served_by_replica
+
+
+EPOCH_KEY = 'mahasiswa:cache:epoch'
+
+
+class LRUCache(object):
+    """Cache in-process dengan batas jumlah entry (LRU) dan TTL."""
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, epoch=None):
+        with self._lock:
+            # ada invalidasi sejak pembaca mulai query: jangan simpan data lama
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            self._epoch += 1
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def epoch(self):
+        return self._epoch
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+
+class LocalRedis(object):
+    """Pengganti Redis in-process (subset API redis-py: get/set/delete/incr/scan_iter)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._alive(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            expires = time.monotonic() + ex if ex else None
+            self._data[key] = (value, expires)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for k in keys if self._data.pop(k, None) is not None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._alive(key) or 0) + 1
+            self._data[key] = (value, None)
+            return value
+
+    def scan_iter(self, match='*'):
+        with self._lock:
+            keys = list(self._data)
+        return [k for k in keys if fnmatch.fnmatchcase(k, match)]
+
+
+class RedisCache(object):
+    """Backend berbasis client Redis (redis-py atau :class:`LocalRedis`)."""
+
+    def __init__(self, client, ttl=300):
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(key)
+        if value is None:
+            return None
+        content_type, etag, body = bytes(value).split(b'\n', 2)
+        return content_type.decode('ascii'), etag.decode('ascii') or None, body
+
+    def set(self, key, value, epoch=None):
+        if epoch is not None and epoch != self.epoch():
+            return
+        content_type, etag, body = value
+        header = '%s\n%s\n' % (content_type, etag or '')
+        self.client.set(key, header.encode('ascii') + body, ex=self.ttl)
+
+    def delete_prefix(self, prefix):
+        self.client.incr(EPOCH_KEY)
+        keys = list(self.client.scan_iter(match=prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def epoch(self):
+        return int(self.client.get(EPOCH_KEY) or 0)
+
+
+def cache_key(request):
+    """Kunci cache: nama route + matchdict + query string yang diurutkan."""
+    parts = [request.matched_route.name]
+    if 'id' in request.matchdict:
+        mhs_id = request.matchdict['id']
+        # /01 dan /1 baris yang sama: kunci harus cocok dengan detail_prefix
+        try:
+            mhs_id = int(mhs_id)
+        except ValueError:
+            pass
+        parts.append(str(mhs_id))
+    parts.append('&'.join(
+        '%s=%s' % item for item in sorted(request.params.items())))
+    return ':'.join(parts)
+
+
+def detail_prefix(mhs_id=None):
+    if mhs_id is None:
+        return 'mahasiswa_detail:'
+    return 'mahasiswa_detail:%s:' % mhs_id
+
+
+LIST_PREFIX = 'mahasiswa_list:'
+
+
+def cached(view):
+    """View decorator: sajikan response 200 dari cache bila ada."""
+    def wrapper(context, request):
+        cache = request.registry.get('mahasiswa_cache')
+        if cache is None or request.method != 'GET':
+            return view(context, request)
+
+        key = cache_key(request)
+        hit = cache.get(key)
+        if hit is not None:
+            content_type, etag, body = hit
+            if etag and etag in request.if_none_match:
+                response = HTTPNotModified()
+            else:
+                response = Response(body=body, content_type=content_type,
+                                    charset=None)
+            response.etag = etag
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        epoch = cache.epoch()
+        response = view(context, request)
+        # hanya response utuh (bukan stream app_iter) yang disimpan, dan
+        # bukan dari replica: isinya bisa lebih lama dari invalidasi terakhir
+        if (isinstance(response, Response) and response.status_int == 200
+                and isinstance(response.app_iter, list)
+                and not served_by_replica(request)):
+            cache.set(key, (response.content_type, response.etag, response.body),
+                      epoch=epoch)
+            response.headers['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def invalidate_on_commit(request, *prefixes):
+    """Hapus entry cache dengan prefix tertentu setelah transaksi ter-commit."""
+    cache = request.registry.get('mahasiswa_cache')
+    if cache is None:
+        return
+    pending = getattr(request, '_cache_invalidations', None)
+    if pending is None:
+        pending = request._cache_invalidations = set()
+
+        def hook(success):
+            if success:
+                for prefix in pending:
+                    cache.delete_prefix(prefix)
+
+        request.tm.get().addAfterCommitHook(hook)
+    pending.update(prefixes)
+
+
+def is_process_local(cache):
+    """True jika isi ``cache`` tidak dibagi antar proses (memory, local://)."""
+    return (isinstance(cache, LRUCache)
+            or isinstance(getattr(cache, 'client', None), LocalRedis))
+
+
+def cache_from_settings(settings):
+    backend = settings.get('mahasiswa.cache.backend', 'memory')
+    ttl = int(settings.get('mahasiswa.cache.ttl', 300))
+    if backend == 'none':
+        return None
+    if backend == 'memory':
+        return LRUCache(
+            max_entries=int(settings.get('mahasiswa.cache.max_entries', 10000)),
+            ttl=ttl,
+        )
+    if backend == 'redis':
+        url = settings.get('mahasiswa.cache.redis_url', 'local://')
+        if url.startswith('local://'):
+            client = LocalRedis()
+        else:
+            import redis
+            client = redis.Redis.from_url(url)
+        return RedisCache(client, ttl=ttl)
+    raise ValueError('mahasiswa.cache.backend tidak dikenal: %s' % backend)
+
+
+def includeme(config):
+    config.registry['mahasiswa_cache'] = cache_from_settings(
+        config.get_settings())
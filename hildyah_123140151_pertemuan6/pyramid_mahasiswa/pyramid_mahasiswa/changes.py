@@ -0,0 +1,156 @@
+"""Change feed mahasiswa: baca log perubahan, long-poll dan kompaksi.
+
+Log ``mahasiswa_changes`` diisi trigger database (lihat
+``models/mahasiswa_changes.py``), jadi semua jalur tulis ikut tercatat:
+ORM, bulk insert, upsert, maupun SQL langsung. Consumer menyimpan ``seq``
+terakhir yang diterima lalu meminta ``?since=<seq>``; biayanya sebanding
+dengan jumlah perubahan, bukan jumlah baris tabel.
+
+Kompaksi membuang entri yang sudah digantikan entri lebih baru untuk
+mahasiswa yang sama (consumer memperlakukan insert/update sebagai upsert,
+jadi entri terakhir sudah cukup). Retensi menghapus entri yang lebih tua
+dari N hari dan mencatat ``seq`` tertinggi yang dihapus; consumer dengan
+cursor di bawahnya mendapat 410 dan harus sync penuh.
+"""
+import datetime
+import threading
+
+from sqlalchemy import delete, event, func, select
+
+from . import models
+from . import serializers
+
+DEFAULT_MAX_WAIT = 5
+DEFAULT_POLL_INTERVAL = 1.0
+# long-poll menahan satu thread waitress; harus lebih kecil dari `threads`
+DEFAULT_MAX_WAITERS = 2
+DEFAULT_RETENTION_DAYS = 30
+
+# nama baris di table_version yang menyimpan seq tertinggi yang sudah dihapus
+PURGED_KEY = 'mahasiswa_changes_purged'
+
+
+class ChangeNotifier(object):
+    """Membangunkan long-poll di proses ini setiap ada commit.
+
+    Commit dari proses lain tidak terlihat di sini, jadi long-poll tetap
+    membaca ulang database setiap ``poll_interval`` detik.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.generation = 0
+
+    def notify(self, *args):
+        with self._cond:
+            self.generation += 1
+            self._cond.notify_all()
+
+    def wait(self, generation, timeout):
+        """Tunggu commit setelah ``generation``; False jika timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.generation != generation, timeout)
+
+
+def changes_statement(fields, since, limit, dialect_name=None):
+    """Perubahan dengan seq > ``since`` beserta data mahasiswa saat ini.
+
+    Data diambil lewat LEFT JOIN ke tabel mahasiswa; untuk baris yang
+    sudah dihapus semua kolomnya NULL. Di PostgreSQL hanya entri dari
+    transaksi yang lebih tua dari transaksi aktif tertua yang dikembalikan:
+    seq dibagikan saat INSERT, bukan saat commit, jadi tanpa batas ini
+    client bisa melompati seq kecil yang baru commit belakangan.
+    """
+    change = models.MahasiswaChange
+    stmt = (
+        select(change.seq, change.op, change.mahasiswa_id, change.nim,
+               *serializers.columns(fields))
+        .outerjoin(models.Mahasiswa, models.Mahasiswa.id == change.mahasiswa_id)
+        .where(change.seq > since)
+        .order_by(change.seq)
+        .limit(limit)
+    )
+    if dialect_name == 'postgresql':
+        stmt = stmt.where(
+            change.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+    return stmt
+
+
+def change_to_dict(fields, row):
+    data = None
+    if row.op != 'delete' and row[4] is not None:
+        data = serializers.row_to_dict(fields, row[4:])
+    return {
+        'seq': row.seq,
+        'op': row.op,
+        'id': row.mahasiswa_id,
+        'nim': row.nim,
+        'data': data,
+    }
+
+
+def fetch_changes(dbsession, fields, since, limit):
+    dialect_name = dbsession.get_bind().dialect.name
+    rows = dbsession.execute(
+        changes_statement(fields, since, limit, dialect_name))
+    return [change_to_dict(fields, row) for row in rows]
+
+
+def purged_seq(dbsession):
+    """Seq tertinggi yang sudah dihapus retensi (0 jika belum pernah)."""
+    return models.get_table_version(dbsession, PURGED_KEY)
+
+
+def head_seq(dbsession):
+    change = models.MahasiswaChange
+    return dbsession.execute(select(func.max(change.seq))).scalar() or 0
+
+
+def compact(dbsession, upto=None):
+    """Hapus entri yang sudah digantikan entri lebih baru untuk id yang sama.
+
+    ``upto`` membatasi kompaksi ke seq <= upto sehingga entri terbaru yang
+    mungkin sedang dibaca consumer tidak disentuh.
+    """
+    table = models.MahasiswaChange.__table__
+    latest = select(func.max(table.c.seq)).group_by(table.c.mahasiswa_id)
+    stmt = delete(table).where(table.c.seq.not_in(latest))
+    if upto is not None:
+        stmt = stmt.where(table.c.seq <= upto)
+    return dbsession.execute(stmt).rowcount
+
+
+def purge(dbsession, older_than):
+    """Hapus entri dengan changed_at < ``older_than`` (UTC, naive)."""
+    table = models.MahasiswaChange.__table__
+    upto = dbsession.execute(
+        select(func.max(table.c.seq)).where(table.c.changed_at < older_than)
+    ).scalar()
+    if upto is None:
+        return 0
+    deleted = dbsession.execute(
+        delete(table).where(table.c.seq <= upto)).rowcount
+    if upto > purged_seq(dbsession):
+        dbsession.merge(models.TableVersion(name=PURGED_KEY, version=upto))
+    return deleted
+
+
+def retention_cutoff(days, now=None):
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(tzinfo=None) - datetime.timedelta(days=days)
+
+
+def includeme(config):
+    settings = config.get_settings()
+    notifier = ChangeNotifier()
+    config.registry['change_notifier'] = notifier
+    config.registry['changes_max_wait'] = float(
+        settings.get('mahasiswa.changes.max_wait', DEFAULT_MAX_WAIT))
+    config.registry['changes_poll_interval'] = float(
+        settings.get('mahasiswa.changes.poll_interval', DEFAULT_POLL_INTERVAL))
+    config.registry['changes_waiters'] = threading.BoundedSemaphore(int(
+        settings.get('mahasiswa.changes.max_waiters', DEFAULT_MAX_WAITERS)))
+    event.listen(config.registry['dbsession_factory'], 'after_commit',
+                 notifier.notify)
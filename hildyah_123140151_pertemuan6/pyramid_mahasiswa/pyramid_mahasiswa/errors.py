@@ -0,0 +1,141 @@
+"""Exception view bertipe untuk error database dan validasi.
+
+View tidak lagi menangkap ``Exception`` lalu menjawab 200 ``{'status':
+'error'}``; error dibiarkan naik sehingga ``pyramid_tm`` meng-abort
+transaksi dan ``pyramid_retry`` bisa mengulang request. Di sini error
+dipetakan ke response JSON:
+
+- ``schemas.ValidationError``   -> 422
+- ``IntegrityError``            -> 409 (mis. nim duplikat)
+- error DBAPI transien          -> ditandai retryable; jika percobaan
+  terakhir pun gagal, 503 dengan ``Retry-After``
+- error DBAPI lain              -> 500
+
+Error transien: serialization failure / deadlock (PostgreSQL 40001,
+40P01; MySQL 1205, 1213), ``database is locked`` di SQLite dan koneksi
+yang terputus. Sebelum retry ada jeda backoff eksponensial dengan jitter
+supaya percobaan ulang tidak langsung menabrak database yang sama sibuknya.
+
+Penghitung error (per status) dan retry per endpoint (nama route)
+tampil di ``/_metrics`` sebagai ``errors``.
+
+Settings::
+
+    retry.attempts = 3
+    mahasiswa.retry.backoff = 0.05   # detik, dikali 2 tiap percobaan; 0 = tanpa jeda
+"""
+import random
+import threading
+import time
+
+from pyramid.response import Response
+from pyramid_retry import IBeforeRetry, mark_error_retryable
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from .schemas import ValidationError
+
+TRANSIENT_SQLSTATES = frozenset(['40001', '40P01'])
+TRANSIENT_MYSQL_CODES = frozenset([1205, 1213])
+TRANSIENT_SQLITE_MESSAGES = ('database is locked', 'database table is locked')
+
+
+class ErrorMetrics(object):
+    """Penghitung error dan retry per endpoint."""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, name):
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = {'errors': {}, 'retries': 0}
+        return endpoint
+
+    def error(self, name, status):
+        with self._lock:
+            errors = self._endpoint(name)['errors']
+            errors[status] = errors.get(status, 0) + 1
+
+    def retry(self, name):
+        with self._lock:
+            self._endpoint(name)['retries'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {'errors': {str(status): count for status, count
+                                  in sorted(endpoint['errors'].items())},
+                       'retries': endpoint['retries']}
+                for name, endpoint in sorted(self._endpoints.items())
+            }
+
+
+def endpoint_name(request):
+    route = getattr(request, 'matched_route', None)
+    return route.name if route is not None else '-'
+
+
+def is_transient(exc):
+    """True untuk error DBAPI yang kemungkinan berhasil bila diulang."""
+    if exc.connection_invalidated:
+        return True
+    orig = exc.orig
+    sqlstate = (getattr(orig, 'sqlstate', None)
+                or getattr(orig, 'pgcode', None))
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+    args = getattr(orig, 'args', ())
+    if args and args[0] in TRANSIENT_MYSQL_CODES:
+        return True
+    message = str(orig).lower()
+    return any(m in message for m in TRANSIENT_SQLITE_MESSAGES)
+
+
+def _error_response(request, status, body):
+    request.registry['error_metrics'].error(endpoint_name(request), status)
+    return Response(json_body=body, status=status)
+
+
+def validation_error_view(exc, request):
+    return _error_response(request, 422, {'error': str(exc)})
+
+
+def integrity_error_view(exc, request):
+    return _error_response(request, 409, {
+        'error': 'data bentrok dengan data yang sudah ada'})
+
+
+def dbapi_error_view(exc, request):
+    if not is_transient(exc):
+        return _error_response(request, 500, {'error': 'kesalahan database'})
+    # pyramid_retry membuang response ini dan mengulang request, kecuali
+    # ini percobaan terakhir
+    mark_error_retryable(exc)
+    response = _error_response(request, 503, {
+        'error': 'database sedang sibuk, coba lagi'})
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def backoff_delay(base, attempt):
+    """Jeda sebelum percobaan ke-``attempt + 1``: base * 2^attempt, jitter."""
+    return base * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def includeme(config):
+    settings = config.get_settings()
+    metrics = config.registry['error_metrics'] = ErrorMetrics()
+    backoff = float(settings.get('mahasiswa.retry.backoff', 0.05))
+
+    def before_retry(event):
+        request = event.request
+        metrics.retry(endpoint_name(request))
+        if backoff > 0:
+            time.sleep(backoff_delay(
+                backoff, request.environ.get('retry.attempt', 0)))
+
+    config.add_subscriber(before_retry, IBeforeRetry)
+    config.add_exception_view(validation_error_view, context=ValidationError)
+    config.add_exception_view(integrity_error_view, context=IntegrityError)
+    config.add_exception_view(dbapi_error_view, context=DBAPIError)
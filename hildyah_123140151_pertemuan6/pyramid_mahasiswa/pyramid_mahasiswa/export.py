@@ -0,0 +1,164 @@
+"""Format dan kompresi untuk ``GET /api/mahasiswa/export``.
+
+Setiap writer menerima chunk baris (Row tuple dari server-side cursor) dan
+mengembalikan bytes untuk chunk itu, jadi response tidak pernah memuat
+seluruh tabel di memori:
+
+- ``csv`` / ``ndjson``: baris demi baris, satu chunk = satu potongan body.
+- ``arrow`` (Arrow IPC stream) / ``parquet``: satu chunk = satu Arrow
+  RecordBatch (untuk Parquet satu row group). Butuh ``pyarrow``
+  (extra ``export``).
+
+Kompresi transfer dipilih dari ``Accept-Encoding``: ``zstd`` (butuh
+``zstandard``) lalu ``gzip``.
+"""
+import csv
+import io
+import zlib
+
+from . import serializers
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow opsional
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard opsional
+    zstandard = None
+
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class CsvWriter(object):
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.header = True
+
+    def write(self, rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        if self.header:
+            writer.writerow(self.fields)
+            self.header = False
+        writer.writerows(rows)
+        return buf.getvalue().encode('utf-8')
+
+    def close(self):
+        # export kosong tetap punya baris header
+        return self.write([]) if self.header else b''
+
+
+class NdjsonWriter(object):
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def write(self, rows):
+        return b''.join(
+            serializers.dumps(serializers.row_to_dict(self.fields, r)) + b'\n'
+            for r in rows)
+
+    def close(self):
+        return b''
+
+
+class _Sink(io.RawIOBase):
+    """File tujuan pyarrow yang menampung bytes sampai di-drain."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def arrow_schema(fields):
+    types = {
+        'id': pyarrow.int64(),
+        'tanggal_lahir': pyarrow.date32(),
+    }
+    return pyarrow.schema(
+        [(f, types.get(f, pyarrow.string())) for f in fields])
+
+
+class ArrowWriter(object):
+    """Arrow IPC stream atau Parquet, satu RecordBatch per chunk."""
+
+    def __init__(self, fields, fmt):
+        self.fields = fields
+        self.schema = arrow_schema(fields)
+        self.sink = _Sink()
+        if fmt == 'parquet':
+            self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema)
+        else:
+            self.writer = pyarrow.ipc.new_stream(self.sink, self.schema)
+
+    def write(self, rows):
+        batch = pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array([r[i] for r in rows], type=t)
+             for i, t in enumerate(self.schema.types)],
+            schema=self.schema)
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def close(self):
+        self.writer.close()
+        return self.sink.drain()
+
+
+def make_writer(fmt, fields):
+    if fmt == 'csv':
+        return CsvWriter(fields)
+    if fmt == 'ndjson':
+        return NdjsonWriter(fields)
+    return ArrowWriter(fields, fmt)
+
+
+def available_formats():
+    if pyarrow is None:
+        return ('csv', 'ndjson')
+    return tuple(CONTENT_TYPES)
+
+
+def choose_encoding(accept_encoding):
+    """``zstd``, ``gzip`` atau None dari ``request.accept_encoding``."""
+    if not accept_encoding:
+        return None
+    offers = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+    acceptable = accept_encoding.acceptable_offers(offers)
+    return acceptable[0][0] if acceptable else None
+
+
+def compressor(encoding):
+    """Objek dengan ``compress(bytes)`` dan ``flush()``, atau None."""
+    if encoding == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor().compressobj()
+    return None
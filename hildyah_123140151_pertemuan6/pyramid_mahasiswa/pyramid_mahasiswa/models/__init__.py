@@ -1,16 +1,59 @@
+import functools
+import os
+import weakref
+
 from sqlalchemy import engine_from_config
+from sqlalchemy import pool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import configure_mappers
 import zope.sqlalchemy
 
+from ..pool_metrics import PoolMetrics
+from ..read_only import is_lightweight, lightweight_session
+from ..replicas import router_from_settings
+
 # Import semua model
-from .mahasiswa import Mahasiswa
+from .mahasiswa import Mahasiswa, insert_on_conflict, mahasiswa_fts
+from .mahasiswa_changes import MahasiswaChange
+from .mahasiswa_stats import MahasiswaStats
 from .mymodel import MyModel
+from .table_version import TableVersion, bump_table_version, get_table_version
 
 configure_mappers()
 
+# nilai yang diizinkan untuk setting `sqlalchemy.poolclass`
+POOL_CLASSES = {
+    'QueuePool': pool.QueuePool,
+    'StaticPool': pool.StaticPool,
+    'SingletonThreadPool': pool.SingletonThreadPool,
+    'NullPool': pool.NullPool,
+}
+
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    """Buat engine dari settings.
+
+    Opsi pool (pool_size, max_overflow, pool_timeout, pool_recycle,
+    pool_pre_ping) diteruskan apa adanya oleh ``engine_from_config``;
+    ``poolclass`` diterjemahkan dari nama kelas pool. Key bertingkat seperti
+    ``sqlalchemy.replica.*`` dan ``sqlalchemy.async_url`` bukan argumen
+    ``create_engine`` sehingga tidak ikut diteruskan.
+    """
+    settings = {
+        key: value for key, value in settings.items()
+        if key.startswith(prefix) and '.' not in key[len(prefix):]
+        and key != prefix + 'async_url'
+    }
+    kw = {}
+    poolclass = settings.get(prefix + 'poolclass')
+    if poolclass:
+        if poolclass not in POOL_CLASSES:
+            raise ValueError('%spoolclass tidak dikenal: %s' % (prefix, poolclass))
+        kw['poolclass'] = POOL_CLASSES[poolclass]
+        # StaticPool berbagi satu koneksi SQLite antar thread waitress
+        if (poolclass == 'StaticPool'
+                and settings[prefix + 'url'].startswith('sqlite')):
+            kw['connect_args'] = {'check_same_thread': False}
+    return engine_from_config(settings, prefix, **kw)
 
 def get_session_factory(engine):
     factory = sessionmaker()
@@ -22,16 +65,59 @@ def get_tm_session(session_factory, transaction_manager):
     zope.sqlalchemy.register(dbsession, transaction_manager=transaction_manager)
     return dbsession
 
+def dispose_after_fork(engines):
+    """Buang pool warisan parent di proses anak hasil fork (lihat prefork).
+
+    ``close=False``: koneksi milik parent tidak ditutup, cukup dilupakan,
+    sehingga worker membuka koneksinya sendiri.
+    """
+    refs = [weakref.ref(engine) for engine in engines]
+
+    def dispose():
+        for ref in refs:
+            engine = ref()
+            if engine is not None:
+                engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=dispose)
+
+
 def includeme(config):
     settings = config.get_settings()
 
     engine = get_engine(settings)
     session_factory = get_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
+    config.registry['pool_metrics'] = PoolMetrics(engine)
+
+    router = router_from_settings(settings, engine, get_engine)
+    config.registry['db_router'] = router
+    if router is not None:
+        config.registry['replica_pool_metrics'] = {
+            replica.name: PoolMetrics(replica.engine)
+            for replica in router.replicas
+        }
+    dispose_after_fork([engine] + (
+        [replica.engine for replica in router.replicas] if router else []))
+    config.include('pyramid_mahasiswa.read_only')
+
+    def dbsession(request):
+        bind = router.engine_for(request) if router is not None else None
+        if is_lightweight(request):
+            return lightweight_session(session_factory, request, bind)
+        # request.tm berasal dari pyramid_tm
+        if bind is None:
+            return get_tm_session(session_factory, request.tm)
+        dbsession = session_factory(bind=bind)
+        zope.sqlalchemy.register(dbsession, transaction_manager=request.tm)
+        return dbsession
+
+    config.add_request_method(dbsession, "dbsession", reify=True)
 
-    # request.tm berasal dari pyramid_tm
-    config.add_request_method(
-        lambda request: get_tm_session(session_factory, request.tm),
-        "dbsession",
-        reify=True
-    )
+def read_session_factory(request):
+    """Session factory untuk session di luar transaksi request (stream)."""
+    factory = request.registry['dbsession_factory']
+    router = request.registry.get('db_router')
+    if router is None:
+        return factory
+    return functools.partial(factory, bind=router.engine_for(request))
@@ -1,9 +1,14 @@
 from sqlalchemy import (
+    DDL,
     Column,
     Integer,
     Text,
     Date,
+    column,
+    event,
+    table,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 
 from .meta import Base
 
@@ -14,9 +19,14 @@ class Mahasiswa(Base):
     id = Column(Integer, primary_key=True)
     nim = Column(Text, unique=True, nullable=False)
     nama = Column(Text, nullable=False)
-    jurusan = Column(Text, nullable=False)
+    jurusan = Column(Text, nullable=False, index=True)
     tanggal_lahir = Column(Date)
     alamat = Column(Text)
+    version = Column(Integer, nullable=False, server_default='1')
+
+    # version dinaikkan setiap UPDATE dan dipakai untuk ETag serta
+    # optimistic concurrency
+    __mapper_args__ = {'version_id_col': version}
 
     def to_dict(self):
         return {
@@ -26,4 +36,74 @@ class Mahasiswa(Base):
             'jurusan': self.jurusan,
             'tanggal_lahir': self.tanggal_lahir.isoformat() if self.tanggal_lahir else None,
             'alamat': self.alamat,
-        }
\ No newline at end of file
+        }
+
+
+def insert_on_conflict(dialect_name, update_fields=()):
+    """INSERT mahasiswa dengan ``ON CONFLICT (nim)`` sesuai dialect.
+
+    Tanpa ``update_fields`` nim yang sudah ada diabaikan (DO NOTHING);
+    dengan ``update_fields`` kolom itu ditimpa dan version dinaikkan (DO
+    UPDATE). None untuk dialect tanpa ON CONFLICT.
+    """
+    if dialect_name == 'postgresql':
+        stmt = postgresql.insert(Mahasiswa.__table__)
+    elif dialect_name == 'sqlite':
+        stmt = sqlite.insert(Mahasiswa.__table__)
+    else:
+        return None
+    if not update_fields:
+        return stmt.on_conflict_do_nothing(index_elements=['nim'])
+    values = {name: stmt.excluded[name] for name in update_fields}
+    values['version'] = Mahasiswa.__table__.c.version + 1
+    return stmt.on_conflict_do_update(index_elements=['nim'], set_=values)
+
+# --- Index pencarian nama ---
+# SQLite: tabel FTS5 (external content) yang disinkronkan trigger.
+# PostgreSQL: index trigram GIN pada lower(nama).
+# Keduanya dibuat juga oleh migration; DDL di sini untuk create_all (test).
+mahasiswa_fts = table('mahasiswa_fts', column('rowid'), column('nama'))
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mahasiswa_fts USING fts5("
+    "nama, content='mahasiswa', content_rowid='id')",
+    "CREATE TRIGGER mahasiswa_fts_ai AFTER INSERT ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(rowid, nama) VALUES (new.id, new.nama); END",
+    "CREATE TRIGGER mahasiswa_fts_ad AFTER DELETE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(mahasiswa_fts, rowid, nama) "
+    "VALUES ('delete', old.id, old.nama); END",
+    "CREATE TRIGGER mahasiswa_fts_au AFTER UPDATE OF nama ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_fts(mahasiswa_fts, rowid, nama) "
+    "VALUES ('delete', old.id, old.nama); "
+    "INSERT INTO mahasiswa_fts(rowid, nama) VALUES (new.id, new.nama); END",
+]
+
+POSTGRESQL_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_mahasiswa_nama_trgm ON mahasiswa "
+    "USING gin (lower(nama) gin_trgm_ops)",
+]
+
+
+def alembic_include_object(object, name, type_, reflected, compare_to):
+    """Filter autogenerate Alembic: abaikan objek pencarian di atas.
+
+    Tabel FTS5 (beserta shadow table ``mahasiswa_fts_*``) dan index trigram
+    dibuat lewat DDL mentah, jadi tidak ada di metadata; tanpa filter ini
+    autogenerate akan menulis ``drop_table`` / ``drop_index`` untuknya.
+    """
+    if type_ == 'table' and name.startswith('mahasiswa_fts'):
+        return False
+    if type_ == 'index' and name == 'ix_mahasiswa_nama_trgm':
+        return False
+    return True
+
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Mahasiswa.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Mahasiswa.__table__, 'after_drop',
+             DDL('DROP TABLE IF EXISTS mahasiswa_fts').execute_if(dialect='sqlite'))
+for statement in POSTGRESQL_TRGM_DDL:
+    event.listen(Mahasiswa.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='postgresql'))
@@ -0,0 +1,78 @@
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    Text,
+    event,
+    func,
+)
+
+from .mahasiswa import Mahasiswa
+from .meta import Base
+
+
+class MahasiswaChange(Base):
+    """ Log perubahan mahasiswa (append-only) untuk endpoint /changes.
+
+    Diisi trigger database pada setiap insert/update/delete. ``seq`` naik
+    terus dan dipakai client sebagai cursor ``since``. ``txid`` (hanya
+    PostgreSQL) dipakai supaya perubahan dari transaksi yang belum commit
+    tidak terlewati client. ``changed_at`` disimpan dalam UTC.
+    """
+    __tablename__ = 'mahasiswa_changes'
+    seq = Column(Integer, primary_key=True)
+    mahasiswa_id = Column(Integer, nullable=False)
+    nim = Column(Text, nullable=False)
+    op = Column(Text, nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+    txid = Column(BigInteger)
+
+    # seq tidak boleh dipakai ulang setelah baris lama dihapus retensi
+    __table_args__ = {'sqlite_autoincrement': True}
+
+
+MahasiswaChange.__table__.add_is_dependent_on(Mahasiswa.__table__)
+
+# --- Trigger log perubahan ---
+# Dibuat juga oleh migration; DDL di sini untuk create_all (test).
+SQLITE_CHANGES_DDL = [
+    "CREATE TRIGGER mahasiswa_changes_ai AFTER INSERT ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (new.id, new.nim, 'insert', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER mahasiswa_changes_au AFTER UPDATE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (new.id, new.nim, 'update', CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER mahasiswa_changes_ad AFTER DELETE ON mahasiswa BEGIN "
+    "INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at) "
+    "VALUES (old.id, old.nim, 'delete', CURRENT_TIMESTAMP); END",
+]
+
+POSTGRESQL_CHANGES_DDL = [
+    """CREATE OR REPLACE FUNCTION mahasiswa_changes_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at, txid)
+        VALUES (OLD.id, OLD.nim, 'delete', now() AT TIME ZONE 'utc', txid_current());
+    ELSE
+        INSERT INTO mahasiswa_changes (mahasiswa_id, nim, op, changed_at, txid)
+        VALUES (NEW.id, NEW.nim, lower(TG_OP), now() AT TIME ZONE 'utc',
+                txid_current());
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    "CREATE TRIGGER mahasiswa_changes_aiud AFTER INSERT OR UPDATE OR DELETE "
+    "ON mahasiswa FOR EACH ROW EXECUTE FUNCTION mahasiswa_changes_trigger()",
+]
+
+for statement in SQLITE_CHANGES_DDL:
+    event.listen(MahasiswaChange.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRESQL_CHANGES_DDL:
+    event.listen(MahasiswaChange.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='postgresql'))
+event.listen(MahasiswaChange.__table__, 'after_drop',
+             DDL('DROP FUNCTION IF EXISTS mahasiswa_changes_trigger() CASCADE')
+             .execute_if(dialect='postgresql'))
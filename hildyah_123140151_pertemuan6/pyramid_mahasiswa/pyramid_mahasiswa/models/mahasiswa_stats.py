@@ -0,0 +1,94 @@
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    Text,
+    event,
+)
+
+from .mahasiswa import Mahasiswa
+from .meta import Base
+
+
+class MahasiswaStats(Base):
+    """ Ringkasan jumlah mahasiswa per jurusan dan tahun lahir.
+
+    Diisi trigger database pada tabel mahasiswa (insert/update/delete,
+    termasuk bulk insert dan upsert), jadi membaca statistik cukup
+    O(jumlah grup). tahun_lahir 0 berarti tanggal lahir tidak diisi.
+    """
+    __tablename__ = 'mahasiswa_stats'
+    jurusan = Column(Text, primary_key=True)
+    tahun_lahir = Column(Integer, primary_key=True, autoincrement=False)
+    jumlah = Column(Integer, nullable=False)
+
+
+# trigger membutuhkan tabel mahasiswa
+MahasiswaStats.__table__.add_is_dependent_on(Mahasiswa.__table__)
+
+# --- Trigger ringkasan ---
+# Dibuat juga oleh migration; DDL di sini untuk create_all (test).
+SQLITE_OLD_YEAR = "COALESCE(CAST(substr(old.tanggal_lahir, 1, 4) AS INTEGER), 0)"
+SQLITE_NEW_YEAR = "COALESCE(CAST(substr(new.tanggal_lahir, 1, 4) AS INTEGER), 0)"
+
+SQLITE_STATS_DECREMENT = (
+    "UPDATE mahasiswa_stats SET jumlah = jumlah - 1 "
+    "WHERE jurusan = old.jurusan AND tahun_lahir = {old}; "
+    "DELETE FROM mahasiswa_stats WHERE jurusan = old.jurusan "
+    "AND tahun_lahir = {old} AND jumlah <= 0; "
+).format(old=SQLITE_OLD_YEAR)
+SQLITE_STATS_INCREMENT = (
+    "INSERT INTO mahasiswa_stats (jurusan, tahun_lahir, jumlah) "
+    "VALUES (new.jurusan, {new}, 1) "
+    "ON CONFLICT (jurusan, tahun_lahir) DO UPDATE SET jumlah = jumlah + 1; "
+).format(new=SQLITE_NEW_YEAR)
+
+SQLITE_STATS_DDL = [
+    "CREATE TRIGGER mahasiswa_stats_ai AFTER INSERT ON mahasiswa BEGIN "
+    + SQLITE_STATS_INCREMENT + "END",
+    "CREATE TRIGGER mahasiswa_stats_ad AFTER DELETE ON mahasiswa BEGIN "
+    + SQLITE_STATS_DECREMENT + "END",
+    "CREATE TRIGGER mahasiswa_stats_au AFTER UPDATE OF jurusan, tanggal_lahir "
+    "ON mahasiswa WHEN old.jurusan IS NOT new.jurusan "
+    "OR {old} IS NOT {new} BEGIN ".format(old=SQLITE_OLD_YEAR, new=SQLITE_NEW_YEAR)
+    + SQLITE_STATS_DECREMENT + SQLITE_STATS_INCREMENT + "END",
+]
+
+POSTGRESQL_STATS_DDL = [
+    """CREATE OR REPLACE FUNCTION mahasiswa_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE mahasiswa_stats SET jumlah = jumlah - 1
+        WHERE jurusan = OLD.jurusan
+          AND tahun_lahir = COALESCE(EXTRACT(YEAR FROM OLD.tanggal_lahir)::int, 0);
+        DELETE FROM mahasiswa_stats
+        WHERE jurusan = OLD.jurusan
+          AND tahun_lahir = COALESCE(EXTRACT(YEAR FROM OLD.tanggal_lahir)::int, 0)
+          AND jumlah <= 0;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        INSERT INTO mahasiswa_stats (jurusan, tahun_lahir, jumlah)
+        VALUES (NEW.jurusan, COALESCE(EXTRACT(YEAR FROM NEW.tanggal_lahir)::int, 0), 1)
+        ON CONFLICT (jurusan, tahun_lahir)
+        DO UPDATE SET jumlah = mahasiswa_stats.jumlah + 1;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    "CREATE TRIGGER mahasiswa_stats_aid AFTER INSERT OR DELETE ON mahasiswa "
+    "FOR EACH ROW EXECUTE FUNCTION mahasiswa_stats_trigger()",
+    "CREATE TRIGGER mahasiswa_stats_au AFTER UPDATE OF jurusan, tanggal_lahir "
+    "ON mahasiswa FOR EACH ROW WHEN (OLD.jurusan IS DISTINCT FROM NEW.jurusan "
+    "OR OLD.tanggal_lahir IS DISTINCT FROM NEW.tanggal_lahir) "
+    "EXECUTE FUNCTION mahasiswa_stats_trigger()",
+]
+
+for statement in SQLITE_STATS_DDL:
+    event.listen(MahasiswaStats.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRESQL_STATS_DDL:
+    event.listen(MahasiswaStats.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='postgresql'))
+event.listen(MahasiswaStats.__table__, 'after_drop',
+             DDL('DROP FUNCTION IF EXISTS mahasiswa_stats_trigger() CASCADE')
+             .execute_if(dialect='postgresql'))
@@ -0,0 +1,34 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    Text,
+    select,
+    update,
+)
+
+from .meta import Base
+
+
+class TableVersion(Base):
+    """ Penghitung perubahan per tabel, dipakai untuk ETag list """
+    __tablename__ = 'table_version'
+    name = Column(Text, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+def get_table_version(dbsession, name):
+    version = dbsession.execute(
+        select(TableVersion.version).where(TableVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_table_version(dbsession, name):
+    """Naikkan penghitung perubahan tabel `name` dalam transaksi yang sama."""
+    result = dbsession.execute(
+        update(TableVersion)
+        .where(TableVersion.name == name)
+        .values(version=TableVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        dbsession.add(TableVersion(name=name, version=1))
@@ -0,0 +1,87 @@
+"""Statistik connection pool SQLAlchemy dari pool events.
+
+Dipasang oleh ``models.includeme`` dan ditampilkan di ``/_metrics``.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+
+
+class PoolMetrics(object):
+    """Hitung checkout, waktu tunggu, overflow dan invalidasi sebuah engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+        pool = engine.pool
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        event.listen(pool, 'invalidate', self._on_invalidate)
+        event.listen(pool, 'soft_invalidate', self._on_invalidate)
+        # engine.dispose() membuat pool baru; listener ikut pindah, tapi
+        # pembungkus connect() harus dipasang ulang
+        event.listen(engine, 'engine_disposed', self._instrument)
+        self._instrument(engine)
+
+    def _instrument(self, engine):
+        pool = engine.pool
+        connect = pool.connect
+
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                self._record_wait(time.perf_counter() - start)
+
+        pool.connect = timed_connect
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        pool = self.engine.pool
+        with self._lock:
+            data = {
+                'pool': type(pool).__name__,
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+        # hanya QueuePool yang punya size/overflow
+        for name in ('size', 'checkedout', 'overflow'):
+            method = getattr(pool, name, None)
+            if callable(method):
+                data[name] = method()
+        return data
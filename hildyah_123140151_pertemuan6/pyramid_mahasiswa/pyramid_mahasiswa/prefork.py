@@ -0,0 +1,311 @@
+"""Mode prefork: satu proses master dan N worker waitress hasil fork.
+
+Master membangun app sekali (``main()``; mapper sudah di-configure saat
+``models`` diimpor), menjalankan request warm-up opsional (``warm_paths``)
+lalu ``gc.freeze()`` dan fork N worker. Modul, mapper, validator yang
+sudah di-compile, template yang sudah dimuat dan isi cache hasil warm-up
+dipakai bersama worker secara copy-on-write. Socket listen dibuka sekali di
+master dan diwarisi semua worker; kernel membagi koneksi baru antar worker.
+
+Setelah fork setiap worker membuang pool koneksi warisan master
+(``engine.dispose(close=False)``, lihat ``models.dispose_after_fork``),
+jadi tidak ada koneksi database yang dipakai dua proses.
+
+Sinyal ke master:
+
+- ``HUP``: reload graceful. Ini dibaca ulang dan app dibangun lagi, worker
+  generasi baru di-fork, lalu worker lama dihentikan dengan ``TERM``.
+  Perubahan kode Python tetap butuh restart master.
+- ``TERM`` / ``INT``: berhenti graceful.
+
+Worker yang menerima ``TERM`` berhenti menerima koneksi, menyelesaikan
+request yang sedang berjalan (maksimal ``graceful_timeout`` detik) lalu
+keluar. Worker yang mati tiba-tiba di-fork ulang.
+
+Cache ``memory`` (dan ``redis`` dengan ``local://``) per proses:
+invalidasi hanya sampai ke worker yang menulis, worker lain tetap
+menyajikan body dan ETag lama sampai ``ttl``. Karena itu master menolak
+start (dan reload) dengan cache seperti itu bila ``workers`` > 1; pakai
+``mahasiswa.cache.backend = redis`` atau ``none``. Rate limit ``memory``
+juga per proses; pakai ``sqlite`` supaya bucket dibagi antar worker.
+
+Pemakaian::
+
+    pserve production.ini --app-name prefork --server-name prefork
+    python -m pyramid_mahasiswa.prefork production.ini --app-name prefork
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+from pyramid.settings import aslist
+from waitress.adjustments import Adjustments
+from waitress.channel import HTTPChannel
+from waitress.server import BaseWSGIServer, create_server
+
+from .cache import is_process_local
+
+log = logging.getLogger(__name__)
+
+
+def bind_sockets(listen, backlog=1024):
+    """Buka socket listen untuk ``listen`` (format waitress, mis. ``*:6543``)."""
+    sockets = []
+    for family, socktype, proto, sockaddr in Adjustments(listen=listen).listen:
+        sock = socket.socket(family, socktype, proto)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_INET6:
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+        sock.bind(sockaddr)
+        sock.listen(backlog)
+        sockets.append(sock)
+    return sockets
+
+
+def warm(app, paths):
+    """Jalankan GET internal supaya cache terisi sebelum fork."""
+    from webob import Request
+    for path in paths:
+        response = Request.blank(path).get_response(app)
+        log.info('warm-up %s -> %s', path, response.status)
+
+
+def _busy(channel):
+    return bool(channel.requests or channel.request is not None
+                or channel.total_outbufs_len)
+
+
+def run_worker(app, sockets, threads=4, graceful_timeout=30, **server_kw):
+    """Loop server waitress di proses worker sampai menerima TERM."""
+    stopping = []
+    signal.signal(signal.SIGTERM,
+                  lambda signum, frame: stopping.append(time.monotonic()))
+    # Ctrl-C dan HUP dikirim ke seluruh process group; master yang mengatur
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    server = create_server(app, sockets=sockets, threads=threads, **server_kw)
+    loop = server.asyncore.loop
+    # MultiSocketServer (beberapa socket) vs satu TcpWSGIServer
+    socket_map = getattr(server, 'map', None) or server._map
+    while not stopping:
+        loop(timeout=1, map=socket_map, use_poll=True, count=1)
+
+    # berhenti menerima koneksi, selesaikan request yang sedang berjalan
+    for dispatcher in list(socket_map.values()):
+        if isinstance(dispatcher, BaseWSGIServer):
+            dispatcher.del_channel()
+            dispatcher.socket.close()
+    deadline = stopping[0] + graceful_timeout
+    while time.monotonic() < deadline:
+        channels = [d for d in socket_map.values()
+                    if isinstance(d, HTTPChannel)]
+        if not channels:
+            break
+        for channel in channels:
+            if not _busy(channel):
+                channel.will_close = True
+        loop(timeout=0.1, map=socket_map, use_poll=True, count=1)
+    server.task_dispatcher.shutdown()
+
+
+class Arbiter(object):
+    """Master prefork: fork, awasi dan reload worker.
+
+    ``load_app`` dipanggil saat start dan setiap ``HUP`` untuk membangun
+    app WSGI baru.
+    """
+
+    def __init__(self, load_app, sockets, workers=2, threads=4,
+                 graceful_timeout=30, warm_paths=(), server_kw=None):
+        self.load_app = load_app
+        self.sockets = sockets
+        self.workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.warm_paths = warm_paths
+        self.server_kw = server_kw or {}
+        self.app = None
+        self.generation = 0
+        self.children = {}  # pid -> generation
+        self._reload = False
+        self._stop = False
+
+    def prepare(self, app):
+        registry = getattr(app, 'registry', None)
+        if (self.workers > 1 and registry is not None
+                and is_process_local(registry.get('mahasiswa_cache'))):
+            raise ValueError(
+                'cache mahasiswa per proses tidak bisa dipakai dengan %d '
+                'worker: invalidasi hanya sampai ke worker yang menulis; '
+                'pakai mahasiswa.cache.backend = redis atau none'
+                % self.workers)
+        warm(app, self.warm_paths)
+        metrics = registry.get('route_metrics') if registry else None
+        if metrics is not None:
+            # request warm-up tidak ikut metrik worker
+            metrics.reset()
+        # objek yang sudah ada tidak disentuh GC lagi, jadi halaman memori
+        # yang dibagi copy-on-write tidak ikut tersalin di worker
+        gc.collect()
+        gc.freeze()
+        return app
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = self.generation
+            return pid
+        status = 0
+        try:
+            run_worker(self.app, self.sockets, self.threads,
+                       self.graceful_timeout, **self.server_kw)
+        except BaseException:
+            log.exception('worker %d gagal', os.getpid())
+            status = 1
+        finally:
+            os._exit(status)
+
+    def spawn_missing(self):
+        current = sum(1 for generation in self.children.values()
+                      if generation == self.generation)
+        for _ in range(self.workers - current):
+            self.spawn()
+
+    def reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            generation = self.children.pop(pid, None)
+            if generation == self.generation and not self._stop:
+                log.warning('worker %d berhenti (status %d), fork ulang',
+                            pid, status)
+
+    def signal_workers(self, signum, generation=None):
+        for pid, gen in list(self.children.items()):
+            if generation is None or gen == generation:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+
+    def reload(self):
+        self._reload = False
+        gc.unfreeze()
+        try:
+            app = self.prepare(self.load_app())
+        except Exception:
+            log.exception('reload gagal, worker lama tetap dipakai')
+            gc.freeze()
+            return
+        old = self.generation
+        self.app = app
+        self.generation += 1
+        self.spawn_missing()
+        self.signal_workers(signal.SIGTERM, old)
+        log.info('reload: generasi %d aktif', self.generation)
+
+    def stop(self):
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.signal_workers(signal.SIGKILL)
+        while self.children:
+            pid, _ = os.waitpid(-1, 0)
+            self.children.pop(pid, None)
+
+    def run(self):
+        self.app = self.prepare(self.load_app())
+
+        def on_stop(signum, frame):
+            self._stop = True
+
+        def on_reload(signum, frame):
+            self._reload = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_reload)
+        # SIGCHLD membangunkan sleep di bawah saat worker keluar
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        log.info('master %d: %d worker, %d thread per worker',
+                 os.getpid(), self.workers, self.threads)
+        self.spawn_missing()
+        while not self._stop:
+            if self._reload:
+                self.reload()
+            self.reap()
+            self.spawn_missing()
+            time.sleep(1)
+        self.stop()
+        for sock in self.sockets:
+            sock.close()
+
+
+def serve(load_app, listen='*:6543', workers=None, threads=4,
+          graceful_timeout=30, warm_paths=(), **server_kw):
+    arbiter = Arbiter(
+        load_app, bind_sockets(listen),
+        workers=int(workers or os.cpu_count() or 1),
+        threads=int(threads),
+        graceful_timeout=float(graceful_timeout),
+        warm_paths=warm_paths,
+        server_kw=server_kw,
+    )
+    arbiter.run()
+
+
+def serve_paste(app, global_conf, listen='*:6543', workers=None, threads=4,
+                graceful_timeout=30, warm_paths='', app_name='main',
+                **server_kw):
+    """Server runner PasteDeploy (``use = egg:pyramid_mahasiswa#prefork``).
+
+    App pertama adalah app yang sudah dibuat pserve; saat ``HUP`` ini
+    dibaca ulang dari ``global_conf['__file__']``.
+    """
+    from pyramid.paster import get_app
+    loaded = [app]
+
+    def load_app():
+        if loaded:
+            return loaded.pop()
+        return get_app(global_conf['__file__'], app_name)
+
+    serve(load_app, listen, workers, threads, graceful_timeout,
+          aslist(warm_paths), **server_kw)
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(
+        description='Jalankan app dengan master prefork dan N worker waitress.')
+    parser.add_argument('config_uri', help='mis. production.ini')
+    parser.add_argument('--app-name', default='main')
+    parser.add_argument('--listen', default='*:6543')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--graceful-timeout', type=float, default=30)
+    parser.add_argument('--warm', action='append', default=[],
+                        metavar='PATH', help='GET internal sebelum fork')
+    args = parser.parse_args(argv[1:])
+
+    from pyramid.paster import get_app, setup_logging
+    setup_logging(args.config_uri)
+    serve(lambda: get_app(args.config_uri, args.app_name), args.listen,
+          args.workers, args.threads, args.graceful_timeout, args.warm)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Tween rate limit token bucket per client.
+
+Setiap client (``request.remote_addr``, atau header ``key_header`` bila
+diisi) punya bucket berisi maksimal ``burst`` token yang terisi ulang
+``rate`` token per detik; setiap request memakai satu token. Jika bucket
+kosong request langsung dijawab 429 dengan header ``Retry-After`` sebelum
+menyentuh transaksi atau pool koneksi, jadi lonjakan beban ditolak dengan
+murah alih-alih menghabiskan pool.
+
+State bucket disimpan di memori proses (``memory``) atau di file SQLite
+lokal (``sqlite``) yang dipakai bersama semua worker di host yang sama;
+taruh file-nya di tmpfs (mis. /dev/shm) supaya murah.
+
+``X-Forwarded-For`` sengaja tidak dipakai: header itu bisa diisi bebas oleh
+client sehingga setiap request mendapat bucket baru. Di belakang reverse
+proxy atur ``trusted_proxy`` waitress supaya ``remote_addr`` berisi alamat
+client asli.
+
+Settings::
+
+    mahasiswa.ratelimit.rate = 20          # token per detik; 0 = nonaktif
+    mahasiswa.ratelimit.burst = 40
+    mahasiswa.ratelimit.backend = memory   # memory | sqlite
+    mahasiswa.ratelimit.sqlite_path = /dev/shm/pyramid_mahasiswa_ratelimit.sqlite
+    mahasiswa.ratelimit.key_header =       # mis. X-Api-Key
+    mahasiswa.ratelimit.exempt = /_metrics /static/
+"""
+import math
+import sqlite3
+import threading
+import time
+
+from pyramid.response import Response
+from pyramid.settings import aslist
+
+
+class MemoryBuckets(object):
+    """Bucket in-process; bucket yang sudah penuh lagi dibuang saat penuh."""
+
+    def __init__(self, rate, burst, max_clients=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """Ambil satu token; kembalikan ``(allowed, tokens_tersisa)``."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._prune(now)
+                tokens = self.burst
+            else:
+                tokens, updated = bucket
+                tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    def _prune(self, now):
+        full = self.burst / self.rate
+        for key, (_, updated) in list(self._buckets.items()):
+            if now - updated >= full:
+                del self._buckets[key]
+
+
+class SqliteBuckets(object):
+    """Bucket di file SQLite bersama; satu UPSERT atomik per request."""
+
+    TAKE = (
+        "INSERT INTO buckets (key, tokens, updated, allowed) "
+        "VALUES (:key, :burst - 1, :now, 1) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "tokens = min(:burst, tokens + (:now - updated) * :rate) "
+        "  - (min(:burst, tokens + (:now - updated) * :rate) >= 1), "
+        "allowed = min(:burst, tokens + (:now - updated) * :rate) >= 1, "
+        "updated = :now "
+        "RETURNING allowed, tokens"
+    )
+    PRUNE = "DELETE FROM buckets WHERE updated < :cutoff"
+    PRUNE_EVERY = 10000
+
+    def __init__(self, path, rate, burst):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._local = threading.local()
+        self._calls = 0
+        # koneksi ini tidak disimpan: proses worker hasil fork membuka
+        # koneksinya sendiri per thread
+        conn = self._open()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, "
+                "tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "allowed INTEGER NOT NULL)")
+        finally:
+            conn.close()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+        return conn
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def take(self, key, now=None):
+        if now is None:
+            # wall clock: monotonic tidak sama antar proses
+            now = time.time()
+        conn = self._connect()
+        self._calls += 1
+        if self._calls % self.PRUNE_EVERY == 0:
+            # bucket yang sudah terisi penuh sama dengan bucket baru
+            conn.execute(self.PRUNE, {'cutoff': now - self.burst / self.rate})
+        allowed, tokens = conn.execute(self.TAKE, {
+            'key': key, 'now': now, 'rate': self.rate, 'burst': self.burst,
+        }).fetchone()
+        return bool(allowed), tokens
+
+
+# penghitung di registry['ratelimit_stats'] dipakai tween dan jalur asgi
+_stats_lock = threading.Lock()
+
+
+def client_key(request, header=None):
+    if header:
+        value = request.headers.get(header)
+        if value:
+            return 'h:' + value
+    # bukan client_addr: WebOb mengambilnya dari X-Forwarded-For
+    return 'ip:%s' % request.remote_addr
+
+
+def too_many_requests(retry_after):
+    response = Response(
+        json_body={'error': 'terlalu banyak request, coba lagi nanti'},
+        status=429)
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def limiter(registry):
+    """Fungsi ``check(request)``: Response 429 atau None bila boleh lanjut.
+
+    None bila rate limit nonaktif. Dipakai tween ini dan jalur async
+    ``asgi`` supaya keduanya berbagi bucket dan pengecualian yang sama.
+    """
+    buckets = registry.get('ratelimit_buckets')
+    if buckets is None:
+        return None
+    settings = registry.settings
+    header = settings.get('mahasiswa.ratelimit.key_header') or None
+    exempt = tuple(aslist(settings.get(
+        'mahasiswa.ratelimit.exempt', '/_metrics /static/')))
+    stats = registry['ratelimit_stats']
+
+    def check(request):
+        if exempt and request.path.startswith(exempt):
+            return None
+        allowed, tokens = buckets.take(client_key(request, header))
+        if allowed:
+            return None
+        with _stats_lock:
+            stats['rejected'] += 1
+        return too_many_requests(
+            max(1, math.ceil((1 - tokens) / buckets.rate)))
+
+    return check
+
+
+def ratelimit_tween_factory(handler, registry):
+    check = limiter(registry)
+    if check is None:
+        return handler
+
+    def ratelimit_tween(request):
+        rejected = check(request)
+        if rejected is not None:
+            return rejected
+        return handler(request)
+
+    return ratelimit_tween
+
+
+def buckets_from_settings(settings):
+    rate = float(settings.get('mahasiswa.ratelimit.rate', 0))
+    if rate <= 0:
+        return None
+    burst = float(settings.get('mahasiswa.ratelimit.burst', rate * 2))
+    backend = settings.get('mahasiswa.ratelimit.backend', 'memory')
+    if backend == 'memory':
+        return MemoryBuckets(rate, burst)
+    if backend == 'sqlite':
+        return SqliteBuckets(settings.get(
+            'mahasiswa.ratelimit.sqlite_path',
+            '/dev/shm/pyramid_mahasiswa_ratelimit.sqlite'), rate, burst)
+    raise ValueError('mahasiswa.ratelimit.backend tidak dikenal: %s' % backend)
+
+
+def includeme(config):
+    config.registry['ratelimit_buckets'] = buckets_from_settings(
+        config.get_settings())
+    config.registry['ratelimit_stats'] = {'rejected': 0}
+    # tolak sedini mungkin (tepat di bawah sql_profiler), sebelum
+    # single-flight dan transaksi
+    config.add_tween(
+        'pyramid_mahasiswa.ratelimit.ratelimit_tween_factory',
+        under='pyramid_mahasiswa.sql_profiler.sql_profiler_tween_factory',
+        over='pyramid_mahasiswa.singleflight.singleflight_tween_factory',
+    )
@@ -0,0 +1,116 @@
+"""Mode request read-only.
+
+Request dengan method aman (GET/HEAD/OPTIONS) tidak perlu transaksi
+``pyramid_tm``: tidak ada data manager zope, tidak ada two-phase commit dan
+tidak ada retry. ``request.dbsession`` untuk request seperti ini adalah
+Session biasa yang ditutup (rollback) di akhir request; di PostgreSQL
+transaksinya dibuka dengan ``SET TRANSACTION READ ONLY`` sehingga tulis
+yang tidak sengaja akan ditolak database.
+
+View yang menulis lewat GET harus didaftarkan dengan
+``config.add_view(..., read_only=False)``;
+view seperti itu dijalankan di dalam transaksi ``request.tm`` seperti
+biasa. Sebaliknya view POST yang hanya membaca boleh diberi
+``read_only=True`` supaya dibaca dari replica (lihat ``replicas``).
+
+Settings::
+
+    mahasiswa.read_only_requests = true
+"""
+from pyramid.settings import asbool
+from sqlalchemy import event
+
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# ditandai oleh tm_activate_hook saat pyramid_tm tidak dipakai
+ENVIRON_KEY = 'pyramid_mahasiswa.read_only'
+
+
+def is_read_only(request):
+    """True untuk request yang tidak menulis ke database.
+
+    Ditentukan oleh opsi view ``read_only`` bila ada, selain itu oleh method.
+    """
+    flag = getattr(request, 'db_read_only', None)
+    if flag is not None:
+        return flag
+    return request.method in SAFE_METHODS
+
+
+def is_lightweight(request):
+    """True jika request berjalan tanpa transaksi pyramid_tm."""
+    return request.environ.get(ENVIRON_KEY, False)
+
+
+def tm_activate_hook(request):
+    if is_read_only(request):
+        request.environ[ENVIRON_KEY] = True
+        return False
+    return True
+
+
+def retry_activate_hook(request):
+    # tanpa transaksi tidak ada error yang bisa di-retry
+    return 1 if is_read_only(request) else None
+
+
+def _run_in_transaction(view, context, request):
+    manager = request.tm
+    manager.begin()
+    try:
+        response = view(context, request)
+    except BaseException:
+        manager.abort()
+        raise
+    if manager.isDoomed():
+        manager.abort()
+    else:
+        manager.commit()
+    return response
+
+
+def read_only_view_deriver(view, info):
+    """View deriver untuk opsi view ``read_only=True/False``."""
+    flag = info.options.get('read_only')
+    if flag is None:
+        return view
+
+    def wrapper(context, request):
+        request.db_read_only = flag
+        if not flag and request.environ.pop(ENVIRON_KEY, False):
+            # method aman tetapi view menulis: kembali ke transaksi penuh
+            return _run_in_transaction(view, context, request)
+        return view(context, request)
+    return wrapper
+
+
+read_only_view_deriver.options = ('read_only',)
+
+
+def lightweight_session(session_factory, request, bind=None):
+    """Session read-only tanpa zope.sqlalchemy, ditutup di akhir request."""
+    kw = {'info': {'read_only': True}}
+    if bind is not None:
+        kw['bind'] = bind
+    dbsession = session_factory(**kw)
+    request.add_finished_callback(lambda request: dbsession.close())
+    return dbsession
+
+
+def _set_transaction_read_only(session, transaction, connection):
+    if (session.info.get('read_only')
+            and connection.dialect.name == 'postgresql'):
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+def includeme(config):
+    settings = config.get_settings()
+    config.add_view_deriver(read_only_view_deriver)
+    if not asbool(settings.get('mahasiswa.read_only_requests', True)):
+        return
+    settings.setdefault(
+        'tm.activate_hook', 'pyramid_mahasiswa.read_only.tm_activate_hook')
+    settings.setdefault(
+        'retry.activate_hook', 'pyramid_mahasiswa.read_only.retry_activate_hook')
+    session_factory = config.registry['dbsession_factory']
+    event.listen(session_factory, 'after_begin', _set_transaction_read_only)
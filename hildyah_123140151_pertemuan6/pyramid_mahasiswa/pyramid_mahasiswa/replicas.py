@@ -0,0 +1,126 @@
+"""Routing baca ke read replica.
+
+Settings (setiap replica punya prefix engine sendiri, jadi opsi pool yang
+sama dengan primary bisa dipakai)::
+
+    sqlalchemy.replica.r1.url = postgresql://.../pyramid_mahasiswa
+    sqlalchemy.replica.r1.pool_size = 4
+    sqlalchemy.replica.r2.url = postgresql://.../pyramid_mahasiswa
+    sqlalchemy.replica.health_check_interval = 10
+
+Request web read-only (GET/HEAD yang ditandai ``tm_activate_hook``, atau
+view dengan ``read_only=True``) memakai session yang di-bind ke salah satu
+replica secara round-robin. Request lain, view ``read_only=False`` dan
+script yang memakai ``bootstrap()`` (request GET tiruan tanpa tween) tetap
+ke primary, jadi tulisan tidak pernah sampai ke replica. Replica yang
+gagal health check (``SELECT 1``) dilewati sampai interval berikutnya; jika
+tidak ada replica sehat, primary yang dipakai.
+
+Request yang dilayani replica ditandai (``served_by_replica``) supaya
+response-nya tidak disimpan ke cache: replica yang tertinggal bisa
+mengembalikan data sebelum write terakhir.
+"""
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import text
+
+from .read_only import is_lightweight
+
+log = logging.getLogger(__name__)
+
+REPLICA_URL = re.compile(r'^sqlalchemy\.replica\.([^.]+)\.url$')
+ENVIRON_KEY = 'pyramid_mahasiswa.replica'
+
+
+class Replica(object):
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaRouter(object):
+    """Pilih engine untuk request: primary atau replica sehat (round-robin)."""
+
+    def __init__(self, primary, replicas, health_check_interval=10.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def check(self, replica):
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            if not replica.healthy:
+                log.info('replica %s sehat kembali', replica.name)
+            replica.healthy = True
+        except Exception as e:
+            if replica.healthy:
+                log.warning('replica %s gagal health check: %s', replica.name, e)
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def read_engine(self):
+        """Engine untuk query baca; primary jika tidak ada replica sehat."""
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+            if now - replica.checked_at >= self.health_check_interval:
+                self.check(replica)
+            if replica.healthy:
+                return replica.engine
+        return self.primary
+
+    def engine_for(self, request):
+        if uses_replica(request):
+            engine = self.read_engine()
+            if engine is not self.primary:
+                request.environ[ENVIRON_KEY] = True
+            return engine
+        return self.primary
+
+
+def uses_replica(request):
+    """True hanya untuk request web yang pasti read-only.
+
+    Method saja tidak cukup: request dari ``bootstrap()`` juga GET.
+    """
+    flag = getattr(request, 'db_read_only', None)
+    if flag is not None:
+        return flag
+    return is_lightweight(request)
+
+
+def served_by_replica(request):
+    """True jika session request ini di-bind ke replica."""
+    return request.environ.get(ENVIRON_KEY, False)
+
+
+def replica_names(settings, prefix='sqlalchemy.'):
+    names = []
+    for key in settings:
+        match = REPLICA_URL.match(key)
+        if match and key.startswith(prefix):
+            names.append(match.group(1))
+    return sorted(names)
+
+
+def router_from_settings(settings, primary, get_engine):
+    names = replica_names(settings)
+    if not names:
+        return None
+    replicas = [
+        Replica(name, get_engine(settings, 'sqlalchemy.replica.%s.' % name))
+        for name in names
+    ]
+    interval = float(settings.get('sqlalchemy.replica.health_check_interval', 10))
+    return ReplicaRouter(primary, replicas, interval)
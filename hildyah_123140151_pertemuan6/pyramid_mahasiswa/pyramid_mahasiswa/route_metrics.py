@@ -0,0 +1,312 @@
+"""Tween metrik latency dan byte per route.
+
+Setiap request dicatat ke histogram latency gaya HDR (log-linear: 16
+sub-bucket per kelipatan dua mikrodetik, error relatif maksimal ~6%) dan
+penghitung byte request / response, dengan label nama route dari
+``routes.py`` (``-`` untuk request yang tidak cocok dengan route).
+
+Pencatatan tanpa lock: setiap thread menulis ke shard miliknya sendiri
+dan semua shard digabung saat ``/_metrics`` dibaca. Lock hanya dipakai
+sekali ketika thread pertama kali mencatat.
+
+Modul ini juga dipakai ``pyramid_matakuliah`` (``config.include``), jadi
+tidak boleh bergantung pada model mahasiswa.
+
+Latency diukur sampai handler selesai; untuk response stream (NDJSON,
+export) waktu kirim body tidak ikut, tetapi byte-nya tetap dihitung saat
+stream selesai. Dengan mode prefork metrik ini per worker.
+
+Settings::
+
+    route_metrics.enabled = true
+"""
+import threading
+import time
+
+from pyramid.response import Response
+from pyramid.settings import asbool
+
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+MAX_US = 3600 * 10 ** 6
+BUCKETS = (MAX_US.bit_length() - SUB_BITS + 1) * SUB_COUNT
+
+# batas bucket histogram Prometheus (detik)
+PROMETHEUS_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                     0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(us):
+    """Index bucket untuk nilai ``us`` mikrodetik."""
+    if us < SUB_COUNT:
+        return us
+    if us > MAX_US:
+        us = MAX_US
+    shift = us.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_COUNT + (us >> shift) - SUB_COUNT
+
+
+def bucket_bounds(index):
+    """``(bawah, atas)`` bucket dalam mikrodetik, atas eksklusif."""
+    if index < SUB_COUNT:
+        return index, index + 1
+    shift = index // SUB_COUNT - 1
+    lower = (SUB_COUNT + index % SUB_COUNT) << shift
+    return lower, lower + (1 << shift)
+
+
+class RouteStats(object):
+
+    __slots__ = ('counts', 'count', 'total', 'bytes_in', 'bytes_out')
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def merge(self, other):
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+    def quantile(self, q):
+        """Nilai (detik) pada kuantil ``q``; tengah bucket yang memuatnya."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                lower, upper = bucket_bounds(i)
+                return (lower + upper) / 2 / 1e6
+        return MAX_US / 1e6
+
+    def cumulative(self, bounds):
+        """Jumlah observasi dengan bucket atas <= setiap batas (detik)."""
+        result = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            limit = bound * 1e6
+            while i < BUCKETS and bucket_bounds(i)[1] <= limit:
+                seen += self.counts[i]
+                i += 1
+            result.append(seen)
+        return result
+
+
+class RouteMetrics(object):
+    """Histogram latency + byte per route, shard per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._local = threading.local()
+            self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, seconds, bytes_in=0, bytes_out=0):
+        shard = self._shard()
+        stats = shard.get(route)
+        if stats is None:
+            stats = shard[route] = RouteStats()
+        stats.counts[bucket_index(int(seconds * 1e6))] += 1
+        stats.count += 1
+        stats.total += seconds
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+
+    def add_bytes_out(self, route, size):
+        shard = self._shard()
+        stats = shard.get(route)
+        if stats is None:
+            stats = shard[route] = RouteStats()
+        stats.bytes_out += size
+
+    def merged(self):
+        """Gabungan semua shard: ``{route: RouteStats}``."""
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for route, stats in list(shard.items()):
+                total = merged.get(route)
+                if total is None:
+                    total = merged[route] = RouteStats()
+                total.merge(stats)
+        return merged
+
+    def snapshot(self):
+        """Ringkasan JSON per route (ms dan byte)."""
+        result = {}
+        for route, stats in sorted(self.merged().items()):
+            entry = {'count': stats.count, 'bytes_in': stats.bytes_in,
+                     'bytes_out': stats.bytes_out}
+            for q in (0.5, 0.99):
+                value = stats.quantile(q)
+                entry['p%g_ms' % (q * 100)] = (
+                    round(value * 1000, 3) if value is not None else None)
+            result[route] = entry
+        return result
+
+
+def _label(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _number(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(metrics, gauges=None):
+    """Render metrik route (+ ``gauges``: ``{nama: {label: nilai}}``)."""
+    merged = sorted(metrics.merged().items())
+    lines = [
+        '# HELP http_request_duration_seconds Latency request per route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for route, stats in merged:
+        label = 'route="%s"' % _label(route)
+        for bound, count in zip(PROMETHEUS_BOUNDS,
+                                stats.cumulative(PROMETHEUS_BOUNDS)):
+            lines.append('http_request_duration_seconds_bucket{%s,le="%g"} %d'
+                         % (label, bound, count))
+        lines.append('http_request_duration_seconds_bucket{%s,le="+Inf"} %d'
+                     % (label, stats.count))
+        lines.append('http_request_duration_seconds_sum{%s} %s'
+                     % (label, _number(stats.total)))
+        lines.append('http_request_duration_seconds_count{%s} %d'
+                     % (label, stats.count))
+
+    lines += [
+        '# HELP http_request_latency_seconds Kuantil latency per route '
+        '(histogram HDR, per proses).',
+        '# TYPE http_request_latency_seconds summary',
+    ]
+    for route, stats in merged:
+        label = 'route="%s"' % _label(route)
+        for q in QUANTILES:
+            value = stats.quantile(q)
+            if value is not None:
+                lines.append('http_request_latency_seconds{%s,quantile="%g"} %s'
+                             % (label, q, _number(value)))
+        lines.append('http_request_latency_seconds_sum{%s} %s'
+                     % (label, _number(stats.total)))
+        lines.append('http_request_latency_seconds_count{%s} %d'
+                     % (label, stats.count))
+
+    for name, attr, help_text in (
+            ('http_request_bytes_total', 'bytes_in', 'Byte body request.'),
+            ('http_response_bytes_total', 'bytes_out', 'Byte body response.')):
+        lines.append('# HELP %s %s' % (name, help_text))
+        lines.append('# TYPE %s counter' % name)
+        for route, stats in merged:
+            lines.append('%s{route="%s"} %d'
+                         % (name, _label(route), getattr(stats, attr)))
+
+    for name, samples in sorted((gauges or {}).items()):
+        lines.append('# TYPE %s gauge' % name)
+        for labels, value in sorted(samples.items()):
+            if labels:
+                lines.append('%s{%s} %s' % (name, labels, _number(value)))
+            else:
+                lines.append('%s %s' % (name, _number(value)))
+    return '\n'.join(lines) + '\n'
+
+
+def wants_prometheus(request):
+    """True untuk scraper: ``?format=prometheus`` atau Accept text/plain."""
+    if request.params.get('format') == 'prometheus':
+        return True
+    accept = request.headers.get('Accept', '')
+    return 'text/plain' in accept or 'openmetrics' in accept
+
+
+def pool_gauges(gauges, snapshot, labels=''):
+    """Tambahkan angka ``PoolMetrics.snapshot()`` sebagai gauge ``db_pool_*``."""
+    for key, value in snapshot.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            gauges.setdefault('db_pool_' + key, {})[labels] = value
+    return gauges
+
+
+def prometheus_response(metrics, gauges=None):
+    response = Response(prometheus_text(metrics, gauges), charset='utf-8')
+    response.content_type = 'text/plain; version=0.0.4'
+    return response
+
+
+def _counting_iter(app_iter, metrics, route):
+    size = 0
+    try:
+        for chunk in app_iter:
+            size += len(chunk)
+            yield chunk
+    finally:
+        close = getattr(app_iter, 'close', None)
+        if close is not None:
+            close()
+        metrics.add_bytes_out(route, size)
+
+
+def route_metrics_tween_factory(handler, registry):
+    metrics = registry.get('route_metrics')
+    if metrics is None:
+        return handler
+
+    def route_metrics_tween(request):
+        start = time.perf_counter()
+        try:
+            response = handler(request)
+        except BaseException:
+            route = request.matched_route.name if request.matched_route else '-'
+            metrics.observe(route, time.perf_counter() - start,
+                            request.content_length or 0)
+            raise
+        elapsed = time.perf_counter() - start
+        route = request.matched_route.name if request.matched_route else '-'
+        bytes_out = response.content_length
+        if bytes_out is None and not isinstance(response.app_iter, list):
+            # body stream: byte dihitung saat stream selesai
+            response.app_iter = _counting_iter(
+                response.app_iter, metrics, route)
+            bytes_out = 0
+        elif bytes_out is None:
+            bytes_out = sum(len(chunk) for chunk in response.app_iter)
+        metrics.observe(route, elapsed, request.content_length or 0,
+                        bytes_out)
+        return response
+
+    return route_metrics_tween
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if asbool(settings.get('route_metrics.enabled', True)):
+        config.registry['route_metrics'] = RouteMetrics()
+    # paling luar: rate limit, single-flight dan commit ikut terukur
+    config.add_tween(
+        'pyramid_mahasiswa.route_metrics.route_metrics_tween_factory',
+        over='pyramid_mahasiswa.sql_profiler.sql_profiler_tween_factory',
+    )
@@ -4,10 +4,17 @@ def includeme(config):
 
     # Default route
     config.add_route('home', '/')
+    config.add_route('metrics', '/_metrics')
 
     # Mahasiswa routes
     config.add_route('mahasiswa_list', '/api/mahasiswa', request_method='GET')
+    config.add_route('mahasiswa_search', '/api/mahasiswa/search', request_method='GET')
+    config.add_route('mahasiswa_export', '/api/mahasiswa/export', request_method='GET')
+    config.add_route('mahasiswa_stats', '/api/mahasiswa/stats', request_method='GET')
+    config.add_route('mahasiswa_changes', '/api/mahasiswa/changes', request_method='GET')
     config.add_route('mahasiswa_detail', '/api/mahasiswa/{id}', request_method='GET')
     config.add_route('mahasiswa_add', '/api/mahasiswa', request_method='POST')
-    config.add_route('mahasiswa_update', '/api/mahasiswa/{id}', request_method='PUT')
+    config.add_route('mahasiswa_bulk', '/api/mahasiswa/bulk', request_method='POST')
+    config.add_route('mahasiswa_bulk_patch', '/api/mahasiswa', request_method='PATCH')
+    config.add_route('mahasiswa_update', '/api/mahasiswa/{id}', request_method=('PUT', 'PATCH'))
     config.add_route('mahasiswa_delete', '/api/mahasiswa/{id}', request_method='DELETE')
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Validasi payload mahasiswa yang dipakai view dan script seeding.
+
+Skema ditulis sekali sebagai tuple ``Field`` lalu di-*compile* menjadi
+fungsi validator (``compile_validator``, di-cache per skema dan mode
+partial): daftar pengecek per kolom, set kolom yang dikenal dan kolom
+wajib sudah disiapkan di depan, jadi memvalidasi satu objek hanya satu
+loop tanpa membangun ulang set / membaca metadata.
+
+View dengan opsi ``schema`` (lihat ``validated_body_deriver``) men-decode
+dan memvalidasi body sebelum view dipanggil, artinya sebelum
+``request.dbsession`` dibuka; hasilnya di ``request.validated``::
+
+    config.add_view(view, route_name=..., schema=MAHASISWA_SCHEMA)
+
+Body bukan JSON -> 400; payload tidak valid -> ``ValidationError`` (422).
+"""
+from collections import namedtuple
+from datetime import date
+import functools
+
+from pyramid.response import Response
+
+
+class ValidationError(ValueError):
+    """Payload tidak valid; dijawab 422 oleh exception view (lihat errors)."""
+
+
+# type: 'text' atau 'date'
+Field = namedtuple('Field', 'name type required')
+
+MAHASISWA_SCHEMA = (
+    Field('nim', 'text', True),
+    Field('nama', 'text', True),
+    Field('jurusan', 'text', True),
+    Field('tanggal_lahir', 'date', False),
+    Field('alamat', 'text', False),
+)
+MAHASISWA_FIELDS = tuple(f.name for f in MAHASISWA_SCHEMA)
+REQUIRED_FIELDS = tuple(f.name for f in MAHASISWA_SCHEMA if f.required)
+
+
+def _check_text(name):
+    def check(value):
+        if value.__class__ is not str:
+            raise ValidationError('%s harus berupa teks' % name)
+        return value
+    return check
+
+
+def _check_date(name):
+    def check(value):
+        # '' dianggap kosong, seperti sel CSV yang tidak diisi
+        if not value:
+            return None
+        if value.__class__ is str:
+            try:
+                return date.fromisoformat(value)
+            except ValueError:
+                pass
+        raise ValidationError('%s harus berformat YYYY-MM-DD' % name)
+    return check
+
+
+CHECKS = {'text': _check_text, 'date': _check_date}
+
+
+@functools.lru_cache(maxsize=None)
+def compile_validator(schema, partial=False):
+    """Buat fungsi ``validate(item) -> row`` untuk ``schema``.
+
+    Kolom opsional yang tidak dikirim diisi None; dengan ``partial=True``
+    (PATCH) hanya kolom yang dikirim yang dikembalikan.
+    """
+    known = frozenset(f.name for f in schema)
+    fields = tuple((f.name, CHECKS[f.type](f.name), f.required)
+                   for f in schema)
+
+    def validate(item):
+        if item.__class__ is not dict:
+            raise ValidationError('baris harus berupa objek JSON')
+        if not known.issuperset(item):
+            raise ValidationError('kolom tidak dikenal: %s' % ', '.join(
+                sorted(set(item) - known)))
+        row = {}
+        for name, check, required in fields:
+            value = item.get(name)
+            if value is None:
+                if partial and name not in item:
+                    continue
+                if required:
+                    raise ValidationError('%s wajib diisi' % name)
+                row[name] = None
+                continue
+            value = check(value)
+            if required and not value:
+                raise ValidationError('%s wajib diisi' % name)
+            row[name] = value
+        return row
+
+    return validate
+
+
+def normalize_mahasiswa(item, partial=False):
+    """Validasi satu objek mahasiswa dan lengkapi kolom opsional dengan None.
+
+    Dengan ``partial=True`` (PATCH) hanya kolom yang dikirim yang dikembalikan.
+    """
+    return compile_validator(MAHASISWA_SCHEMA, partial)(item)
+
+
+def validated_body_deriver(view, info):
+    """View deriver untuk opsi view ``schema``: decode + validasi body."""
+    schema = info.options.get('schema')
+    if schema is None:
+        return view
+    from .serializers import loads
+
+    validate = compile_validator(schema)
+    validate_partial = compile_validator(schema, partial=True)
+
+    def wrapper(context, request):
+        try:
+            data = loads(request.body)
+        except ValueError:
+            return Response(json_body={'error': 'body harus berupa JSON'},
+                            status=400)
+        if request.method == 'PATCH':
+            request.validated = validate_partial(data)
+        else:
+            request.validated = validate(data)
+        return view(context, request)
+    return wrapper
+
+
+validated_body_deriver.options = ('schema',)
+
+
+def includeme(config):
+    config.add_view_deriver(validated_body_deriver)
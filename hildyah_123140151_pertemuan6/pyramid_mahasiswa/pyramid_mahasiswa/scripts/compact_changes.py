@@ -0,0 +1,62 @@
+"""Kompaksi dan retensi log perubahan mahasiswa.
+
+Jalankan berkala (mis. cron harian)::
+
+    compact_pyramid_mahasiswa_changes development.ini --retention-days 30
+"""
+import argparse
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+import zope.sqlalchemy
+
+from .. import changes
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--retention-days',
+        type=float,
+        default=None,
+        help='delete changes older than this many days (default: '
+             'mahasiswa.changes.retention_days or %d)'
+             % changes.DEFAULT_RETENTION_DAYS,
+    )
+    parser.add_argument(
+        '--no-compact',
+        action='store_true',
+        help='only apply retention, keep superseded changes',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+    request = env['request']
+    settings = env['registry'].settings
+
+    days = args.retention_days
+    if days is None:
+        days = float(settings.get('mahasiswa.changes.retention_days',
+                                  changes.DEFAULT_RETENTION_DAYS))
+    try:
+        with request.tm:
+            dbsession = request.dbsession
+            compacted = 0 if args.no_compact else changes.compact(dbsession)
+            purged = changes.purge(dbsession, changes.retention_cutoff(days))
+            zope.sqlalchemy.mark_changed(dbsession)
+        print('%d superseded changes compacted, %d changes older than '
+              '%g days purged' % (compacted, purged, days))
+    finally:
+        env['closer']()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,45 +1,168 @@
 import argparse
+import csv
+import json
+import os
 import sys
-from datetime import date
+import time
 
 from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy import insert, select
 from sqlalchemy.exc import OperationalError
+import zope.sqlalchemy
 
 from .. import models
+from ..schemas import normalize_mahasiswa
 
-def setup_models(dbsession):
+CHUNK_SIZE = 5000
+
+DEFAULT_MAHASISWA = [
+    {
+        'nim': '12345',
+        'nama': 'Budi Santoso',
+        'jurusan': 'Teknik Informatika',
+        'tanggal_lahir': '2000-05-15',
+        'alamat': 'Jl. Merdeka No. 123, Bandung',
+    },
+    {
+        'nim': '54321',
+        'nama': 'Siti Aminah',
+        'jurusan': 'Sistem Informasi',
+        'tanggal_lahir': '2001-08-22',
+        'alamat': 'Jl. Mawar No. 45, Jakarta',
+    },
+]
+
+
+class SeedStats(object):
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.read / elapsed if elapsed else 0
+        return ('%d rows read, %d inserted, %d already existed, %d rejected '
+                'in %.2fs (%.0f rows/s)' % (
+                    self.read, self.inserted, self.skipped, self.rejected,
+                    elapsed, rate))
+
+
+def iter_json_array(f, bufsize=1 << 16):
+    """Baca JSON array besar objek demi objek tanpa memuat seluruh file."""
+    decoder = json.JSONDecoder()
+    buf = f.read(bufsize).lstrip()
+    if not buf.startswith('['):
+        raise ValueError('file JSON harus berupa array')
+    buf = buf[1:]
+    while True:
+        buf = buf.lstrip().lstrip(',').lstrip()
+        if buf.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buf)
+        except ValueError:
+            more = f.read(bufsize)
+            if not more:
+                raise
+            buf += more
+            continue
+        yield item
+        buf = buf[end:]
+        if len(buf) < bufsize:
+            buf += f.read(bufsize)
+
+
+def iter_seed_file(path):
+    """Baris seed dari CSV (header = nama kolom), NDJSON/JSONL atau JSON array."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if ext == '.csv':
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v != ''}
+        elif ext in ('.ndjson', '.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif ext == '.json':
+            yield from iter_json_array(f)
+        else:
+            raise ValueError('format seed tidak dikenal: %s' % path)
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def insert_missing(dbsession, rows):
+    """INSERT baris yang belum ada; konflik nim diabaikan oleh database."""
+    stmt = models.insert_on_conflict(dbsession.get_bind().dialect.name)
+    if stmt is None:
+        stmt = insert(models.Mahasiswa.__table__)
+    return dbsession.execute(stmt, rows).rowcount
+
+
+def load_chunk(dbsession, items, stats):
+    """Satu query IN untuk nim yang sudah ada, lalu satu INSERT massal."""
+    rows = {}
+    for item in items:
+        stats.read += 1
+        try:
+            row = normalize_mahasiswa(item)
+        except ValueError as e:
+            stats.rejected += 1
+            print('Rejected %r: %s' % (item, e))
+            continue
+        if row['nim'] in rows:
+            stats.skipped += 1
+            continue
+        rows[row['nim']] = row
+    if not rows:
+        return
+
+    table = models.Mahasiswa.__table__
+    existing = set(dbsession.execute(
+        select(table.c.nim).where(table.c.nim.in_(list(rows)))
+    ).scalars())
+    stats.skipped += len(existing)
+    missing = [row for nim, row in rows.items() if nim not in existing]
+    if missing:
+        inserted = insert_missing(dbsession, missing)
+        stats.inserted += inserted
+        # baris yang keburu dimasukkan proses lain ikut dihitung "existed"
+        stats.skipped += len(missing) - inserted
+        models.bump_table_version(dbsession, 'mahasiswa')
+        zope.sqlalchemy.mark_changed(dbsession)
+
+
+def setup_models(dbsession, items=None, chunk_size=CHUNK_SIZE, tm=None):
     """
     Add initial model objects.
+
+    ``items`` adalah iterable objek mahasiswa (default: dua data contoh).
+    Jika ``tm`` diisi, setiap chunk di-commit dalam transaksi sendiri.
     """
+    if items is None:
+        items = DEFAULT_MAHASISWA
+    stats = SeedStats()
+    for chunk in chunked(items, chunk_size):
+        if tm is None:
+            load_chunk(dbsession, chunk, stats)
+        else:
+            with tm:
+                load_chunk(dbsession, chunk, stats)
+    return stats
 
-    existing_mahasiswa1 = dbsession.query(models.Mahasiswa).filter_by(nim='12345').first()
-    existing_mahasiswa2 = dbsession.query(models.Mahasiswa).filter_by(nim='54321').first()
-    
-    if not existing_mahasiswa1:
-        mahasiswa1 = models.Mahasiswa(
-            nim='12345',
-            nama='Budi Santoso',
-            jurusan='Teknik Informatika',
-            tanggal_lahir=date(2000, 5, 15),
-            alamat='Jl. Merdeka No. 123, Bandung'
-        )
-        dbsession.add(mahasiswa1)
-        print("Mahasiswa 12345 added.")
-    else:
-        print("Mahasiswa 12345 already exists.")
-    
-    if not existing_mahasiswa2:
-        mahasiswa2 = models.Mahasiswa(
-            nim='54321',
-            nama='Siti Aminah',
-            jurusan='Sistem Informasi',
-            tanggal_lahir=date(2001, 8, 22),
-            alamat='Jl. Mawar No. 45, Jakarta'
-        )
-        dbsession.add(mahasiswa2)
-        print("Mahasiswa 54321 added.")
-    else:
-        print("Mahasiswa 54321 already exists.")
 
 def parse_args(argv):
     parser = argparse.ArgumentParser()
@@ -47,9 +170,25 @@ def parse_args(argv):
         'config_uri',
         help='Configuration file, e.g., development.ini',
     )
+    parser.add_argument(
+        'seed_files',
+        nargs='*',
+        help='CSV, NDJSON/JSONL or JSON array files with mahasiswa rows',
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK_SIZE,
+        help='rows per INSERT / transaction (default: %(default)s)',
+    )
     return parser.parse_args(argv[1:])
 
 
+def iter_items(paths):
+    for path in paths:
+        yield from iter_seed_file(path)
+
+
 def main(argv=sys.argv):
     args = parse_args(argv)
     setup_logging(args.config_uri)
@@ -59,11 +198,10 @@ def main(argv=sys.argv):
     request = env['request']
 
     try:
-        # gunakan request.tm (bukan tm_manager)
-        with request.tm:
-            dbsession = request.dbsession
-            setup_models(dbsession)
-
+        items = iter_items(args.seed_files) if args.seed_files else None
+        stats = setup_models(request.dbsession, items,
+                             chunk_size=args.chunk_size, tm=request.tm)
+        print(stats.report())
         print("Database initialized successfully.")
 
     except OperationalError:
@@ -81,4 +219,4 @@ is correctly configured.
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,73 @@
+"""Serialisasi ringan untuk endpoint baca mahasiswa.
+
+Endpoint read-only memilih kolom yang dibutuhkan saja (``select(*kolom)``)
+sehingga hasilnya berupa Row tuple biasa tanpa identity map / unit of work,
+lalu langsung di-encode menjadi bytes JSON tanpa lewat renderer ``json``.
+"""
+import datetime
+import json
+
+from pyramid.response import Response
+
+from .models import Mahasiswa
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+
+FIELDS = ('id', 'nim', 'nama', 'jurusan', 'tanggal_lahir', 'alamat')
+
+
+def parse_fields(value):
+    """Ubah parameter ``fields=nim,nama`` menjadi tuple nama kolom.
+
+    ``id`` selalu disertakan karena dipakai sebagai cursor pagination.
+    """
+    if not value:
+        return FIELDS
+    requested = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = set(requested) - set(FIELDS)
+    if unknown:
+        raise ValueError('field tidak dikenal: %s' % ', '.join(sorted(unknown)))
+    return ('id',) + tuple(f for f in FIELDS if f in requested and f != 'id')
+
+
+def columns(fields):
+    return [getattr(Mahasiswa, f) for f in fields]
+
+
+def row_to_dict(fields, row):
+    return dict(zip(fields, row))
+
+
+def _default(obj):
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    raise TypeError('%r is not JSON serializable' % (obj,))
+
+
+if orjson is not None:
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+    # bytes body request -> objek; error decode adalah ValueError
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'), default=_default)
+
+    def dumps(obj):
+        return _encoder.encode(obj).encode('utf-8')
+
+    loads = json.loads
+
+
+def json_response(payload, status=200):
+    """Response JSON yang di-encode langsung, melewati renderer Pyramid."""
+    return Response(
+        body=dumps(payload),
+        status=status,
+        content_type='application/json',
+        charset='utf-8',
+    )
@@ -0,0 +1,131 @@
+"""Tween single-flight: GET identik yang datang bersamaan berbagi satu fetch.
+
+Saat ribuan client meminta ``GET /api/mahasiswa/{id}`` yang sama di waktu
+yang sama, hanya request pertama (leader) yang diteruskan ke view dan
+database; request lain dengan kunci yang sama (follower) menunggu leader
+selesai lalu menerima salinan response-nya tanpa membuka session.
+
+Kunci = path + query string + header yang mengubah response (Accept,
+Accept-Encoding, If-None-Match, Authorization, Cookie). Hanya response
+utuh (body sudah di memori, bukan stream ``app_iter``) dengan status di
+bawah 500 yang dibagi; selain itu, atau jika leader gagal / lebih lama
+dari ``timeout``, follower menjalankan request-nya sendiri.
+
+Settings::
+
+    mahasiswa.singleflight.enabled = true
+    mahasiswa.singleflight.paths = /api/mahasiswa
+    mahasiswa.singleflight.timeout = 10
+"""
+import threading
+
+from pyramid.response import Response
+from pyramid.settings import asbool, aslist
+
+VARY_HEADERS = ('Accept', 'Accept-Encoding', 'If-None-Match',
+                'Authorization', 'Cookie')
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+class SingleFlight(object):
+    """Kelompok panggilan in-flight per kunci."""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.leaders = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, shareable):
+        """Jalankan ``fn()`` sekali per kunci yang sedang in-flight.
+
+        Mengembalikan ``(response, shared)``; ``shared`` True berarti
+        response adalah salinan hasil leader.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+        if leader:
+            try:
+                response = fn()
+                if shareable(response):
+                    # salinan dibuat sebelum tween luar mengubah header leader
+                    call.response = copy_response(response)
+                return response, False
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.done.wait(self.timeout) and call.response is not None:
+            with self._lock:
+                self.shared += 1
+            return copy_response(call.response), True
+        return fn(), False
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'shared': self.shared,
+            }
+
+
+def copy_response(response):
+    """Salinan response (HTTPException seperti 304 tidak bisa ``.copy()``)."""
+    return Response(status=response.status,
+                    headerlist=list(response.headerlist),
+                    body=response.body)
+
+
+def request_key(request):
+    headers = request.headers
+    return '\n'.join([request.path_qs] + [
+        headers.get(name, '') for name in VARY_HEADERS])
+
+
+def shareable(response):
+    return (response.status_int < 500
+            and isinstance(response.app_iter, list))
+
+
+def singleflight_tween_factory(handler, registry):
+    flight = registry.get('singleflight')
+    if flight is None:
+        return handler
+    paths = tuple(aslist(registry.settings.get(
+        'mahasiswa.singleflight.paths', '/api/mahasiswa')))
+
+    def singleflight_tween(request):
+        if request.method != 'GET' or not request.path.startswith(paths):
+            return handler(request)
+        response, shared = flight.do(
+            request_key(request), lambda: handler(request), shareable)
+        if shared:
+            response.headers['X-Singleflight'] = 'shared'
+        return response
+
+    return singleflight_tween
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if asbool(settings.get('mahasiswa.singleflight.enabled', True)):
+        config.registry['singleflight'] = SingleFlight(
+            timeout=float(settings.get('mahasiswa.singleflight.timeout', 10)))
+    # di luar pyramid_tm: follower tidak membuka transaksi / session
+    config.add_tween(
+        'pyramid_mahasiswa.singleflight.singleflight_tween_factory',
+        over='pyramid_tm.tm_tween_factory',
+    )
@@ -0,0 +1,115 @@
+"""Tween profiling SQL per request.
+
+Menghitung jumlah statement, total waktu DB dan statement paling lambat
+untuk setiap request lewat event ``before/after_cursor_execute``, lalu
+mengirimnya sebagai header ``Server-Timing`` dan satu baris log JSON.
+Jumlah statement di atas ``sql_profiler.warn_threshold`` dicatat sebagai
+warning supaya pola N+1 kelihatan di production.
+
+Settings::
+
+    sql_profiler.enabled = true
+    sql_profiler.warn_threshold = 20
+"""
+import contextvars
+import json
+import logging
+import time
+
+from pyramid.settings import asbool
+from pyramid.tweens import INGRESS
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('sql_profiler_stats', default=None)
+
+
+class QueryStats(object):
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed >= self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self):
+        return 'db;dur=%.2f;desc="%d queries", db-slowest;dur=%.2f' % (
+            self.total * 1000, self.count, self.slowest * 1000)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    stats = _current.get()
+    starts = conn.info.get('query_start')
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, 'before_cursor_execute',
+                          _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def sql_profiler_tween_factory(handler, registry):
+    settings = registry.settings
+    if not asbool(settings.get('sql_profiler.enabled', True)):
+        return handler
+    threshold = int(settings.get('sql_profiler.warn_threshold', 20))
+    instrument_engine(registry['dbsession_factory'].kw['bind'])
+    router = registry.get('db_router')
+    for replica in (router.replicas if router is not None else ()):
+        instrument_engine(replica.engine)
+
+    def sql_profiler_tween(request):
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            response = handler(request)
+        finally:
+            _current.reset(token)
+        response.headers['Server-Timing'] = stats.server_timing()
+
+        route = request.matched_route.name if request.matched_route else None
+        line = json.dumps({
+            'event': 'sql_profile',
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_int,
+            'queries': stats.count,
+            'db_ms': round(stats.total * 1000, 3),
+            'slowest_ms': round(stats.slowest * 1000, 3),
+            'slowest': (stats.slowest_statement or '')[:200],
+        })
+        if stats.count > threshold:
+            log.warning(line)
+        else:
+            log.info(line)
+        return response
+
+    return sql_profiler_tween
+
+
+def includeme(config):
+    # paling luar supaya commit pyramid_tm dan exception view ikut terhitung
+    config.add_tween(
+        'pyramid_mahasiswa.sql_profiler.sql_profiler_tween_factory',
+        under=INGRESS,
+    )
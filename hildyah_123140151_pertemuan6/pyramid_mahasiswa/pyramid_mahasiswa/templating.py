@@ -0,0 +1,48 @@
+"""Renderer ``.jinja2`` yang disiapkan saat template pertama dirender.
+
+Hanya halaman home dan 404 yang memakai template, jadi impor jinja2 /
+pyramid_jinja2 dan pembuatan Environment ditunda dari start-up worker ke
+render pertama. Setting ``jinja2.*`` dibaca sama seperti
+``config.include('pyramid_jinja2')``.
+"""
+import threading
+
+from pyramid.path import DottedNameResolver
+
+SETTINGS_PREFIX = 'jinja2.'
+
+
+class LazyJinja2RendererFactory(object):
+
+    def __init__(self, settings, package):
+        self.settings = settings
+        self.package = package
+        self._factory = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._factory is None:
+                import pyramid_jinja2
+
+                resolver = DottedNameResolver(package=self.package)
+                loader_opts = pyramid_jinja2.parse_loader_options_from_settings(
+                    self.settings, SETTINGS_PREFIX, resolver.maybe_resolve,
+                    self.package)
+                env_opts = pyramid_jinja2.parse_env_options_from_settings(
+                    self.settings, SETTINGS_PREFIX, resolver.maybe_resolve,
+                    self.package)
+                factory = pyramid_jinja2.Jinja2RendererFactory()
+                factory.environment = (
+                    pyramid_jinja2.create_environment_from_options(
+                        env_opts, loader_opts))
+                self._factory = factory
+        return self._factory
+
+    def __call__(self, info):
+        return (self._factory or self._load())(info)
+
+
+def includeme(config):
+    config.add_renderer('.jinja2', LazyJinja2RendererFactory(
+        config.get_settings(), config.package))
@@ -63,3 +63,1415 @@ class TestMyViewFailureCondition(BaseTest):
         from .views.default import my_view
         info = my_view(dummy_request(self.session))
         self.assertEqual(info.status_int, 500)
+
+
+class MahasiswaTest(BaseTest):
+
+    def setUp(self):
+        super(MahasiswaTest, self).setUp()
+        self.init_database()
+
+        from .models import Mahasiswa
+
+        for i in range(1, 6):
+            self.session.add(Mahasiswa(
+                nim='1231401%02d' % i,
+                nama='Mahasiswa %d' % i,
+                jurusan='Teknik Informatika',
+            ))
+        self.session.flush()
+
+    def list_request(self, **params):
+        request = dummy_request(self.session)
+        request.params = params
+        return request
+
+
+class TestMahasiswaList(MahasiswaTest):
+
+    def test_keyset_pages(self):
+        from .views.mahasiswa import mahasiswa_list
+        first = mahasiswa_list(self.list_request(limit='2')).json_body
+        self.assertEqual([m['id'] for m in first['data']], [1, 2])
+        self.assertEqual(first['next_after'], 2)
+
+        last = mahasiswa_list(
+            self.list_request(limit='2', after='4')).json_body
+        self.assertEqual([m['id'] for m in last['data']], [5])
+        self.assertIsNone(last['next_after'])
+
+    def test_sparse_fields(self):
+        from .views.mahasiswa import mahasiswa_list
+        res = mahasiswa_list(self.list_request(limit='1', fields='nim'))
+        self.assertEqual(res.json_body['data'], [{'id': 1, 'nim': '123140101'}])
+
+        res = mahasiswa_list(self.list_request(fields='password'))
+        self.assertEqual(res.status_int, 400)
+
+    def test_invalid_limit(self):
+        from .views.mahasiswa import mahasiswa_list
+        res = mahasiswa_list(self.list_request(limit='abc'))
+        self.assertEqual(res.status_int, 400)
+
+    def test_ndjson_stream(self):
+        import json
+        from .models import get_session_factory
+        from .views.mahasiswa import mahasiswa_list
+
+        # stream memakai session sendiri, jadi data harus sudah di-commit
+        transaction.commit()
+        self.config.registry['dbsession_factory'] = get_session_factory(
+            self.engine)
+
+        res = mahasiswa_list(self.list_request(stream='1', after='1'))
+        self.assertEqual(res.content_type, 'application/x-ndjson')
+        rows = [json.loads(line) for line in res.app_iter]
+        self.assertEqual([r['id'] for r in rows], [2, 3, 4, 5])
+
+
+class TestMahasiswaDetail(MahasiswaTest):
+
+    def detail_request(self, mhs_id, **params):
+        request = self.list_request(**params)
+        request.matchdict = {'id': mhs_id}
+        return request
+
+    def test_found(self):
+        from datetime import date
+        from .models import Mahasiswa
+        from .views.mahasiswa import mahasiswa_detail
+        self.session.query(Mahasiswa).get(2).tanggal_lahir = date(2004, 3, 1)
+        self.session.flush()
+
+        res = mahasiswa_detail(self.detail_request('2'))
+        self.assertEqual(res.json_body['data']['tanggal_lahir'], '2004-03-01')
+
+    def test_not_found(self):
+        from .views.mahasiswa import mahasiswa_detail
+        self.assertEqual(mahasiswa_detail(self.detail_request('99')).status_int, 404)
+        self.assertEqual(mahasiswa_detail(self.detail_request('x')).status_int, 404)
+
+
+class TestMahasiswaBulk(MahasiswaTest):
+
+    def bulk_request(self, body, **params):
+        import json
+        request = dummy_request(self.session)
+        request.body = json.dumps(body).encode('utf-8')
+        request.content_type = 'application/json'
+        request.params = params
+        request.tm = transaction.manager
+        return request
+
+    def count(self):
+        from .models import Mahasiswa
+        return self.session.query(Mahasiswa).count()
+
+    def test_skip_existing(self):
+        from .views.mahasiswa import mahasiswa_bulk
+        res = mahasiswa_bulk(self.bulk_request([
+            {'nim': '123140101', 'nama': 'Lama', 'jurusan': 'TI'},
+            {'nim': '999', 'nama': 'Baru', 'jurusan': 'SI',
+             'tanggal_lahir': '2003-01-02'},
+            {'nim': '999', 'nama': 'Dobel', 'jurusan': 'SI'},
+            {'nama': 'Tanpa NIM', 'jurusan': 'SI'},
+        ]))
+        self.assertEqual(res['inserted'], 1)
+        self.assertEqual(
+            sorted(r['index'] for r in res['rejected']), [0, 2, 3])
+        self.assertEqual(self.count(), 6)
+
+    def test_upsert_existing(self):
+        from .models import Mahasiswa
+        from .views.mahasiswa import mahasiswa_bulk
+        res = mahasiswa_bulk(self.bulk_request(
+            [{'nim': '123140101', 'nama': 'Diganti', 'jurusan': 'SI'}],
+            on_conflict='upsert',
+        ))
+        self.assertEqual((res['inserted'], res['updated']), (0, 1))
+        self.session.expire_all()
+        mhs = self.session.query(Mahasiswa).filter_by(nim='123140101').one()
+        self.assertEqual(mhs.nama, 'Diganti')
+
+    def test_conflicts_resolved_by_database(self):
+        from sqlalchemy import event
+        from .views.mahasiswa import mahasiswa_bulk
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        engine = self.session.get_bind()
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            res = mahasiswa_bulk(self.bulk_request([
+                {'nim': '123140101', 'nama': 'Diganti', 'jurusan': 'SI'},
+                {'nim': '777', 'nama': 'Baru', 'jurusan': 'SI'},
+            ], on_conflict='upsert'))
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        self.assertEqual((res['inserted'], res['updated']), (1, 1))
+        # tanpa SELECT lebih dulu, jadi tidak ada celah untuk insert lain
+        inserts = [st for st in statements if 'INTO mahasiswa ' in st]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('ON CONFLICT', inserts[0])
+        self.assertFalse([st for st in statements
+                          if st.startswith('SELECT mahasiswa.nim')])
+
+    def test_fail_on_conflict(self):
+        from .views.mahasiswa import mahasiswa_bulk
+        res = mahasiswa_bulk(self.bulk_request(
+            [{'nim': '123140101', 'nama': 'Lama', 'jurusan': 'TI'}],
+            on_conflict='fail',
+        ))
+        self.assertEqual(res.status_int, 409)
+        self.assertTrue(transaction.manager.isDoomed())
+
+
+class FunctionalTest(unittest.TestCase):
+    settings = {}
+
+    def setUp(self):
+        from webtest import TestApp
+        from . import main
+        from .models.meta import Base
+
+        settings = {'sqlalchemy.url': 'sqlite://'}
+        settings.update(self.settings)
+        app = main({}, **settings)
+        self.engine = app.registry['dbsession_factory'].kw['bind']
+        Base.metadata.create_all(self.engine)
+        self.registry = app.registry
+        self.testapp = TestApp(app)
+
+    def tearDown(self):
+        from .models.meta import Base
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+
+    def add(self, nim, **data):
+        data.setdefault('nama', 'Mahasiswa %s' % nim)
+        data.setdefault('jurusan', 'Teknik Informatika')
+        return self.testapp.post_json('/api/mahasiswa', dict(data, nim=nim))
+
+
+class TestResponseCache(FunctionalTest):
+
+    def test_memory_backend(self):
+        from .cache import LRUCache
+        self.assertIsInstance(self.registry['mahasiswa_cache'], LRUCache)
+        self.check_invalidation()
+
+    def test_local_redis_backend(self):
+        from .cache import RedisCache, cache_from_settings
+        self.registry['mahasiswa_cache'] = cache_from_settings({
+            'mahasiswa.cache.backend': 'redis',
+            'mahasiswa.cache.redis_url': 'local://',
+        })
+        self.assertIsInstance(self.registry['mahasiswa_cache'], RedisCache)
+        self.check_invalidation()
+
+    def check_invalidation(self):
+        self.add('1001')
+        res = self.testapp.get('/api/mahasiswa/1')
+        self.assertEqual(res.headers['X-Cache'], 'MISS')
+        res = self.testapp.get('/api/mahasiswa/1')
+        self.assertEqual(res.headers['X-Cache'], 'HIT')
+        self.assertEqual(res.json['data']['nim'], '1001')
+
+        self.assertEqual(len(self.testapp.get('/api/mahasiswa').json['data']), 1)
+        self.add('1002')
+        res = self.testapp.get('/api/mahasiswa')
+        self.assertEqual(res.headers['X-Cache'], 'MISS')
+        self.assertEqual(len(res.json['data']), 2)
+
+        self.testapp.delete('/api/mahasiswa/1')
+        self.testapp.get('/api/mahasiswa/1', status=404)
+
+    def test_non_canonical_id_is_invalidated(self):
+        self.add('1001')
+        self.assertEqual(self.testapp.get('/api/mahasiswa/01').json['data']
+                         ['nama'], 'Mahasiswa 1001')
+        self.testapp.patch_json('/api/mahasiswa/1', {'nama': 'Baru'})
+        res = self.testapp.get('/api/mahasiswa/01')
+        self.assertEqual(res.json['data']['nama'], 'Baru')
+
+    def test_lru_eviction(self):
+        from .cache import LRUCache
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+        # pembaca yang mulai sebelum invalidasi tidak boleh menyimpan data lama
+        epoch = cache.epoch()
+        cache.delete_prefix('a')
+        cache.set('a', 'stale', epoch=epoch)
+        self.assertIsNone(cache.get('a'))
+
+
+class TestConditionalGet(FunctionalTest):
+    settings = {'mahasiswa.cache.backend': 'none'}
+
+    def test_detail_etag(self):
+        self.add('2001')
+        res = self.testapp.get('/api/mahasiswa/1')
+        etag = res.headers['ETag']
+        self.testapp.get('/api/mahasiswa/1',
+                         headers={'If-None-Match': etag}, status=304)
+        # fields berbeda = representasi berbeda
+        other = self.testapp.get('/api/mahasiswa/1?fields=nim')
+        self.assertNotEqual(other.headers['ETag'], etag)
+
+    def test_detail_etag_after_id_reuse(self):
+        self.add('2001')
+        etag = self.testapp.get('/api/mahasiswa/1').headers['ETag']
+        self.testapp.delete('/api/mahasiswa/1')
+        # SQLite tanpa AUTOINCREMENT memakai ulang id 1 dengan version=1
+        self.assertEqual(self.add('2002').json['id'], 1)
+        res = self.testapp.get('/api/mahasiswa/1',
+                               headers={'If-None-Match': etag}, status=200)
+        self.assertEqual(res.json['data']['nim'], '2002')
+
+    def test_list_etag_changes_on_write(self):
+        self.add('2001')
+        etag = self.testapp.get('/api/mahasiswa').headers['ETag']
+        self.testapp.get('/api/mahasiswa',
+                         headers={'If-None-Match': etag}, status=304)
+        self.add('2002')
+        res = self.testapp.get('/api/mahasiswa',
+                               headers={'If-None-Match': etag}, status=200)
+        self.assertEqual(len(res.json['data']), 2)
+
+    def test_cached_etag(self):
+        from .cache import LRUCache
+        self.registry['mahasiswa_cache'] = LRUCache()
+        self.add('2001')
+        etag = self.testapp.get('/api/mahasiswa/1').headers['ETag']
+        res = self.testapp.get('/api/mahasiswa/1',
+                               headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(res.headers['X-Cache'], 'HIT')
+
+
+class TestViewRegistration(FunctionalTest):
+
+    def test_every_route_has_a_view(self):
+        introspector = self.registry.introspector
+        routes = {i['introspectable']['name']
+                  for i in introspector.get_category('routes')}
+        viewed = {i['introspectable']['route_name']
+                  for i in introspector.get_category('views')}
+        self.assertEqual(routes - viewed, set())
+
+    def test_not_found_page(self):
+        # renderer jinja2 baru disiapkan di sini (lazy)
+        res = self.testapp.get('/tidak-ada', status=404)
+        self.assertIn('404', res.text)
+
+
+class TestMahasiswaUpdate(FunctionalTest):
+
+    def setUp(self):
+        super(TestMahasiswaUpdate, self).setUp()
+        self.add('3001', alamat='Lampung')
+        self.add('3002')
+        self.testapp.patch_json('/api/mahasiswa/1',
+                                {'tanggal_lahir': '2003-04-05'})
+
+    def test_patch_only_changed_columns(self):
+        res = self.testapp.patch_json('/api/mahasiswa/1', {'nama': 'Baru'})
+        self.assertEqual(res.json['data']['nama'], 'Baru')
+        self.assertEqual(res.json['data']['alamat'], 'Lampung')
+        self.assertEqual(res.json['data']['tanggal_lahir'], '2003-04-05')
+
+    def test_put_replaces_row(self):
+        res = self.testapp.put_json('/api/mahasiswa/1', {
+            'nim': '3001', 'nama': 'Ganti', 'jurusan': 'SI'})
+        self.assertIsNone(res.json['data']['alamat'])
+
+        self.testapp.put_json('/api/mahasiswa/1', {'nama': 'X'}, status=422)
+        self.testapp.put_json('/api/mahasiswa/99', {
+            'nim': '1', 'nama': 'X', 'jurusan': 'SI'}, status=404)
+
+    def test_update_bumps_version(self):
+        etag = self.testapp.get('/api/mahasiswa/1').headers['ETag']
+        self.testapp.patch_json('/api/mahasiswa/1', {'alamat': 'Bandung'})
+        res = self.testapp.get('/api/mahasiswa/1',
+                               headers={'If-None-Match': etag}, status=200)
+        self.assertEqual(res.json['data']['alamat'], 'Bandung')
+
+    def test_bulk_patch(self):
+        res = self.testapp.patch_json('/api/mahasiswa', [
+            {'id': 1, 'jurusan': 'SI'},
+            {'id': 2, 'jurusan': 'SI'},
+            {'id': 2, 'nim': ''},
+            {'jurusan': 'tanpa id'},
+            {'id': 99, 'jurusan': 'SI'},
+            {'id': 2 ** 40, 'jurusan': 'SI'},
+            {'id': True, 'jurusan': 'bool'},
+        ])
+        self.assertEqual(res.json['updated'], 2)
+        rejected = res.json['rejected']
+        self.assertEqual([r['index'] for r in rejected], [2, 3, 4, 5, 6])
+        self.assertEqual([r.get('id') for r in rejected[2:4]], [99, 2 ** 40])
+        self.assertEqual(rejected[2]['error'], 'id tidak ditemukan')
+        self.assertEqual(rejected[4]['error'], 'id wajib diisi')
+        data = self.testapp.get('/api/mahasiswa').json['data']
+        self.assertEqual({m['jurusan'] for m in data}, {'SI'})
+
+
+class TestPoolMetrics(FunctionalTest):
+
+    def test_metrics_endpoint(self):
+        self.testapp.get('/api/mahasiswa')
+        pool = self.testapp.get('/_metrics').json['pool']
+        self.assertGreaterEqual(pool['checkouts'], 1)
+        self.assertEqual(pool['checkouts'], pool['checkins'])
+
+    def test_poolclass_setting(self):
+        from sqlalchemy.pool import StaticPool
+        from .models import get_engine
+        engine = get_engine({'sqlalchemy.url': 'sqlite://',
+                             'sqlalchemy.poolclass': 'StaticPool'})
+        self.assertIsInstance(engine.pool, StaticPool)
+        with self.assertRaises(ValueError):
+            get_engine({'sqlalchemy.url': 'sqlite://',
+                        'sqlalchemy.poolclass': 'BogusPool'})
+
+
+class TestMahasiswaSearch(FunctionalTest):
+
+    def setUp(self):
+        super(TestMahasiswaSearch, self).setUp()
+        self.add('4001', nama='Budi Santoso', jurusan='Teknik Informatika')
+        self.add('4002', nama='Siti Aminah', jurusan='Sistem Informasi')
+        self.add('4003', nama='Santi Budiman', jurusan='Sistem Informasi')
+
+    def search(self, **params):
+        res = self.testapp.get('/api/mahasiswa/search', params=params)
+        return [m['nim'] for m in res.json['data']]
+
+    def test_name_prefix(self):
+        self.assertEqual(self.search(q='bud'), ['4001', '4003'])
+        self.assertEqual(self.search(q='SANT'), ['4001', '4003'])
+        self.assertEqual(self.search(q='amin "x'), [])
+
+    def test_jurusan_and_name(self):
+        self.assertEqual(self.search(jurusan='Sistem Informasi'), ['4002', '4003'])
+        self.assertEqual(
+            self.search(jurusan='Sistem Informasi', q='budi'), ['4003'])
+
+    def test_fts_follows_updates(self):
+        self.testapp.patch_json('/api/mahasiswa/2', {'nama': 'Rina Wati'})
+        self.testapp.delete('/api/mahasiswa/1')
+        self.assertEqual(self.search(q='rina'), ['4002'])
+        self.assertEqual(self.search(q='budi'), ['4003'])
+
+    def test_requires_filter(self):
+        self.testapp.get('/api/mahasiswa/search', status=400)
+        for limit in ('0', '-1'):
+            self.testapp.get('/api/mahasiswa/search',
+                             params={'q': 'budi', 'limit': limit}, status=400)
+
+    def explain(self, **kw):
+        from .serializers import FIELDS
+        from .views.mahasiswa import search_statement
+        stmt = search_statement('sqlite', FIELDS, **kw)
+        sql = str(stmt.compile(dialect=self.engine.dialect,
+                               compile_kwargs={'literal_binds': True}))
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql).all()
+        return ' | '.join(row[-1] for row in rows)
+
+    def test_autogenerate_ignores_fts_tables(self):
+        from alembic.autogenerate import compare_metadata
+        from alembic.migration import MigrationContext
+        from .models.mahasiswa import alembic_include_object
+        from .models.meta import Base
+
+        def removed(**opts):
+            with self.engine.connect() as conn:
+                diff = compare_metadata(
+                    MigrationContext.configure(conn, opts=opts), Base.metadata)
+            return [d[1].name for d in diff if d[0] == 'remove_table']
+        self.assertIn('mahasiswa_fts', removed())
+        self.assertEqual(removed(include_object=alembic_include_object), [])
+
+    def test_explain_uses_indexes(self):
+        plan = self.explain(jurusan='Sistem Informasi')
+        self.assertIn('USING INDEX ix_mahasiswa_jurusan', plan)
+
+        plan = self.explain(q='budi')
+        self.assertIn('mahasiswa_fts VIRTUAL TABLE INDEX', plan)
+        self.assertIn('SEARCH mahasiswa USING INTEGER PRIMARY KEY', plan)
+
+
+class TestMahasiswaStats(FunctionalTest):
+    settings = {'mahasiswa.cache.backend': 'none'}
+
+    def stats(self):
+        data = self.testapp.get('/api/mahasiswa/stats').json['data']
+        return [(d['jurusan'], d['tahun_lahir'], d['jumlah']) for d in data]
+
+    def test_incremental_updates(self):
+        self.testapp.post_json('/api/mahasiswa/bulk', [
+            {'nim': '9201', 'nama': 'A', 'jurusan': 'TI', 'tanggal_lahir': '2001-02-03'},
+            {'nim': '9202', 'nama': 'B', 'jurusan': 'TI', 'tanggal_lahir': '2001-12-01'},
+            {'nim': '9203', 'nama': 'C', 'jurusan': 'SI'},
+        ])
+        self.assertEqual(self.stats(), [('SI', None, 1), ('TI', 2001, 2)])
+
+        self.testapp.patch_json('/api/mahasiswa/2', {'jurusan': 'SI'})
+        self.testapp.patch_json('/api/mahasiswa/3', {'nama': 'C2'})
+        self.assertEqual(self.stats(),
+                         [('SI', None, 1), ('SI', 2001, 1), ('TI', 2001, 1)])
+
+        self.testapp.delete('/api/mahasiswa/1')
+        self.testapp.post_json('/api/mahasiswa/bulk?on_conflict=upsert', [
+            {'nim': '9203', 'nama': 'C', 'jurusan': 'SI', 'tanggal_lahir': '2002-01-01'},
+        ])
+        res = self.testapp.get('/api/mahasiswa/stats')
+        self.assertEqual(res.json['per_jurusan'], {'SI': 2})
+        self.assertEqual(res.json['total'], 2)
+        self.assertEqual(self.stats(), [('SI', 2001, 1), ('SI', 2002, 1)])
+
+        self.testapp.get('/api/mahasiswa/stats', status=304,
+                         headers={'If-None-Match': res.headers['ETag']})
+        filtered = self.testapp.get('/api/mahasiswa/stats', params={'jurusan': 'TI'})
+        self.assertEqual(filtered.json['data'], [])
+
+
+class TestMahasiswaChanges(FunctionalTest):
+    settings = {'mahasiswa.changes.poll_interval': '0.05'}
+
+    def changes(self, **params):
+        return self.testapp.get('/api/mahasiswa/changes', params=params).json
+
+    def test_incremental_sync(self):
+        self.testapp.post_json('/api/mahasiswa/bulk', [
+            {'nim': '9301', 'nama': 'A', 'jurusan': 'TI'},
+            {'nim': '9302', 'nama': 'B', 'jurusan': 'TI'},
+        ])
+        res = self.changes()
+        self.assertEqual([(d['op'], d['nim']) for d in res['data']],
+                         [('insert', '9301'), ('insert', '9302')])
+        self.assertEqual(res['data'][0]['data']['nama'], 'A')
+        since = res['next_since']
+
+        self.testapp.patch_json('/api/mahasiswa/1', {'nama': 'A2'})
+        self.testapp.delete('/api/mahasiswa/2')
+        res = self.changes(since=since, fields='nama')
+        self.assertEqual(
+            [(d['op'], d['id'], d['data']) for d in res['data']],
+            [('update', 1, {'id': 1, 'nama': 'A2'}), ('delete', 2, None)])
+        self.assertEqual(self.changes(since=res['next_since'])['data'], [])
+        self.assertEqual(
+            self.changes(since=res['next_since'])['next_since'],
+            res['next_since'])
+
+        self.testapp.get('/api/mahasiswa/changes', params={'since': 'x'},
+                         status=400)
+
+    def test_long_poll_times_out(self):
+        import time
+        start = time.monotonic()
+        res = self.changes(since=0, wait='0.2')
+        self.assertEqual(res['data'], [])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_compact_and_purge(self):
+        from . import changes
+
+        self.testapp.post_json('/api/mahasiswa/bulk', [
+            {'nim': '9301', 'nama': 'A', 'jurusan': 'TI'},
+            {'nim': '9302', 'nama': 'B', 'jurusan': 'TI'},
+        ])
+        self.testapp.patch_json('/api/mahasiswa/1', {'nama': 'A2'})
+        self.testapp.patch_json('/api/mahasiswa/1', {'nama': 'A3'})
+
+        session = self.registry['dbsession_factory']()
+        self.assertEqual(changes.compact(session), 2)
+        session.commit()
+        self.assertEqual(
+            [(d['seq'], d['op']) for d in self.changes()['data']],
+            [(2, 'insert'), (4, 'update')])
+
+        self.assertEqual(
+            changes.purge(session, changes.retention_cutoff(-1)), 2)
+        session.commit()
+        session.close()
+        res = self.testapp.get('/api/mahasiswa/changes', params={'since': 3},
+                               status=410)
+        self.assertEqual(res.json['min_since'], 4)
+        self.assertEqual(self.changes(since=4)['data'], [])
+
+        # seq tidak dipakai ulang setelah log kosong
+        self.testapp.patch_json('/api/mahasiswa/2', {'nama': 'B2'})
+        self.assertEqual(
+            [d['seq'] for d in self.changes(since=4)['data']], [5])
+
+
+class TestChangesLongPoll(FunctionalTest):
+
+    def setUp(self):
+        import os
+        import tempfile
+        fd, self.path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.settings = {'sqlalchemy.url': 'sqlite:///' + self.path,
+                         'mahasiswa.changes.poll_interval': '5'}
+        super(TestChangesLongPoll, self).setUp()
+
+    def tearDown(self):
+        import os
+        super(TestChangesLongPoll, self).tearDown()
+        os.unlink(self.path)
+
+    def test_wakes_up_on_commit(self):
+        import threading
+        import time
+
+        timer = threading.Timer(0.2, self.testapp.post_json, (
+            '/api/mahasiswa/bulk',
+            [{'nim': '9401', 'nama': 'A', 'jurusan': 'TI'}]))
+        start = time.monotonic()
+        timer.start()
+        res = self.testapp.get('/api/mahasiswa/changes',
+                               params={'wait': '10'}).json
+        timer.join()
+        # dibangunkan commit, bukan poll_interval 5 detik
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertEqual([d['nim'] for d in res['data']], ['9401'])
+
+    def test_waiters_are_capped(self):
+        import threading
+        import time
+        waiters = self.registry['changes_waiters'] = threading.BoundedSemaphore(1)
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(
+            self.testapp.get('/api/mahasiswa/changes',
+                             params={'wait': '1'}).status_int))
+        waiter.start()
+        while waiters._value:
+            time.sleep(0.01)
+        # params beda supaya tidak digabung single-flight
+        res = self.testapp.get('/api/mahasiswa/changes',
+                               params={'wait': '1', 'limit': '10'}, status=503)
+        self.assertEqual(res.headers['Retry-After'], '1')
+        # tanpa wait tidak butuh slot
+        self.testapp.get('/api/mahasiswa/changes', status=200)
+        waiter.join()
+        self.assertEqual(results, [200])
+        self.assertEqual(waiters._value, 1)
+
+    def test_default_max_wait(self):
+        from .changes import DEFAULT_MAX_WAIT
+        self.assertEqual(self.registry['changes_max_wait'], DEFAULT_MAX_WAIT)
+        self.assertLessEqual(DEFAULT_MAX_WAIT, 5)
+
+
+class TestMahasiswaExport(FunctionalTest):
+
+    def setUp(self):
+        super().setUp()
+        for nim in ('9101', '9102', '9103'):
+            self.add(nim)
+
+    def test_csv(self):
+        res = self.testapp.get('/api/mahasiswa/export',
+                               params={'fields': 'nim'})
+        self.assertEqual(res.content_type, 'text/csv')
+        self.assertEqual(res.text.splitlines(),
+                         ['id,nim', '1,9101', '2,9102', '3,9103'])
+
+    def test_ndjson_resume_range(self):
+        import json
+        res = self.testapp.get('/api/mahasiswa/export', params={
+            'format': 'ndjson', 'after': '1', 'until': '2'})
+        rows = [json.loads(line) for line in res.body.splitlines()]
+        self.assertEqual([r['nim'] for r in rows], ['9102'])
+
+    def test_gzip(self):
+        import gzip
+        from webob import Request
+        # webtest men-decode gzip sendiri, jadi panggil app langsung
+        request = Request.blank('/api/mahasiswa/export',
+                                headers={'Accept-Encoding': 'gzip'})
+        res = request.get_response(self.testapp.app)
+        self.assertEqual(res.content_encoding, 'gzip')
+        self.assertIn(b'9103', gzip.decompress(res.body))
+
+    def test_invalid_params(self):
+        self.testapp.get('/api/mahasiswa/export', params={'format': 'xls'},
+                         status=400)
+        self.testapp.get('/api/mahasiswa/export', params={'after': 'x'},
+                         status=400)
+
+    def test_columnar(self):
+        from . import export
+        if export.pyarrow is None:
+            self.testapp.get('/api/mahasiswa/export',
+                             params={'format': 'parquet'}, status=400)
+            return
+        import io
+        res = self.testapp.get('/api/mahasiswa/export',
+                               params={'format': 'parquet'})
+        table = export.pyarrow.parquet.read_table(io.BytesIO(res.body))
+        self.assertEqual(table.column('nim').to_pylist(), ['9101', '9102', '9103'])
+        res = self.testapp.get('/api/mahasiswa/export',
+                               params={'format': 'arrow'})
+        table = export.pyarrow.ipc.open_stream(res.body).read_all()
+        self.assertEqual(table.num_rows, 3)
+
+
+class TestSqlProfiler(FunctionalTest):
+    settings = {
+        'mahasiswa.cache.backend': 'none',
+        'sql_profiler.warn_threshold': '2',
+    }
+
+    def test_server_timing_header(self):
+        self.add('5001')
+        res = self.testapp.get('/api/mahasiswa/1')
+        # SELECT data saja
+        self.assertIn('desc="1 queries"', res.headers['Server-Timing'])
+
+    def test_warns_above_threshold(self):
+        import json
+        with self.assertLogs('pyramid_mahasiswa.sql_profiler', 'INFO') as logs:
+            self.add('5001')
+            self.testapp.get('/api/mahasiswa/1')
+        write, read = [json.loads(r.getMessage()) for r in logs.records]
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        self.assertEqual(write['route'], 'mahasiswa_add')
+        self.assertGreater(write['queries'], 2)
+        self.assertEqual(read['queries'], 1)
+
+
+class TestRouteMetrics(FunctionalTest):
+
+    def test_buckets(self):
+        from .route_metrics import (
+            BUCKETS, MAX_US, RouteStats, bucket_bounds, bucket_index)
+        for us in (0, 15, 16, 17, 1000, 123456, MAX_US):
+            lower, upper = bucket_bounds(bucket_index(us))
+            self.assertTrue(lower <= us < upper)
+            # error relatif maksimal 1/16
+            self.assertLessEqual(upper - lower, max(1, lower / 16))
+        self.assertEqual(bucket_index(MAX_US * 2), bucket_index(MAX_US))
+        self.assertLess(bucket_index(MAX_US), BUCKETS)
+
+        stats = RouteStats()
+        for ms in range(1, 101):
+            stats.counts[bucket_index(ms * 1000)] += 1
+            stats.count += 1
+        self.assertAlmostEqual(stats.quantile(0.5), 0.05, delta=0.05 / 16)
+        self.assertAlmostEqual(stats.quantile(0.99), 0.099, delta=0.099 / 16)
+
+    def test_json_snapshot(self):
+        self.add('6001')
+        for _ in range(3):
+            self.testapp.get('/api/mahasiswa')
+        routes = self.testapp.get('/_metrics').json['routes']
+        self.assertEqual(routes['mahasiswa_list']['count'], 3)
+        self.assertGreater(routes['mahasiswa_list']['bytes_out'], 0)
+        self.assertGreater(routes['mahasiswa_add']['bytes_in'], 0)
+        self.assertIsNotNone(routes['mahasiswa_list']['p50_ms'])
+
+    def test_prometheus_text(self):
+        self.testapp.get('/api/mahasiswa')
+        self.testapp.get('/tidak-ada', status=404)
+        res = self.testapp.get('/_metrics', params={'format': 'prometheus'})
+        self.assertEqual(res.content_type, 'text/plain')
+        text = res.text
+        self.assertIn('http_request_duration_seconds_bucket'
+                      '{route="mahasiswa_list",le="+Inf"} 1', text)
+        self.assertIn('http_request_latency_seconds'
+                      '{route="mahasiswa_list",quantile="0.99"}', text)
+        self.assertIn('http_response_bytes_total{route="mahasiswa_list"}', text)
+        self.assertIn('http_request_duration_seconds_count{route="-"} 1', text)
+        self.assertIn('db_pool_checkouts ', text)
+        res = self.testapp.get('/_metrics', headers={'Accept': 'text/plain'})
+        self.assertIn('# TYPE http_request_bytes_total counter', res.text)
+
+    def test_streamed_bytes(self):
+        self.add('6001')
+        res = self.testapp.get('/api/mahasiswa/export',
+                               params={'format': 'ndjson'})
+        routes = self.registry['route_metrics'].snapshot()
+        self.assertEqual(routes['mahasiswa_export']['bytes_out'],
+                         len(res.body))
+
+    def test_disabled(self):
+        from webtest import TestApp
+        from . import main
+        app = main({}, **{'sqlalchemy.url': 'sqlite://',
+                          'route_metrics.enabled': 'false'})
+        self.assertNotIn('route_metrics', app.registry)
+        res = TestApp(app).get('/_metrics', params={'format': 'prometheus'})
+        self.assertNotIn('routes', res.json)
+
+
+class TestAsgiApp(unittest.TestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+        from .asgi import main
+        from .models.meta import Base
+
+        fd, self.path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.app = main({}, **{
+            'sqlalchemy.url': 'sqlite:///' + self.path,
+            'mahasiswa.cache.backend': 'none',
+        })
+        engine = self.app.wsgi_app.registry['dbsession_factory'].kw['bind']
+        Base.metadata.create_all(engine)
+
+    def tearDown(self):
+        import asyncio
+        import os
+        asyncio.run(self.app.engine.dispose())
+        os.unlink(self.path)
+
+    def request(self, method, path, query=b'', body=b'', headers=()):
+        import asyncio
+        messages = []
+        incoming = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            return incoming.pop(0) if incoming else {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'root_path': '', 'query_string': query, 'server': ('testserver', 80),
+            'client': ('127.0.0.1', 1234),
+            'headers': [(b'host', b'testserver')] + list(headers),
+        }
+        asyncio.run(self.app(scope, receive, send))
+        status = messages[0]['status']
+        body = b''.join(m.get('body', b'') for m in messages[1:])
+        return status, dict(messages[0]['headers']), body
+
+    def test_async_reads_and_wsgi_writes(self):
+        import json
+        body = json.dumps({'nim': '6001', 'nama': 'Async', 'jurusan': 'TI'})
+        status, _, _ = self.request(
+            'POST', '/api/mahasiswa', body=body.encode(),
+            headers=[(b'content-type', b'application/json'),
+                     (b'content-length', str(len(body)).encode())])
+        self.assertEqual(status, 200)
+
+        status, headers, body = self.request('GET', '/api/mahasiswa/1')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['data']['nim'], '6001')
+
+        status, _, _ = self.request('GET', '/api/mahasiswa/1',
+                                    headers=[(b'if-none-match', headers[b'etag'])])
+        self.assertEqual(status, 304)
+
+        status, _, body = self.request('GET', '/api/mahasiswa', query=b'fields=nim')
+        self.assertEqual(json.loads(body)['data'], [{'id': 1, 'nim': '6001'}])
+
+        status, _, body = self.request('GET', '/api/mahasiswa', query=b'stream=1')
+        self.assertEqual(json.loads(body.splitlines()[0])['nim'], '6001')
+
+        status, _, _ = self.request('GET', '/api/mahasiswa', query=b'limit=x')
+        self.assertEqual(status, 400)
+        status, _, _ = self.request('GET', '/api/mahasiswa/2')
+        self.assertEqual(status, 404)
+        status, _, _ = self.request('GET', '/api/mahasiswa/%d' % 2 ** 40)
+        self.assertEqual(status, 404)
+
+        routes = self.app.wsgi_app.registry['route_metrics'].snapshot()
+        self.assertEqual(routes['mahasiswa_detail']['count'], 4)
+        self.assertEqual(routes['mahasiswa_list']['count'], 3)
+
+    def test_async_path_is_rate_limited(self):
+        import asyncio
+        from .asgi import main
+        asyncio.run(self.app.engine.dispose())
+        self.app = main({}, **{
+            'sqlalchemy.url': 'sqlite:///' + self.path,
+            'mahasiswa.cache.backend': 'none',
+            'mahasiswa.ratelimit.rate': '1',
+            'mahasiswa.ratelimit.burst': '2',
+        })
+        for i in range(2):
+            status, _, _ = self.request('GET', '/api/mahasiswa/%d' % (i + 1))
+            self.assertEqual(status, 404)
+        status, headers, _ = self.request(
+            'GET', '/api/mahasiswa', headers=[(b'x-forwarded-for', b'9.9.9.9')])
+        self.assertEqual(status, 429)
+        self.assertEqual(headers[b'retry-after'], b'1')
+        registry = self.app.wsgi_app.registry
+        self.assertEqual(registry['ratelimit_stats']['rejected'], 1)
+
+
+class TestReadReplica(unittest.TestCase):
+    """Dua file SQLite sebagai primary dan replica (tanpa replikasi)."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from webtest import TestApp
+        from . import main
+        from .models.meta import Base
+
+        self.tmpdir = tempfile.mkdtemp()
+        app = main({}, **{
+            'sqlalchemy.url': 'sqlite:///' + os.path.join(self.tmpdir, 'primary.sqlite'),
+            'sqlalchemy.replica.r1.url': 'sqlite:///' + os.path.join(self.tmpdir, 'replica.sqlite'),
+            'sqlalchemy.replica.health_check_interval': '0',
+            'mahasiswa.cache.backend': 'none',
+        })
+        self.router = app.registry['db_router']
+        self.replica = self.router.replicas[0]
+        Base.metadata.create_all(self.router.primary)
+        Base.metadata.create_all(self.replica.engine)
+        self.testapp = TestApp(app)
+
+    def tearDown(self):
+        import shutil
+        self.router.primary.dispose()
+        self.replica.engine.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def nims(self):
+        res = self.testapp.get('/api/mahasiswa', params={'fields': 'nim'})
+        return [row['nim'] for row in res.json['data']]
+
+    def test_writes_primary_reads_replica(self):
+        self.testapp.post_json('/api/mahasiswa', {
+            'nim': '7001', 'nama': 'Primary', 'jurusan': 'TI'})
+        # belum "tereplikasi": GET membaca replica yang masih kosong
+        self.assertEqual(self.nims(), [])
+
+        with self.replica.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO mahasiswa (nim, nama, jurusan) "
+                "VALUES ('7001', 'Primary', 'TI')")
+        self.assertEqual(self.nims(), ['7001'])
+        res = self.testapp.get('/api/mahasiswa', params={'stream': '1'})
+        self.assertIn(b'"7001"', res.body)
+
+    def test_replica_responses_are_not_cached(self):
+        from .cache import LRUCache
+        registry = self.testapp.app.registry
+        registry['mahasiswa_cache'] = LRUCache()
+        self.testapp.post_json('/api/mahasiswa', {
+            'nim': '7003', 'nama': 'Primary', 'jurusan': 'TI'})
+        # replica tertinggal: response-nya tidak boleh mengisi cache
+        res = self.testapp.get('/api/mahasiswa', params={'fields': 'nim'})
+        self.assertEqual(res.json['data'], [])
+        self.assertNotIn('X-Cache', res.headers)
+
+        with self.replica.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO mahasiswa (nim, nama, jurusan) "
+                "VALUES ('7003', 'Primary', 'TI')")
+        self.assertEqual(self.nims(), ['7003'])
+
+        # replica tidak sehat -> primary: response boleh disimpan
+        self.replica.healthy = False
+        self.replica.checked_at = float('inf')
+        res = self.testapp.get('/api/mahasiswa', params={'fields': 'nama'})
+        self.assertEqual(res.headers['X-Cache'], 'MISS')
+        res = self.testapp.get('/api/mahasiswa', params={'fields': 'nama'})
+        self.assertEqual(res.headers['X-Cache'], 'HIT')
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        from sqlalchemy import create_engine
+        self.testapp.post_json('/api/mahasiswa', {
+            'nim': '7002', 'nama': 'Primary', 'jurusan': 'TI'})
+        self.replica.engine.dispose()
+        self.replica.engine = create_engine(
+            'sqlite:////nonexistent-dir/replica.sqlite')
+        self.assertEqual(self.nims(), ['7002'])
+        self.assertFalse(self.replica.healthy)
+        res = self.testapp.get('/_metrics')
+        self.assertFalse(res.json['replicas']['r1']['healthy'])
+
+    def test_read_only_view_option(self):
+        from .read_only import is_read_only, read_only_view_deriver
+
+        class Info(object):
+            options = {'read_only': True}
+
+        request = testing.DummyRequest(post={'q': 'x'})
+        self.assertFalse(is_read_only(request))
+        view = read_only_view_deriver(lambda context, request: request, Info())
+        self.assertTrue(is_read_only(view(None, request)))
+
+    def test_bootstrap_script_writes_to_primary(self):
+        import os
+        from sqlalchemy import text
+        from .scripts import initialize_db
+        ini = os.path.join(self.tmpdir, 'test.ini')
+        with open(ini, 'w') as f:
+            f.write('[app:main]\nuse = call:pyramid_mahasiswa:main\n'
+                    'sqlalchemy.url = %s\nsqlalchemy.replica.r1.url = %s\n'
+                    % (self.router.primary.url, self.replica.engine.url))
+        initialize_db.main(['initialize_db', ini])
+
+        def count(engine):
+            with engine.connect() as conn:
+                return conn.execute(
+                    text('SELECT COUNT(*) FROM mahasiswa')).scalar()
+        self.assertEqual(count(self.router.primary), 2)
+        self.assertEqual(count(self.replica.engine), 0)
+
+
+class TestReadOnlyRequests(FunctionalTest):
+
+    def setUp(self):
+        super().setUp()
+        from pyramid.config import Configurator
+        import zope.sqlalchemy
+        from . import models
+
+        def insert_view(request):
+            request.dbsession.execute(models.Mahasiswa.__table__.insert().values(
+                nim=request.params['nim'], nama='X', jurusan='TI'))
+            zope.sqlalchemy.mark_changed(request.dbsession)
+            return {'tm_active': request.environ.get('tm.active', False)}
+
+        config = Configurator(registry=self.registry)
+        config.add_route('probe_default', '/_probe/default')
+        config.add_route('probe_write', '/_probe/write')
+        config.add_view(insert_view, route_name='probe_default', renderer='json')
+        config.add_view(insert_view, route_name='probe_write', renderer='json',
+                        read_only=False)
+        config.commit()
+
+    def nims(self):
+        with self.engine.connect() as conn:
+            return [r[0] for r in conn.exec_driver_sql('SELECT nim FROM mahasiswa')]
+
+    def test_safe_methods_skip_transaction(self):
+        res = self.testapp.get('/_probe/default', params={'nim': '8001'})
+        self.assertFalse(res.json['tm_active'])
+        # session read-only tidak pernah di-commit
+        self.assertEqual(self.nims(), [])
+
+    def test_read_only_false_view_commits(self):
+        res = self.testapp.get('/_probe/write', params={'nim': '8002'})
+        self.assertFalse(res.json['tm_active'])
+        self.assertEqual(self.nims(), ['8002'])
+
+    def test_writes_keep_transaction(self):
+        res = self.testapp.post('/_probe/default', params={'nim': '8003'})
+        self.assertTrue(res.json['tm_active'])
+        self.assertEqual(self.nims(), ['8003'])
+        self.add('8004')
+        self.assertEqual(self.testapp.get('/api/mahasiswa/2').json['data']['nim'], '8004')
+
+    def test_disabled(self):
+        from . import main
+        from webtest import TestApp
+        app = main({}, **{'sqlalchemy.url': 'sqlite://',
+                          'mahasiswa.read_only_requests': 'false'})
+        self.assertNotIn('tm.activate_hook', app.registry.settings)
+        TestApp(app).get('/_metrics', status=200)
+
+
+class TestSingleFlight(FunctionalTest):
+    settings = {'mahasiswa.singleflight.paths': '/_probe/'}
+
+    def setUp(self):
+        super().setUp()
+        import threading
+        from pyramid.config import Configurator
+
+        self.calls = 0
+        self.release = threading.Event()
+
+        def slow_view(request):
+            self.calls += 1
+            self.release.wait(5)
+            return {'n': self.calls}
+
+        config = Configurator(registry=self.registry)
+        config.add_route('probe_slow', '/_probe/slow')
+        config.add_view(slow_view, route_name='probe_slow', renderer='json')
+        config.commit()
+
+    def get_concurrently(self, count, **params):
+        import threading
+        import time
+        results = [None] * count
+
+        def get(i):
+            results[i] = self.testapp.get('/_probe/slow', params=params)
+
+        threads = [threading.Thread(target=get, args=(i,)) for i in range(count)]
+        for t in threads:
+            t.start()
+        while self.registry['singleflight'].snapshot()['in_flight'] == 0:
+            time.sleep(0.01)
+        time.sleep(0.2)  # beri waktu thread lain menunggu leader
+        self.release.set()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_identical_gets_share_one_call(self):
+        results = self.get_concurrently(8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({r.json['n'] for r in results}, {1})
+        shared = [r for r in results if r.headers.get('X-Singleflight') == 'shared']
+        self.assertEqual(len(shared), 7)
+        self.assertEqual(self.registry['singleflight'].snapshot(),
+                         {'in_flight': 0, 'leaders': 1, 'shared': 7})
+
+    def test_different_queries_do_not_share(self):
+        self.release.set()
+        self.testapp.get('/_probe/slow', params={'q': 'a'})
+        self.testapp.get('/_probe/slow', params={'q': 'b'})
+        self.assertEqual(self.calls, 2)
+
+
+class TestRateLimit(FunctionalTest):
+    settings = {
+        'mahasiswa.ratelimit.rate': '1',
+        'mahasiswa.ratelimit.burst': '2',
+        'mahasiswa.ratelimit.key_header': 'X-Api-Key',
+    }
+
+    def test_rejects_when_bucket_is_empty(self):
+        self.testapp.get('/api/mahasiswa')
+        self.testapp.get('/api/mahasiswa')
+        res = self.testapp.get('/api/mahasiswa', status=429)
+        self.assertEqual(res.headers['Retry-After'], '1')
+        self.assertEqual(self.registry['ratelimit_stats']['rejected'], 1)
+
+        # client lain punya bucket sendiri; /_metrics tidak dibatasi
+        self.testapp.get('/api/mahasiswa', headers={'X-Api-Key': 'lain'})
+        self.testapp.get('/_metrics')
+
+    def test_forwarded_for_does_not_create_buckets(self):
+        for i in range(2):
+            self.testapp.get('/api/mahasiswa', headers={
+                'X-Forwarded-For': '9.9.9.%d' % i})
+        self.testapp.get('/api/mahasiswa', status=429, headers={
+            'X-Forwarded-For': '9.9.9.99'})
+
+    def test_memory_bucket_refills(self):
+        from .ratelimit import MemoryBuckets
+        buckets = MemoryBuckets(rate=2, burst=2)
+        self.assertEqual([buckets.take('a', now=0)[0] for _ in range(3)],
+                         [True, True, False])
+        self.assertTrue(buckets.take('a', now=0.5)[0])
+        self.assertFalse(buckets.take('a', now=0.5)[0])
+
+    def test_sqlite_bucket_is_shared(self):
+        import os
+        import tempfile
+        from .ratelimit import SqliteBuckets
+        path = os.path.join(tempfile.mkdtemp(), 'ratelimit.sqlite')
+        first = SqliteBuckets(path, rate=2, burst=2)
+        second = SqliteBuckets(path, rate=2, burst=2)
+        self.assertTrue(first.take('a', now=100)[0])
+        self.assertTrue(second.take('a', now=100)[0])
+        self.assertEqual(first.take('a', now=100), (False, 0))
+        self.assertTrue(second.take('a', now=100.5)[0])
+        os.unlink(path)
+
+
+class TestErrorViews(FunctionalTest):
+    settings = {'mahasiswa.retry.backoff': '0'}
+
+    def setUp(self):
+        super().setUp()
+        from pyramid.config import Configurator
+        from sqlalchemy.exc import OperationalError
+
+        self.calls = 0
+        self.failures = 0
+
+        def flaky_view(request):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise OperationalError(
+                    'UPDATE mahasiswa', {},
+                    Exception('database is locked'))
+            return {'calls': self.calls}
+
+        config = Configurator(registry=self.registry)
+        config.add_route('probe_flaky', '/_probe/flaky')
+        config.add_view(flaky_view, route_name='probe_flaky',
+                        request_method='POST', renderer='json')
+        config.commit()
+
+    def errors(self):
+        return self.testapp.get('/_metrics').json['errors']
+
+    def test_out_of_range_id_is_not_found(self):
+        self.add('1001')
+        for mhs_id in ('99999999999999999999999', '2147483648', '0'):
+            path = '/api/mahasiswa/' + mhs_id
+            self.testapp.get(path, status=404)
+            self.testapp.patch_json(path, {'nama': 'X'}, status=404)
+            self.testapp.put_json(path, {'nim': '1', 'nama': 'X',
+                                         'jurusan': 'TI'}, status=404)
+            self.testapp.delete(path, status=404)
+        self.testapp.delete('/api/mahasiswa/x', status=404)
+        self.testapp.get('/api/mahasiswa/1', status=200)
+
+    def test_duplicate_nim_is_conflict(self):
+        self.assertEqual(self.add('1001').json['id'], 1)
+        res = self.testapp.post_json('/api/mahasiswa', {
+            'nim': '1001', 'nama': 'Lain', 'jurusan': 'SI'}, status=409)
+        self.assertIn('error', res.json)
+        self.assertEqual(self.errors()['mahasiswa_add'],
+                         {'errors': {'409': 1}, 'retries': 0})
+
+    def test_validation_is_unprocessable(self):
+        self.testapp.post_json('/api/mahasiswa', {'nim': '1'}, status=422)
+        self.testapp.post_json('/api/mahasiswa', {'nim': '1', 'nama': 'A',
+                               'jurusan': 'TI', 'umur': 20}, status=422)
+        self.testapp.post('/api/mahasiswa', 'bukan json', status=400)
+        self.add('1001')
+        self.testapp.patch_json('/api/mahasiswa/1',
+                                {'tanggal_lahir': '01-02-2003'}, status=422)
+        self.testapp.patch_json('/api/mahasiswa/1', {}, status=422)
+
+    def test_transient_error_is_retried(self):
+        self.failures = 2
+        res = self.testapp.post('/_probe/flaky')
+        self.assertEqual(res.json, {'calls': 3})
+        self.assertEqual(self.errors()['probe_flaky'],
+                         {'errors': {'503': 2}, 'retries': 2})
+
+    def test_transient_error_on_last_attempt(self):
+        self.failures = 99
+        res = self.testapp.post('/_probe/flaky', status=503)
+        self.assertEqual(res.headers['Retry-After'], '1')
+        self.assertEqual(self.calls, 3)
+
+    def test_is_transient(self):
+        from sqlalchemy.exc import DBAPIError
+        from .errors import is_transient
+
+        class PgError(Exception):
+            def __init__(self, pgcode):
+                self.pgcode = pgcode
+
+        def error(orig):
+            return DBAPIError('SELECT 1', {}, orig)
+        self.assertTrue(is_transient(error(PgError('40001'))))
+        self.assertTrue(is_transient(error(PgError('40P01'))))
+        self.assertFalse(is_transient(error(PgError('23505'))))
+        self.assertTrue(is_transient(error(Exception(1213, 'Deadlock'))))
+        self.assertFalse(is_transient(error(Exception('syntax error'))))
+
+
+class TestSchemaValidation(FunctionalTest):
+
+    def test_compiled_validator_is_cached(self):
+        from .schemas import MAHASISWA_SCHEMA, compile_validator
+        self.assertIs(compile_validator(MAHASISWA_SCHEMA),
+                      compile_validator(MAHASISWA_SCHEMA))
+        self.assertIsNot(compile_validator(MAHASISWA_SCHEMA),
+                         compile_validator(MAHASISWA_SCHEMA, partial=True))
+
+    def test_normalize(self):
+        from datetime import date
+        from .schemas import ValidationError, normalize_mahasiswa
+        row = normalize_mahasiswa({'nim': '1', 'nama': 'A', 'jurusan': 'TI',
+                                   'tanggal_lahir': '2003-04-05'})
+        self.assertEqual(row, {'nim': '1', 'nama': 'A', 'jurusan': 'TI',
+                               'tanggal_lahir': date(2003, 4, 5),
+                               'alamat': None})
+        self.assertEqual(normalize_mahasiswa({'alamat': None}, partial=True),
+                         {'alamat': None})
+        self.assertEqual(normalize_mahasiswa({}, partial=True), {})
+        for item in ({'nim': '1', 'nama': 'A'},
+                     {'nim': 1, 'nama': 'A', 'jurusan': 'TI'},
+                     {'nim': '1', 'nama': '', 'jurusan': 'TI'},
+                     {'nim': '1', 'nama': 'A', 'jurusan': 'TI', 'x': 1},
+                     {'nim': '1', 'nama': 'A', 'jurusan': 'TI',
+                      'tanggal_lahir': '2003-13-01'},
+                     ['1', 'A', 'TI']):
+            with self.assertRaises(ValidationError):
+                normalize_mahasiswa(item)
+        with self.assertRaises(ValidationError):
+            normalize_mahasiswa({'nim': None}, partial=True)
+
+    def test_rejected_before_session_is_opened(self):
+        pool = self.registry['pool_metrics']
+        checkouts = pool.snapshot()['checkouts']
+        self.testapp.post_json('/api/mahasiswa', {'nim': '1'}, status=422)
+        self.testapp.post('/api/mahasiswa', b'{', status=400)
+        self.assertEqual(pool.snapshot()['checkouts'], checkouts)
+
+        res = self.add('1001', tanggal_lahir='2003-04-05')
+        res = self.testapp.get('/api/mahasiswa/%d' % res.json['id'])
+        self.assertEqual(res.json['data']['tanggal_lahir'], '2003-04-05')
+
+
+class TestInitializeDb(BaseTest):
+
+    def setUp(self):
+        super(TestInitializeDb, self).setUp()
+        self.init_database()
+
+    def test_default_seed_is_idempotent(self):
+        from .models import Mahasiswa
+        from .scripts.initialize_db import setup_models
+        self.assertEqual(setup_models(self.session).inserted, 2)
+        stats = setup_models(self.session)
+        self.assertEqual((stats.inserted, stats.skipped), (0, 2))
+        self.assertEqual(self.session.query(Mahasiswa).count(), 2)
+
+    def test_seed_files(self):
+        import json
+        import os
+        import tempfile
+        from .scripts.initialize_db import iter_items, setup_models
+
+        tmp = tempfile.mkdtemp()
+        csv_path = os.path.join(tmp, 'seed.csv')
+        with open(csv_path, 'w') as f:
+            f.write('nim,nama,jurusan,tanggal_lahir\n'
+                    '7001,Satu,TI,2002-01-01\n7002,Dua,SI,\n7001,Satu,TI,\n')
+        json_path = os.path.join(tmp, 'seed.json')
+        with open(json_path, 'w') as f:
+            json.dump([{'nim': '7%03d' % i, 'nama': 'N', 'jurusan': 'TI'}
+                       for i in range(1, 6)] + [{'nama': 'tanpa nim'}], f)
+
+        stats = setup_models(self.session, iter_items([csv_path, json_path]),
+                             chunk_size=3)
+        self.assertEqual(stats.read, 9)
+        self.assertEqual(stats.inserted, 5)
+        self.assertEqual(stats.skipped, 3)
+        self.assertEqual(stats.rejected, 1)
+
+    def test_iter_json_array_small_buffer(self):
+        import io
+        from .scripts.initialize_db import iter_json_array
+        data = '[ {"nim": "1", "nama": "a, [b]"} ,\n{"nim": "2"} ]'
+        items = list(iter_json_array(io.StringIO(data), bufsize=4))
+        self.assertEqual([i['nim'] for i in items], ['1', '2'])
+
+
+class TestPrefork(unittest.TestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+        from . import main
+        from .models.meta import Base
+
+        self.tmp = tempfile.mkdtemp()
+        self.url = 'sqlite:///' + os.path.join(self.tmp, 'prefork.sqlite')
+        self.app = main({}, **{'sqlalchemy.url': self.url})
+        self.engine = self.app.registry['dbsession_factory'].kw['bind']
+        Base.metadata.create_all(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_child_drops_parent_pool(self):
+        import os
+        with self.engine.connect():
+            pass
+        self.assertEqual(self.engine.pool.checkedin(), 1)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if self.engine.pool.checkedin() == 0 else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(self.engine.pool.checkedin(), 1)
+
+    def test_refuses_process_local_cache(self):
+        from .cache import cache_from_settings
+        from .prefork import Arbiter
+        registry = self.app.registry
+        with self.assertRaises(ValueError):
+            Arbiter(None, [], workers=2).prepare(self.app)
+        registry['mahasiswa_cache'] = cache_from_settings({
+            'mahasiswa.cache.backend': 'redis',
+            'mahasiswa.cache.redis_url': 'local://'})
+        with self.assertRaises(ValueError):
+            Arbiter(None, [], workers=2).prepare(self.app)
+        import gc
+        try:
+            Arbiter(None, [], workers=1).prepare(self.app)
+            registry['mahasiswa_cache'] = None
+            Arbiter(None, [], workers=2).prepare(self.app)
+        finally:
+            gc.unfreeze()
+
+    def test_production_prefork_app(self):
+        import configparser
+        import os
+        from .cache import cache_from_settings, is_process_local
+        parser = configparser.RawConfigParser()
+        parser.read(os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'production.ini'))
+        self.assertEqual(parser['server:prefork']['app_name'], 'prefork')
+        app = parser['app:prefork']
+        self.assertEqual(app['use'], 'main')
+        self.assertFalse(is_process_local(cache_from_settings(app)))
+
+    def test_reload_and_graceful_stop(self):
+        import os
+        import signal
+        import socket
+        import subprocess
+        import sys
+        import time
+        import urllib.request
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        ini = os.path.join(self.tmp, 'prefork.ini')
+        with open(ini, 'w') as f:
+            f.write('[app:main]\nuse = call:pyramid_mahasiswa:main\n'
+                    'sqlalchemy.url = %s\nmahasiswa.cache.backend = none\n'
+                    % self.url)
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        master = subprocess.Popen(
+            [sys.executable, '-m', 'pyramid_mahasiswa.prefork', ini,
+             '--listen', '127.0.0.1:%d' % port, '--workers', '2',
+             '--warm', '/api/mahasiswa'], env=env)
+        url = 'http://127.0.0.1:%d/api/mahasiswa' % port
+
+        def get():
+            for _ in range(100):
+                try:
+                    with urllib.request.urlopen(url, timeout=5) as res:
+                        return res.status
+                except OSError:
+                    time.sleep(0.1)
+
+        def workers():
+            out = subprocess.run(['ps', '-o', 'pid=', '--ppid', str(master.pid)],
+                                 capture_output=True, text=True).stdout
+            return set(out.split())
+
+        try:
+            self.assertEqual(get(), 200)
+            before = workers()
+            self.assertEqual(len(before), 2)
+            master.send_signal(signal.SIGHUP)
+            for _ in range(50):
+                time.sleep(0.1)
+                after = workers()
+                if len(after) == 2 and not after & before:
+                    break
+            self.assertFalse(after & before)
+            self.assertEqual(get(), 200)
+        finally:
+            master.send_signal(signal.SIGTERM)
+            self.assertEqual(master.wait(15), 0)
@@ -1,57 +1,732 @@
-from pyramid.view import view_config
+import time
+import zlib
+
+from pyramid.httpexceptions import HTTPNotModified
 from pyramid.response import Response
-from sqlalchemy.exc import DBAPIError
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from webob.etag import ETagMatcher
+import zope.sqlalchemy
 
+from .. import changes
+from .. import export
 from .. import models
+from .. import serializers
+from ..schemas import (
+    MAHASISWA_FIELDS,
+    MAHASISWA_SCHEMA,
+    ValidationError,
+    normalize_mahasiswa,
+)
+from ..cache import LIST_PREFIX, cached, detail_prefix, invalidate_on_commit
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+STREAM_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 10000
+BULK_CHUNK_SIZE = 1000
+BULK_POLICIES = ('skip', 'upsert', 'fail')
+
+# batas kolom Integer (int4 di PostgreSQL); id di luar ini pasti tidak ada
+MAX_ID = 2 ** 31 - 1
+
+
+def _parse_id(value):
+    """Id dari matchdict; None jika bukan angka atau di luar rentang kolom."""
+    try:
+        mhs_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return mhs_id if 1 <= mhs_id <= MAX_ID else None
+
+
+def _parse_int(value, default):
+    """Ubah query param menjadi int; None jika tidak diisi."""
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+def make_etag(prefix, params):
+    """ETag kuat: versi data + hash query param (fields/limit/after)."""
+    query = '&'.join('%s=%s' % item for item in sorted(params.items()))
+    return '%s-%08x' % (prefix, zlib.crc32(query.encode('utf-8')))
+
+
+def list_statement(fields, after=None):
+    """SELECT kolom `fields` urut id, mulai setelah cursor `after`."""
+    stmt = select(*serializers.columns(fields)).order_by(models.Mahasiswa.id)
+    if after is not None:
+        stmt = stmt.where(models.Mahasiswa.id > after)
+    return stmt
+
+
+def detail_statement(fields, mhs_id):
+    """SELECT kolom `fields` + version baris + penghitung table_version."""
+    table_version = (
+        select(models.TableVersion.version)
+        .where(models.TableVersion.name == 'mahasiswa')
+        .scalar_subquery()
+    )
+    return (
+        select(*serializers.columns(fields), models.Mahasiswa.version,
+               func.coalesce(table_version, 0).label('table_version'))
+        .where(models.Mahasiswa.id == mhs_id)
+    )
+
+
+def detail_etag(mhs_id, row, params):
+    """ETag detail: version baris saja tidak cukup, karena di SQLite id
+    yang terbesar dipakai ulang (dengan version=1) setelah baris dihapus.
+    Penghitung table_version membedakan baris lama dan baru."""
+    return make_etag('m%d-v%d-t%d' % (mhs_id, row.version, row.table_version),
+                     params)
+
+
+def detail_data(fields, row):
+    return serializers.row_to_dict(fields, row[:-2])
+
+
+def page_payload(fields, rows, limit):
+    """Payload satu halaman; `rows` berisi maksimal limit + 1 baris."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'status': 'success',
+        'data': [serializers.row_to_dict(fields, r) for r in rows],
+        'next_after': rows[-1].id if has_more else None,
+    }
+
+
+def _not_modified(request, etag):
+    """Kembalikan 304 jika If-None-Match cocok dengan `etag`, selain itu None."""
+    header = request.headers.get('If-None-Match')
+    if header and etag in ETagMatcher.parse(header):
+        response = HTTPNotModified()
+        response.etag = etag
+        return response
+    return None
+
+
+def _wants_stream(request):
+    if request.params.get('stream') in ('1', 'true', 'ndjson'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+
+def _stream_rows(session_factory, fields, after, limit):
+    """Generator NDJSON: baca per `STREAM_CHUNK_SIZE` baris memakai session sendiri.
+
+    app_iter baru dikonsumsi setelah view selesai (dan pyramid_tm menutup
+    request.dbsession), jadi stream membuka session terpisah dan menutupnya
+    ketika iterasi selesai atau client memutus koneksi.
+    """
+    dbsession = session_factory()
+    try:
+        stmt = list_statement(fields, after).execution_options(
+            yield_per=STREAM_CHUNK_SIZE)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        for row in dbsession.execute(stmt):
+            yield serializers.dumps(serializers.row_to_dict(fields, row)) + b'\n'
+    finally:
+        dbsession.close()
 
 
 # --- LIST MAHASISWA ---
-@view_config(route_name='mahasiswa_list', renderer='json')
 def mahasiswa_list(request):
     try:
-        query = request.dbsession.query(models.Mahasiswa).all()
-        data = [m.to_dict() for m in query]
-        return {'status': 'success', 'data': data}
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+        after = _parse_int(request.params.get('after'), None)
+        limit = _parse_int(request.params.get('limit'), None)
+    except ValueError:
+        return Response(
+            json_body={'error': 'limit dan after harus berupa angka'},
+            status=400,
+        )
+    if limit is not None and limit < 1:
+        return Response(json_body={'error': 'limit minimal 1'}, status=400)
+    try:
+        fields = serializers.parse_fields(request.params.get('fields'))
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+
+    if _wants_stream(request):
+        return Response(
+            app_iter=_stream_rows(
+                models.read_session_factory(request), fields, after, limit),
+            content_type='application/x-ndjson',
+            charset=None,
+        )
+
+    limit = min(limit or DEFAULT_LIMIT, MAX_LIMIT)
+    # penghitung perubahan tabel cukup untuk 304 tanpa menyentuh baris
+    etag = make_etag(
+        't%d' % models.get_table_version(request.dbsession, 'mahasiswa'),
+        request.params)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    rows = request.dbsession.execute(
+        list_statement(fields, after).limit(limit + 1)).all()
+    response = serializers.json_response(page_payload(fields, rows, limit))
+    response.etag = etag
+    return response
+
+
+def _fts_query(q):
+    """Ubah input bebas menjadi query FTS5 prefix per kata: "bud"* "san"*."""
+    words = q.split()
+    return ' '.join('"%s"*' % w.replace('"', '""') for w in words)
+
+
+def _escape_like(q):
+    return q.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_statement(dialect_name, fields, q=None, jurusan=None):
+    """SELECT pencarian mahasiswa yang memakai index jurusan / nama.
+
+    Nama dicocokkan per awalan kata (case-insensitive): lewat FTS5 di
+    SQLite dan index trigram GIN pada lower(nama) di PostgreSQL.
+    """
+    stmt = select(*serializers.columns(fields)).order_by(models.Mahasiswa.id)
+    if jurusan:
+        stmt = stmt.where(models.Mahasiswa.jurusan == jurusan)
+    if q and q.strip():
+        if dialect_name == 'sqlite':
+            fts = models.mahasiswa_fts
+            stmt = stmt.where(models.Mahasiswa.id.in_(
+                select(fts.c.rowid).where(fts.c.nama.op('MATCH')(_fts_query(q)))
+            ))
+        else:
+            prefix = _escape_like(q.strip())
+            nama = func.lower(models.Mahasiswa.nama)
+            stmt = stmt.where(or_(
+                nama.like(prefix + '%', escape='\\'),
+                nama.like('% ' + prefix + '%', escape='\\'),
+            ))
+    return stmt
+
+
+# --- CARI MAHASISWA ---
+def mahasiswa_search(request):
+    try:
+        limit = _parse_int(request.params.get('limit'), DEFAULT_LIMIT)
+        after = _parse_int(request.params.get('after'), None)
+        fields = serializers.parse_fields(request.params.get('fields'))
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+    if limit < 1:
+        return Response(json_body={'error': 'limit minimal 1'}, status=400)
+    limit = min(limit, MAX_LIMIT)
+
+    q = request.params.get('q')
+    jurusan = request.params.get('jurusan')
+    if not (q or jurusan):
+        return Response(json_body={'error': 'isi q atau jurusan'}, status=400)
+
+    dbsession = request.dbsession
+    stmt = search_statement(dbsession.get_bind().dialect.name,
+                            fields, q, jurusan)
+    if after is not None:
+        stmt = stmt.where(models.Mahasiswa.id > after)
+    rows = dbsession.execute(stmt.limit(limit + 1)).all()
+    return serializers.json_response(page_payload(fields, rows, limit))
+
+
+def _export_rows(session_factory, writer, fields, after, until, encoding):
+    """Generator body export: satu chunk server-side cursor per iterasi."""
+    stmt = list_statement(fields, after).execution_options(
+        stream_results=True, yield_per=EXPORT_CHUNK_SIZE)
+    if until is not None:
+        stmt = stmt.where(models.Mahasiswa.id <= until)
+    compressor = export.compressor(encoding)
+    dbsession = session_factory()
+    try:
+        for rows in dbsession.execute(stmt).partitions():
+            data = writer.write(rows)
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        data = writer.close()
+        if compressor is not None:
+            data = compressor.compress(data) + compressor.flush()
+        if data:
+            yield data
+    finally:
+        dbsession.close()
+
+
+# --- EXPORT MAHASISWA ---
+# Bisa dilanjutkan: client menyimpan id terakhir yang diterima lalu
+# mengulang dengan after=<id>; until=<id> membatasi rentang (inklusif).
+def mahasiswa_export(request):
+    fmt = request.params.get('format', 'csv')
+    if fmt not in export.CONTENT_TYPES:
+        return Response(json_body={'error': 'format tidak dikenal: %s' % fmt},
+                        status=400)
+    if fmt not in export.available_formats():
+        return Response(json_body={'error': 'format %s butuh pyarrow' % fmt},
+                        status=400)
+    try:
+        after = _parse_int(request.params.get('after'), None)
+        until = _parse_int(request.params.get('until'), None)
+    except ValueError:
+        return Response(
+            json_body={'error': 'after dan until harus berupa angka'},
+            status=400,
+        )
+    try:
+        fields = serializers.parse_fields(request.params.get('fields'))
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+
+    encoding = export.choose_encoding(request.accept_encoding)
+    response = Response(
+        app_iter=_export_rows(models.read_session_factory(request),
+                              export.make_writer(fmt, fields),
+                              fields, after, until, encoding),
+        content_type=export.CONTENT_TYPES[fmt],
+        charset=None,
+    )
+    response.content_disposition = 'attachment; filename="mahasiswa.%s"' % fmt
+    response.vary = ('Accept-Encoding',)
+    if encoding is not None:
+        response.content_encoding = encoding
+    return response
+
+
+# --- STATISTIK MAHASISWA ---
+# Dibaca dari tabel ringkasan mahasiswa_stats (diisi trigger), jadi biayanya
+# sebanding dengan jumlah grup jurusan x tahun lahir, bukan jumlah baris.
+def mahasiswa_stats(request):
+    dbsession = request.dbsession
+    etag = make_etag(
+        's%d' % models.get_table_version(dbsession, 'mahasiswa'),
+        request.params)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    stats = models.MahasiswaStats
+    stmt = select(stats.jurusan, stats.tahun_lahir, stats.jumlah).order_by(
+        stats.jurusan, stats.tahun_lahir)
+    jurusan = request.params.get('jurusan')
+    if jurusan:
+        stmt = stmt.where(stats.jurusan == jurusan)
+
+    per_jurusan = {}
+    data = []
+    for row in dbsession.execute(stmt):
+        per_jurusan[row.jurusan] = per_jurusan.get(row.jurusan, 0) + row.jumlah
+        data.append({
+            'jurusan': row.jurusan,
+            # 0 = tanggal lahir tidak diisi
+            'tahun_lahir': row.tahun_lahir or None,
+            'jumlah': row.jumlah,
+        })
+    response = serializers.json_response({
+        'status': 'success',
+        'total': sum(per_jurusan.values()),
+        'per_jurusan': per_jurusan,
+        'data': data,
+    })
+    response.etag = etag
+    return response
+
+
+# --- CHANGE FEED MAHASISWA ---
+# Sync inkremental: client menyimpan next_since lalu mengulang dengan
+# since=<next_since>. wait=<detik> menahan request sampai ada perubahan
+# (long-poll). Setiap pembacaan memakai session baru yang langsung ditutup,
+# jadi koneksi pool tidak ditahan selama menunggu. Thread waitress tetap
+# tertahan, jadi jumlah long-poll yang menunggu bersamaan dibatasi
+# (mahasiswa.changes.max_waiters); di atas batas itu request tanpa data
+# baru langsung dijawab 503 + Retry-After.
+def mahasiswa_changes(request):
+    try:
+        since = _parse_int(request.params.get('since'), 0)
+        limit = _parse_int(request.params.get('limit'), DEFAULT_LIMIT)
+        wait = float(request.params.get('wait') or 0)
+    except ValueError:
+        return Response(
+            json_body={'error': 'since, limit dan wait harus berupa angka'},
+            status=400,
+        )
+    if since < 0 or limit < 1 or wait < 0:
+        return Response(
+            json_body={'error': 'since, limit dan wait tidak boleh negatif'},
+            status=400,
+        )
+    try:
+        fields = serializers.parse_fields(request.params.get('fields'))
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+    limit = min(limit, MAX_LIMIT)
+    registry = request.registry
+    wait = min(wait, registry['changes_max_wait'])
+    notifier = registry['change_notifier']
+    session_factory = models.read_session_factory(request)
+
+    waiters = registry['changes_waiters']
+    waiting = False
+
+    deadline = time.monotonic() + wait
+    try:
+        while True:
+            generation = notifier.generation
+            dbsession = session_factory()
+            try:
+                purged = changes.purged_seq(dbsession)
+                if since < purged:
+                    return Response(json_body={
+                        'error': 'since=%d sudah dihapus retensi, lakukan '
+                                 'sync penuh' % since,
+                        'min_since': purged,
+                        'head': changes.head_seq(dbsession),
+                    }, status=410)
+                data = changes.fetch_changes(dbsession, fields, since, limit)
+            finally:
+                dbsession.close()
+            remaining = deadline - time.monotonic()
+            if data or remaining <= 0:
+                break
+            if not waiting:
+                waiting = waiters.acquire(blocking=False)
+                if not waiting:
+                    return Response(
+                        json_body={'error': 'terlalu banyak long-poll, '
+                                            'coba lagi nanti'},
+                        status=503, headers={'Retry-After': '1'})
+            notifier.wait(generation,
+                          min(remaining, registry['changes_poll_interval']))
+    finally:
+        if waiting:
+            waiters.release()
+
+    return serializers.json_response({
+        'status': 'success',
+        'data': data,
+        'next_since': data[-1]['seq'] if data else since,
+    })
 
 
 # --- DETAIL MAHASISWA ---
-@view_config(route_name='mahasiswa_detail', renderer='json')
 def mahasiswa_detail(request):
+    mhs_id = _parse_id(request.matchdict.get('id'))
+    if mhs_id is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
     try:
-        mhs_id = request.matchdict.get('id')
-        mhs = request.dbsession.query(models.Mahasiswa).get(mhs_id)
-        if not mhs:
-            return Response(json_body={'error': 'Not found'}, status=404)
-        return {'status': 'success', 'data': mhs.to_dict()}
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+        fields = serializers.parse_fields(request.params.get('fields'))
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+    row = request.dbsession.execute(
+        detail_statement(fields, mhs_id)).first()
+    if row is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+
+    etag = detail_etag(mhs_id, row, request.params)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = serializers.json_response({
+        'status': 'success',
+        'data': detail_data(fields, row),
+    })
+    response.etag = etag
+    return response
 
 
 # --- TAMBAH MAHASISWA ---
-@view_config(route_name='mahasiswa_add', request_method='POST', renderer='json')
 def mahasiswa_add(request):
+    # body sudah divalidasi (opsi view schema); nim duplikat -> 409
+    mhs = models.Mahasiswa(**request.validated)
+    request.dbsession.add(mhs)
+    request.dbsession.flush()
+    models.bump_table_version(request.dbsession, 'mahasiswa')
+    invalidate_on_commit(request, LIST_PREFIX)
+    return {'status': 'success', 'message': 'Mahasiswa ditambahkan',
+            'id': mhs.id}
+
+
+def _read_bulk_items(request):
+    """Baca body sebagai JSON array atau NDJSON (satu objek per baris)."""
+    if request.content_type == 'application/x-ndjson':
+        for line in request.body_file:
+            line = line.strip()
+            if line:
+                yield serializers.loads(line)
+        return
+    items = serializers.loads(request.body)
+    if not isinstance(items, list):
+        raise ValueError('body harus berupa JSON array')
+    yield from items
+
+
+def _bulk_chunks(items):
+    chunk = []
+    for index, item in enumerate(items):
+        chunk.append((index, item))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- TAMBAH MAHASISWA (BULK) ---
+def mahasiswa_bulk(request):
+    policy = request.params.get('on_conflict', 'skip')
+    if policy not in BULK_POLICIES:
+        return Response(
+            json_body={'error': 'on_conflict harus salah satu dari %s'
+                       % ', '.join(BULK_POLICIES)},
+            status=400,
+        )
+
+    table = models.Mahasiswa.__table__
+    dbsession = request.dbsession
+    inserted = updated = 0
+    rejected = []
+    seen = set()
+    # version baris baru 1, baris yang di-upsert >= 2
+    on_conflict = models.insert_on_conflict(
+        dbsession.get_bind().dialect.name,
+        [f for f in MAHASISWA_FIELDS if f != 'nim']
+        if policy == 'upsert' else ())
+
+    try:
+        for chunk in _bulk_chunks(_read_bulk_items(request)):
+            rows = {}
+            for index, item in chunk:
+                try:
+                    row = normalize_mahasiswa(item)
+                except ValueError as e:
+                    rejected.append({'index': index, 'error': str(e)})
+                    continue
+                if row['nim'] in seen:
+                    rejected.append({'index': index, 'nim': row['nim'],
+                                     'error': 'nim duplikat dalam payload'})
+                    continue
+                seen.add(row['nim'])
+                rows[row['nim']] = (index, row)
+
+            if not rows:
+                continue
+
+            if policy != 'fail' and on_conflict is not None:
+                # satu INSERT ... ON CONFLICT per chunk: nim yang dimasukkan
+                # request lain di tengah jalan tidak membuat batch gagal
+                written = dict(dbsession.execute(
+                    on_conflict.returning(table.c.nim, table.c.version),
+                    [row for _, row in rows.values()],
+                ).all())
+                for nim, (index, _) in rows.items():
+                    version = written.get(nim)
+                    if version is None:
+                        rejected.append({'index': index, 'nim': nim,
+                                         'error': 'nim sudah terdaftar'})
+                    elif version == 1:
+                        inserted += 1
+                    else:
+                        updated += 1
+                continue
+
+            # satu query IN per chunk untuk mencari nim yang sudah ada
+            existing = set(dbsession.execute(
+                select(table.c.nim).where(table.c.nim.in_(list(rows)))
+            ).scalars())
+
+            if existing and policy == 'fail':
+                request.tm.doom()
+                return Response(
+                    json_body={'error': 'nim sudah terdaftar',
+                               'nim': sorted(existing)},
+                    status=409,
+                )
+
+            new_rows = [row for nim, (_, row) in rows.items()
+                        if nim not in existing]
+            if new_rows:
+                dbsession.execute(insert(table), new_rows)
+                inserted += len(new_rows)
+
+            if existing and policy == 'upsert':
+                values = {f: bindparam(f) for f in MAHASISWA_FIELDS
+                          if f != 'nim'}
+                values['version'] = table.c.version + 1
+                dbsession.execute(
+                    update(table)
+                    .where(table.c.nim == bindparam('b_nim'))
+                    .values(values),
+                    [dict(rows[nim][1], b_nim=nim) for nim in existing],
+                )
+                updated += len(existing)
+            elif existing:
+                for nim in sorted(existing):
+                    rejected.append({'index': rows[nim][0], 'nim': nim,
+                                     'error': 'nim sudah terdaftar'})
+
+        if inserted:
+            invalidate_on_commit(request, LIST_PREFIX)
+        if updated:
+            invalidate_on_commit(request, LIST_PREFIX, detail_prefix())
+        if inserted or updated:
+            models.bump_table_version(dbsession, 'mahasiswa')
+            zope.sqlalchemy.mark_changed(dbsession)
+    except ValueError as e:
+        # body rusak di tengah jalan: batalkan chunk yang sudah masuk
+        request.tm.doom()
+        return Response(json_body={'error': str(e)}, status=400)
+
+    return {
+        'status': 'success',
+        'inserted': inserted,
+        'updated': updated,
+        'rejected': rejected,
+    }
+
+
+# --- UPDATE MAHASISWA (PUT / PATCH) ---
+def mahasiswa_update(request):
+    mhs_id = _parse_id(request.matchdict.get('id'))
+    if mhs_id is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+    values = request.validated
+    if not values:
+        raise ValidationError('tidak ada kolom yang diubah')
+
+    table = models.Mahasiswa.__table__
+    fields = serializers.FIELDS
+    values['version'] = table.c.version + 1
+    # satu UPDATE ... RETURNING, tanpa SELECT lalu flush lewat ORM
+    row = request.dbsession.execute(
+        update(table)
+        .where(table.c.id == mhs_id)
+        .values(values)
+        .returning(*serializers.columns(fields))
+    ).first()
+    if row is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+
+    models.bump_table_version(request.dbsession, 'mahasiswa')
+    zope.sqlalchemy.mark_changed(request.dbsession)
+    invalidate_on_commit(request, LIST_PREFIX, detail_prefix(mhs_id))
+    return serializers.json_response({
+        'status': 'success',
+        'data': serializers.row_to_dict(fields, row),
+    })
+
+
+# --- UPDATE MAHASISWA (BULK PATCH) ---
+def mahasiswa_bulk_patch(request):
+    """Terapkan banyak partial update: satu UPDATE executemany per set kolom."""
     try:
-        data = request.json_body
-        mhs = models.Mahasiswa(**data)
-        request.dbsession.add(mhs)
-        return {'status': 'success', 'message': 'Mahasiswa ditambahkan'}
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+        items = serializers.loads(request.body)
+    except ValueError as e:
+        return Response(json_body={'error': str(e)}, status=400)
+    if not isinstance(items, list):
+        return Response(json_body={'error': 'body harus berupa JSON array'},
+                        status=400)
+
+    valid = []
+    rejected = []
+    for index, item in enumerate(items):
+        try:
+            # bukan isinstance: bool (true/false) juga subclass int
+            if not isinstance(item, dict) or type(item.get('id')) is not int:
+                raise ValueError('id wajib diisi')
+            patch = dict(item)
+            mhs_id = patch.pop('id')
+            patch = normalize_mahasiswa(patch, partial=True)
+            if not patch:
+                raise ValueError('tidak ada kolom yang diubah')
+        except ValueError as e:
+            rejected.append({'index': index, 'error': str(e)})
+            continue
+        valid.append((index, mhs_id, patch))
+
+    # id yang tidak ada dilaporkan satu per satu, bukan hanya lewat `updated`
+    table = models.Mahasiswa.__table__
+    ids = sorted({mhs_id for _, mhs_id, _ in valid
+                  if _parse_id(mhs_id) is not None})
+    existing = set()
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        existing.update(request.dbsession.execute(
+            select(table.c.id).where(
+                table.c.id.in_(ids[start:start + BULK_CHUNK_SIZE]))
+        ).scalars())
+
+    groups = {}
+    for index, mhs_id, patch in valid:
+        if mhs_id not in existing:
+            rejected.append({'index': index, 'id': mhs_id,
+                             'error': 'id tidak ditemukan'})
+            continue
+        patch['b_id'] = mhs_id
+        groups.setdefault(tuple(sorted(patch)), []).append(patch)
+    rejected.sort(key=lambda r: r['index'])
+
+    updated = 0
+    for keys, params in groups.items():
+        values = {k: bindparam(k) for k in keys if k != 'b_id'}
+        values['version'] = table.c.version + 1
+        result = request.dbsession.execute(
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(values),
+            params,
+        )
+        updated += result.rowcount
+
+    if updated:
+        models.bump_table_version(request.dbsession, 'mahasiswa')
+        zope.sqlalchemy.mark_changed(request.dbsession)
+        invalidate_on_commit(request, LIST_PREFIX, detail_prefix())
+    return {'status': 'success', 'updated': updated, 'rejected': rejected}
 
 
 # --- HAPUS MAHASISWA ---
-@view_config(route_name='mahasiswa_delete', request_method='DELETE', renderer='json')
 def mahasiswa_delete(request):
-    try:
-        mhs_id = request.matchdict.get('id')
+    mhs_id = _parse_id(request.matchdict.get('id'))
+    mhs = None
+    if mhs_id is not None:
         mhs = request.dbsession.query(models.Mahasiswa).get(mhs_id)
 
-        if not mhs:
-            return Response(json_body={'error': 'Not found'}, status=404)
+    if not mhs:
+        return Response(json_body={'error': 'Not found'}, status=404)
+
+    request.dbsession.delete(mhs)
+    models.bump_table_version(request.dbsession, 'mahasiswa')
+    invalidate_on_commit(request, LIST_PREFIX, detail_prefix(mhs.id))
+    return {'status': 'success', 'message': 'Mahasiswa dihapus'}
+
 
-        request.dbsession.delete(mhs)
-        return {'status': 'success', 'message': 'Mahasiswa dihapus'}
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+def includeme(config):
+    """Daftarkan view mahasiswa secara eksplisit (tanpa config.scan)."""
+    config.add_view(mahasiswa_list, route_name='mahasiswa_list',
+                    renderer='json', decorator=cached)
+    config.add_view(mahasiswa_search, route_name='mahasiswa_search',
+                    renderer='json')
+    config.add_view(mahasiswa_export, route_name='mahasiswa_export')
+    config.add_view(mahasiswa_stats, route_name='mahasiswa_stats',
+                    renderer='json')
+    config.add_view(mahasiswa_changes, route_name='mahasiswa_changes',
+                    renderer='json')
+    config.add_view(mahasiswa_detail, route_name='mahasiswa_detail',
+                    renderer='json', decorator=cached)
+    config.add_view(mahasiswa_add, route_name='mahasiswa_add',
+                    request_method='POST', renderer='json',
+                    schema=MAHASISWA_SCHEMA)
+    config.add_view(mahasiswa_bulk, route_name='mahasiswa_bulk',
+                    request_method='POST', renderer='json')
+    config.add_view(mahasiswa_update, route_name='mahasiswa_update',
+                    renderer='json', schema=MAHASISWA_SCHEMA)
+    config.add_view(mahasiswa_bulk_patch, route_name='mahasiswa_bulk_patch',
+                    renderer='json')
+    config.add_view(mahasiswa_delete, route_name='mahasiswa_delete',
+                    request_method='DELETE', renderer='json')
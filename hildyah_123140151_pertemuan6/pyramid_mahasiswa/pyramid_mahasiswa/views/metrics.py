@@ -0,0 +1,39 @@
+from ..route_metrics import pool_gauges, prometheus_response, wants_prometheus
+
+
+def prometheus_view(request):
+    gauges = pool_gauges({}, request.registry['pool_metrics'].snapshot())
+    for name, metrics in (request.registry.get('replica_pool_metrics')
+                          or {}).items():
+        pool_gauges(gauges, metrics.snapshot(), 'replica="%s"' % name)
+    return prometheus_response(request.registry['route_metrics'], gauges)
+
+
+def metrics_view(request):
+    # scraper Prometheus: ?format=prometheus atau Accept: text/plain
+    if (request.registry.get('route_metrics') is not None
+            and wants_prometheus(request)):
+        return prometheus_view(request)
+    payload = {'pool': request.registry['pool_metrics'].snapshot()}
+    payload['errors'] = request.registry['error_metrics'].snapshot()
+    routes = request.registry.get('route_metrics')
+    if routes is not None:
+        payload['routes'] = routes.snapshot()
+    flight = request.registry.get('singleflight')
+    if flight is not None:
+        payload['singleflight'] = flight.snapshot()
+    if request.registry.get('ratelimit_buckets') is not None:
+        payload['ratelimit'] = dict(request.registry['ratelimit_stats'])
+    replicas = request.registry.get('replica_pool_metrics')
+    if replicas:
+        router = request.registry['db_router']
+        payload['replicas'] = {
+            replica.name: dict(replicas[replica.name].snapshot(),
+                               healthy=replica.healthy)
+            for replica in router.replicas
+        }
+    return payload
+
+
+def includeme(config):
+    config.add_view(metrics_view, route_name='metrics', renderer='json')
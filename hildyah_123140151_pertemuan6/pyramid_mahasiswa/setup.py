@@ -48,14 +48,21 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'speedups': ['orjson'],
+        'asgi': ['asgiref', 'uvicorn', 'aiosqlite', 'asyncpg'],
+        'export': ['pyarrow', 'zstandard'],
     },
     install_requires=requires,
     entry_points={
         'paste.app_factory': [
             'main = pyramid_mahasiswa:main',
         ],
+        'paste.server_runner': [
+            'prefork = pyramid_mahasiswa.prefork:serve_paste',
+        ],
         'console_scripts': [
             'initialize_pyramid_mahasiswa_db = pyramid_mahasiswa.scripts.initialize_db:main',
+            'compact_pyramid_mahasiswa_changes = pyramid_mahasiswa.scripts.compact_changes:main',
         ],
     },
 )
@@ -0,0 +1,153 @@
+"""
+Check that enrolment lookups stay index-only at scale.
+
+Seeds ``--courses`` courses and ``--students`` x ``--per-student``
+enrolments (1M by default), prints the query plan of "courses of a
+student" and "students of a course", fails if either reads the enrolment
+table instead of an index, then times random lookups::
+
+    python benchmarks/bench_enrolment.py --output bench-enrolment.json
+    python benchmarks/bench_enrolment.py --url postgresql://.../matakuliah_bench
+
+On SQLite an index-only lookup shows up as ``USING COVERING INDEX``; on
+PostgreSQL as ``Index Only Scan`` (run VACUUM first so the visibility map
+is current, which this script does).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, text
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from pyramid_matakuliah import models  # noqa: E402
+from pyramid_matakuliah.models.meta import Base  # noqa: E402
+from pyramid_matakuliah.views.matakuliah import (  # noqa: E402
+    courses_of_student,
+    students_of_course,
+)
+
+SEED_CHUNK = 50000
+INDEX_ONLY = {
+    'sqlite': 'USING COVERING INDEX',
+    'postgresql': 'Index Only Scan',
+}
+
+
+def seed(engine, courses, students, per_student, rng):
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(models.MataKuliah), [
+            {'kode': 'MK%05d' % (i // 2), 'nama': 'Course %d' % i,
+             'sks': rng.choice((2, 3, 4)), 'semester': i % 2 + 1}
+            for i in range(courses)
+        ])
+    rows = []
+    with engine.begin() as conn:
+        for mahasiswa_id in range(1, students + 1):
+            for matakuliah_id in rng.sample(range(1, courses + 1), per_student):
+                rows.append({'mahasiswa_id': mahasiswa_id,
+                             'matakuliah_id': matakuliah_id})
+            if len(rows) >= SEED_CHUNK:
+                conn.execute(insert(models.Enrolment), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(models.Enrolment), rows)
+    analyze = 'ANALYZE' if engine.dialect.name == 'sqlite' else 'VACUUM ANALYZE'
+    with engine.connect().execution_options(
+            isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text(analyze))
+    return time.perf_counter() - start
+
+
+def explain(engine, stmt):
+    sql = stmt.compile(engine, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN' if engine.dialect.name == 'sqlite' else 'EXPLAIN'
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql('%s %s' % (prefix, sql))]
+
+
+def time_lookups(engine, make_stmt, keys, limit):
+    latencies = []
+    with engine.connect() as conn:
+        for key in keys:
+            t0 = time.perf_counter()
+            conn.execute(make_stmt(key).limit(limit)).all()
+            latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    pick = lambda pct: latencies[min(len(latencies) - 1,  # noqa: E731
+                                     int(pct / 100.0 * len(latencies)))]
+    return {
+        'lookups': len(latencies),
+        'p50_ms': round(pick(50) * 1000, 3),
+        'p99_ms': round(pick(99) * 1000, 3),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='database URL (default: temporary SQLite file)')
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--per-student', type=int, default=10)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--output', help='write the JSON result to this file')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    url = args.url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='bench-enrolment-'), 'bench.sqlite')
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    seed_seconds = seed(engine, args.courses, args.students,
+                        args.per_student, rng)
+
+    marker = INDEX_ONLY.get(engine.dialect.name)
+    queries = {
+        'courses_of_student': (courses_of_student,
+                               lambda: rng.randint(1, args.students)),
+        'students_of_course': (students_of_course,
+                               lambda: rng.randint(1, args.courses)),
+    }
+    result = {
+        'dialect': engine.dialect.name,
+        'enrolments': args.students * args.per_student,
+        'courses': args.courses,
+        'seed_seconds': round(seed_seconds, 3),
+        'queries': {},
+    }
+    index_only = True
+    for name, (make_stmt, random_key) in queries.items():
+        plan = explain(engine, make_stmt(1, after=0).limit(args.limit))
+        covered = marker is not None and any(marker in line for line in plan)
+        index_only = index_only and covered
+        stats = time_lookups(engine, make_stmt,
+                             [random_key() for _ in range(args.lookups)],
+                             args.limit)
+        result['queries'][name] = dict(stats, plan=plan, index_only=covered)
+    engine.dispose()
+
+    text_result = json.dumps(result, indent=2)
+    print(text_result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text_result + '\n')
+    if not index_only:
+        print('enrolment lookup is not index-only', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,19 @@
 from pyramid.config import Configurator
+from pyramid.settings import aslist
 
 
 def main(global_config, **settings):
     """ This function returns a Pyramid WSGI application.
     """
     with Configurator(settings=settings) as config:
-        config.include('pyramid_jinja2')
+        config.include('pyramid_mahasiswa.templating')
         config.include('.models')
         config.include('.routes')
-        config.scan()
+        # instrumentation shared with pyramid_mahasiswa
+        config.include('pyramid_mahasiswa.sql_profiler')
+        config.include('pyramid_mahasiswa.route_metrics')
+        config.include('.views')
+        # extra packages with @view_config decorators, if any
+        for package in aslist(settings.get('matakuliah.scan', '')):
+            config.scan(package)
     return config.make_wsgi_app()
@@ -0,0 +1,31 @@
+"""init
+
+Revision ID: 3f2a9c1d7b60
+Revises: 
+Create Date: 2026-10-18 11:20:04.118262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b60'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.Text(), nullable=True),
+    sa.Column('value', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_models'))
+    )
+    op.create_index('my_index', 'models', ['name'], unique=True, mysql_length=255)
+
+
+def downgrade():
+    op.drop_index('my_index', table_name='models')
+    op.drop_table('models')
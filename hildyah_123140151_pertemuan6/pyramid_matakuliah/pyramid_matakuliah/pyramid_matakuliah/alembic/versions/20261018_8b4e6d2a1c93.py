@@ -0,0 +1,42 @@
+"""add matakuliah and enrolment
+
+Revision ID: 8b4e6d2a1c93
+Revises: 3f2a9c1d7b60
+Create Date: 2026-10-18 11:24:37.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2a1c93'
+down_revision = '3f2a9c1d7b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('matakuliah',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kode', sa.Text(), nullable=False),
+    sa.Column('nama', sa.Text(), nullable=False),
+    sa.Column('sks', sa.Integer(), nullable=False),
+    sa.Column('semester', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_matakuliah'))
+    )
+    op.create_index('ix_matakuliah_kode_semester', 'matakuliah', ['kode', 'semester'], unique=True)
+    op.create_table('enrolment',
+    sa.Column('mahasiswa_id', sa.Integer(), nullable=False),
+    sa.Column('matakuliah_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['matakuliah_id'], ['matakuliah.id'], name=op.f('fk_enrolment_matakuliah_id_matakuliah'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('mahasiswa_id', 'matakuliah_id', name=op.f('pk_enrolment'))
+    )
+    op.create_index('ix_enrolment_matakuliah_id_mahasiswa_id', 'enrolment', ['matakuliah_id', 'mahasiswa_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_enrolment_matakuliah_id_mahasiswa_id', table_name='enrolment')
+    op.drop_table('enrolment')
+    op.drop_index('ix_matakuliah_kode_semester', table_name='matakuliah')
+    op.drop_table('matakuliah')
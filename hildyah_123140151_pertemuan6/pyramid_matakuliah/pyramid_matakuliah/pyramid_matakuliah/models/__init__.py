@@ -1,19 +1,49 @@
 from sqlalchemy import engine_from_config
+from sqlalchemy import pool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import configure_mappers
 import zope.sqlalchemy
 
+from pyramid_mahasiswa.pool_metrics import PoolMetrics
+
 # import or define all models here to ensure they are attached to the
 # Base.metadata prior to any initialization routines
 from .mymodel import MyModel  # flake8: noqa
+from .matakuliah import Enrolment, MataKuliah  # flake8: noqa
 
 # run configure_mappers after defining all of the models to ensure
 # all relationships can be setup
 configure_mappers()
 
+# allowed values for the `sqlalchemy.poolclass` setting
+POOL_CLASSES = {
+    'QueuePool': pool.QueuePool,
+    'StaticPool': pool.StaticPool,
+    'SingletonThreadPool': pool.SingletonThreadPool,
+    'NullPool': pool.NullPool,
+}
+
 
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    """
+    Create the engine from the app settings.
+
+    Pool options (``pool_size``, ``max_overflow``, ``pool_timeout``,
+    ``pool_recycle``, ``pool_pre_ping``) are coerced by
+    ``engine_from_config``; ``poolclass`` is looked up by class name.
+
+    """
+    kw = {}
+    poolclass = settings.get(prefix + 'poolclass')
+    if poolclass:
+        if poolclass not in POOL_CLASSES:
+            raise ValueError('unknown %spoolclass: %s' % (prefix, poolclass))
+        kw['poolclass'] = POOL_CLASSES[poolclass]
+        # StaticPool shares one SQLite connection across waitress threads
+        if (poolclass == 'StaticPool'
+                and settings[prefix + 'url'].startswith('sqlite')):
+            kw['connect_args'] = {'check_same_thread': False}
+    return engine_from_config(settings, prefix, **kw)
 
 
 def get_session_factory(engine):
@@ -65,8 +95,10 @@ def includeme(config):
     # use pyramid_retry to retry a request when transient exceptions occur
     config.include('pyramid_retry')
 
-    session_factory = get_session_factory(get_engine(settings))
+    engine = get_engine(settings)
+    session_factory = get_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
+    config.registry['pool_metrics'] = PoolMetrics(engine)
 
     # make request.dbsession available for use in Pyramid
     config.add_request_method(
@@ -0,0 +1,69 @@
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    Text,
+)
+from sqlalchemy.orm import relationship
+
+from .meta import Base
+
+
+class MataKuliah(Base):
+    """A course offered in a given semester."""
+    __tablename__ = 'matakuliah'
+    id = Column(Integer, primary_key=True)
+    kode = Column(Text, nullable=False)
+    nama = Column(Text, nullable=False)
+    sks = Column(Integer, nullable=False)
+    semester = Column(Integer, nullable=False)
+
+    enrolments = relationship(
+        'Enrolment', back_populates='matakuliah', passive_deletes=True,
+        order_by='Enrolment.mahasiswa_id')
+
+    def to_dict(self, include=()):
+        data = {
+            'id': self.id,
+            'kode': self.kode,
+            'nama': self.nama,
+            'sks': self.sks,
+            'semester': self.semester,
+        }
+        if 'enrolments' in include:
+            data['enrolments'] = [e.mahasiswa_id for e in self.enrolments]
+        return data
+
+
+class Enrolment(Base):
+    """
+    Link between a mahasiswa and a course.
+
+    ``mahasiswa_id`` refers to ``mahasiswa.id`` in the pyramid_mahasiswa
+    database, so it is not a foreign key here. The primary key leads with
+    ``mahasiswa_id`` which makes it the covering index for "courses of a
+    student"; ``ix_enrolment_matakuliah_id_mahasiswa_id`` covers the
+    reverse lookup ("students of a course").
+
+    """
+    __tablename__ = 'enrolment'
+    mahasiswa_id = Column(Integer, nullable=False)
+    matakuliah_id = Column(
+        Integer, ForeignKey('matakuliah.id', ondelete='CASCADE'),
+        nullable=False)
+
+    matakuliah = relationship(MataKuliah, back_populates='enrolments')
+
+    __table_args__ = (
+        PrimaryKeyConstraint('mahasiswa_id', 'matakuliah_id'),
+    )
+
+
+# a course code is offered at most once per semester; also serves
+# lookups by kode alone
+Index('ix_matakuliah_kode_semester', MataKuliah.kode, MataKuliah.semester,
+      unique=True)
+Index('ix_enrolment_matakuliah_id_mahasiswa_id',
+      Enrolment.matakuliah_id, Enrolment.mahasiswa_id)
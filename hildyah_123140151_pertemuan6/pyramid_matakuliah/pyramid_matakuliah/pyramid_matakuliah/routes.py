@@ -1,3 +1,11 @@
 def includeme(config):
     config.add_static_view('static', 'static', cache_max_age=3600)
     config.add_route('home', '/')
+    config.add_route('metrics', '/_metrics')
+
+    config.add_route('matakuliah_list', '/api/matakuliah', request_method='GET')
+    config.add_route('matakuliah_detail', '/api/matakuliah/{id}', request_method='GET')
+    config.add_route('matakuliah_mahasiswa', '/api/matakuliah/{id}/mahasiswa',
+                     request_method='GET')
+    config.add_route('mahasiswa_matakuliah', '/api/mahasiswa/{mahasiswa_id}/matakuliah',
+                     request_method='GET')
@@ -6,6 +6,14 @@ from sqlalchemy.exc import OperationalError
 
 from .. import models
 
+# (kode, nama, sks, semester)
+DEFAULT_MATAKULIAH = [
+    ('IF2210', 'Pemrograman Berorientasi Objek', 3, 3),
+    ('IF2240', 'Basis Data', 3, 4),
+    ('IF3028', 'Pemrograman Web', 3, 5),
+    ('IF3110', 'Pengembangan Aplikasi Web', 3, 5),
+]
+
 
 def setup_models(dbsession):
     """
@@ -14,6 +22,9 @@ def setup_models(dbsession):
     """
     model = models.mymodel.MyModel(name='one', value=1)
     dbsession.add(model)
+    for kode, nama, sks, semester in DEFAULT_MATAKULIAH:
+        dbsession.add(models.MataKuliah(
+            kode=kode, nama=nama, sks=sks, semester=semester))
 
 
 def parse_args(argv):
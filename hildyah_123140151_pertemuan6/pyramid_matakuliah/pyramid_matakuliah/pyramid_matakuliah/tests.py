@@ -63,3 +63,197 @@ class TestMyViewFailureCondition(BaseTest):
         from .views.default import my_view
         info = my_view(dummy_request(self.session))
         self.assertEqual(info.status_int, 500)
+
+
+class TestPoolMetrics(unittest.TestCase):
+
+    def setUp(self):
+        from webtest import TestApp
+        from . import main
+        self.testapp = TestApp(main({}, **{
+            'sqlalchemy.url': 'sqlite://',
+            'sqlalchemy.poolclass': 'StaticPool',
+        }))
+
+    def test_metrics_endpoint(self):
+        pool = self.testapp.get('/_metrics').json['pool']
+        self.assertEqual(pool['pool'], 'StaticPool')
+        self.assertEqual(pool['checkouts'], 0)
+
+
+class TestViewRegistration(unittest.TestCase):
+
+    def setUp(self):
+        from . import main
+        self.app = main({}, **{'sqlalchemy.url': 'sqlite://'})
+
+    def test_every_route_has_a_view(self):
+        introspector = self.app.registry.introspector
+        routes = {i['introspectable']['name']
+                  for i in introspector.get_category('routes')}
+        viewed = {i['introspectable']['route_name']
+                  for i in introspector.get_category('views')}
+        self.assertEqual(routes - viewed, set())
+
+    def test_not_found_page(self):
+        from webtest import TestApp
+        res = TestApp(self.app).get('/no-such-page', status=404)
+        self.assertIn('404', res.text)
+
+
+class TestSqlProfiler(unittest.TestCase):
+
+    def setUp(self):
+        from webtest import TestApp
+        from . import main
+        from .models.meta import Base
+        app = main({}, **{'sqlalchemy.url': 'sqlite://'})
+        Base.metadata.create_all(app.registry['dbsession_factory'].kw['bind'])
+        self.testapp = TestApp(app)
+
+    def test_server_timing_header(self):
+        res = self.testapp.get('/')
+        self.assertIn('desc="1 queries"', res.headers['Server-Timing'])
+
+
+class TestRouteMetrics(unittest.TestCase):
+
+    def setUp(self):
+        from webtest import TestApp
+        from . import main
+        from .models.meta import Base
+        app = main({}, **{'sqlalchemy.url': 'sqlite://'})
+        Base.metadata.create_all(app.registry['dbsession_factory'].kw['bind'])
+        self.testapp = TestApp(app)
+
+    def test_quantile(self):
+        from pyramid_mahasiswa.route_metrics import (
+            RouteStats, bucket_bounds, bucket_index)
+        for us in (0, 16, 1000, 123456):
+            lower, upper = bucket_bounds(bucket_index(us))
+            self.assertTrue(lower <= us < upper)
+        stats = RouteStats()
+        for ms in range(1, 101):
+            stats.counts[bucket_index(ms * 1000)] += 1
+            stats.count += 1
+        self.assertAlmostEqual(stats.quantile(0.99), 0.099, delta=0.099 / 16)
+
+    def test_json_snapshot(self):
+        self.testapp.get('/api/matakuliah')
+        self.testapp.get('/api/matakuliah')
+        routes = self.testapp.get('/_metrics').json['routes']
+        self.assertEqual(routes['matakuliah_list']['count'], 2)
+        self.assertGreater(routes['matakuliah_list']['bytes_out'], 0)
+
+    def test_prometheus_text(self):
+        self.testapp.get('/api/matakuliah')
+        res = self.testapp.get('/_metrics', params={'format': 'prometheus'})
+        self.assertEqual(res.content_type, 'text/plain')
+        self.assertIn('http_request_duration_seconds_bucket'
+                      '{route="matakuliah_list",le="+Inf"} 1', res.text)
+        self.assertIn('http_response_bytes_total{route="matakuliah_list"}',
+                      res.text)
+        self.assertIn('db_pool_checkouts ', res.text)
+
+
+class TestMataKuliahApi(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy.orm import Session
+        from webtest import TestApp
+        from . import main
+        from .models import Enrolment, MataKuliah
+        from .models.meta import Base
+        app = main({}, **{'sqlalchemy.url': 'sqlite://'})
+        self.engine = app.registry['dbsession_factory'].kw['bind']
+        Base.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            for i in range(1, 6):
+                session.add(MataKuliah(kode='IF%d' % i, nama='Course %d' % i,
+                                       sks=3, semester=i % 2 + 1))
+            session.flush()
+            for mahasiswa_id, matakuliah_id in [(1, 1), (1, 3), (1, 4), (2, 3)]:
+                session.add(Enrolment(mahasiswa_id=mahasiswa_id,
+                                      matakuliah_id=matakuliah_id))
+            session.commit()
+        self.testapp = TestApp(app)
+
+    def test_list_pages(self):
+        first = self.testapp.get('/api/matakuliah', params={'limit': '2'}).json
+        self.assertEqual([c['kode'] for c in first['data']], ['IF1', 'IF2'])
+        self.assertEqual(first['next_after'], 2)
+        last = self.testapp.get('/api/matakuliah',
+                                params={'after': '4', 'limit': '2'}).json
+        self.assertEqual([c['id'] for c in last['data']], [5])
+        self.assertIsNone(last['next_after'])
+
+        res = self.testapp.get('/api/matakuliah',
+                               params={'kode': 'IF3', 'semester': '2'})
+        self.assertEqual([c['id'] for c in res.json['data']], [3])
+        self.testapp.get('/api/matakuliah', params={'limit': 'x'}, status=400)
+        for name in ('after', 'semester'):
+            self.testapp.get('/api/matakuliah', params={name: str(2 ** 64)},
+                             status=400)
+
+    def test_detail(self):
+        res = self.testapp.get('/api/matakuliah/2')
+        self.assertEqual(res.json['data']['nama'], 'Course 2')
+        self.testapp.get('/api/matakuliah/99', status=404)
+        self.testapp.get('/api/matakuliah/x', status=404)
+        big = 2 ** 64
+        self.testapp.get('/api/matakuliah/%d' % big, status=404)
+        self.testapp.get('/api/matakuliah/%d/mahasiswa' % big, status=404)
+        self.testapp.get('/api/mahasiswa/%d/matakuliah' % big, status=404)
+
+    def test_enrolment_lookups(self):
+        res = self.testapp.get('/api/mahasiswa/1/matakuliah',
+                               params={'limit': '2'}).json
+        self.assertEqual([c['kode'] for c in res['data']], ['IF1', 'IF3'])
+        self.assertEqual(res['next_after'], 3)
+        res = self.testapp.get('/api/matakuliah/3/mahasiswa').json
+        self.assertEqual(res['data'], [{'mahasiswa_id': 1}, {'mahasiswa_id': 2}])
+
+    def test_enrolment_lookups_are_index_only(self):
+        from .views.matakuliah import courses_of_student, students_of_course
+        with self.engine.connect() as conn:
+            for stmt in (courses_of_student(1, after=0),
+                         students_of_course(3, after=0)):
+                sql = stmt.compile(self.engine,
+                                   compile_kwargs={'literal_binds': True})
+                plan = ' '.join(row[-1] for row in conn.exec_driver_sql(
+                    'EXPLAIN QUERY PLAN %s' % sql))
+                self.assertIn('USING COVERING INDEX', plan)
+                self.assertNotIn('SCAN', plan)
+
+    def query_count(self, res):
+        import re
+        return int(re.search(r'desc="(\d+) queries"',
+                             res.headers['Server-Timing']).group(1))
+
+    def test_include_enrolments(self):
+        res = self.testapp.get('/api/matakuliah',
+                               params={'include': 'enrolments'}).json
+        self.assertEqual([c['enrolments'] for c in res['data']],
+                         [[1], [], [1, 2], [1], []])
+        res = self.testapp.get('/api/matakuliah/3',
+                               params={'include': 'enrolments'}).json
+        self.assertEqual(res['data']['enrolments'], [1, 2])
+        res = self.testapp.get('/api/mahasiswa/1/matakuliah',
+                               params={'include': 'enrolments'}).json
+        self.assertEqual([(c['kode'], c['enrolments']) for c in res['data']],
+                         [('IF1', [1]), ('IF3', [1, 2]), ('IF4', [1])])
+        self.testapp.get('/api/matakuliah', params={'include': 'dosen'},
+                         status=400)
+
+    def test_include_statement_count_is_fixed(self):
+        # one query for the courses plus one selectin query for enrolments
+        for path in ('/api/matakuliah', '/api/mahasiswa/1/matakuliah'):
+            counts = set()
+            for limit in ('1', '2', '5', '50'):
+                res = self.testapp.get(path, params={
+                    'include': 'enrolments', 'limit': limit})
+                counts.add(self.query_count(res))
+            self.assertEqual(counts, {2})
+        res = self.testapp.get('/api/matakuliah/3',
+                               params={'include': 'enrolments'})
+        self.assertEqual(self.query_count(res), 1)
@@ -0,0 +1,6 @@
+def includeme(config):
+    """Register views explicitly; venusian scanning is slower at start-up."""
+    config.include('.default')
+    config.include('.matakuliah')
+    config.include('.metrics')
+    config.include('.notfound')
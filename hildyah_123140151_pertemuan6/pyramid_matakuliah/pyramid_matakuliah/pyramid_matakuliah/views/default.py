@@ -1,12 +1,10 @@
 from pyramid.response import Response
-from pyramid.view import view_config
 
 from sqlalchemy.exc import DBAPIError
 
 from .. import models
 
 
-@view_config(route_name='home', renderer='../templates/mytemplate.jinja2')
 def my_view(request):
     try:
         query = request.dbsession.query(models.MyModel)
@@ -30,3 +28,8 @@ might be caused by one of the following things:
 After you fix the problem, please restart the Pyramid application to
 try it again.
 """
+
+
+def includeme(config):
+    config.add_view(my_view, route_name='home',
+                    renderer='../templates/mytemplate.jinja2')
@@ -0,0 +1,226 @@
+from pyramid.response import Response
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from .. import models
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+# bounds of an Integer column (int4 in PostgreSQL)
+MIN_INT = -2 ** 31
+MAX_INT = 2 ** 31 - 1
+
+# relationships that can be expanded with ``include=``
+INCLUDES = ('enrolments',)
+
+COURSE_COLUMNS = (
+    models.MataKuliah.id,
+    models.MataKuliah.kode,
+    models.MataKuliah.nama,
+    models.MataKuliah.sks,
+    models.MataKuliah.semester,
+)
+
+
+class BadParam(ValueError):
+    pass
+
+
+def _parse_id(value):
+    """Id from the matchdict; ``None`` if not a number or out of range."""
+    try:
+        id_ = int(value)
+    except (TypeError, ValueError):
+        return None
+    return id_ if 1 <= id_ <= MAX_INT else None
+
+
+def _int_param(request, name, default=None):
+    value = request.params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadParam('%s must be an integer' % name)
+    # compared with Integer columns; larger values overflow in the driver
+    if not MIN_INT <= value <= MAX_INT:
+        raise BadParam('%s is out of range' % name)
+    return value
+
+
+def _page_params(request):
+    """Return ``(after, limit)`` for keyset pagination."""
+    after = _int_param(request, 'after')
+    limit = _int_param(request, 'limit', DEFAULT_LIMIT)
+    if limit < 1:
+        raise BadParam('limit must be at least 1')
+    return after, min(limit, MAX_LIMIT)
+
+
+def _include_param(request):
+    value = request.params.get('include')
+    if not value:
+        return ()
+    include = tuple(v.strip() for v in value.split(',') if v.strip())
+    unknown = set(include) - set(INCLUDES)
+    if unknown:
+        raise BadParam('unknown include: %s' % ', '.join(sorted(unknown)))
+    return include
+
+
+def loader_options(include, single=False):
+    """
+    Eager-loading options for the relationships named in ``include``.
+
+    A page of courses loads each collection with ``selectinload``: one
+    ``SELECT ... WHERE matakuliah_id IN (...)`` per relationship whatever
+    the page size (SQLAlchemy batches 500 keys per IN), and the LIMIT
+    stays on the course query. A single course uses ``joinedload`` so the
+    whole response is one statement.
+
+    """
+    strategy = joinedload if single else selectinload
+    return [strategy(getattr(models.MataKuliah, name)) for name in include]
+
+
+def _page(items, limit, key):
+    """
+    Build a page from ``limit + 1`` dicts; ``next_after`` is the cursor for
+    the next page or ``None`` on the last one.
+
+    """
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        'status': 'success',
+        'data': items,
+        'next_after': items[-1][key] if has_more else None,
+    }
+
+
+def _fetch_courses(request, stmt, include, limit):
+    """
+    Run a course query as plain rows, or as ORM objects with their
+    ``include`` relationships eagerly loaded.
+
+    """
+    stmt = stmt.limit(limit + 1)
+    if not include:
+        return [row._asdict() for row in request.dbsession.execute(stmt)]
+    stmt = stmt.with_only_columns(models.MataKuliah).options(
+        *loader_options(include))
+    return [course.to_dict(include)
+            for course in request.dbsession.scalars(stmt)]
+
+
+def _bad_request(exc):
+    return Response(json_body={'error': str(exc)}, status=400)
+
+
+def courses_of_student(mahasiswa_id, after=None):
+    """
+    Courses a mahasiswa is enrolled in, ordered by course id.
+
+    Reads ``enrolment`` through its primary key (mahasiswa_id,
+    matakuliah_id) only, then each course by primary key.
+
+    """
+    stmt = (
+        select(*COURSE_COLUMNS)
+        .join(models.Enrolment,
+              models.Enrolment.matakuliah_id == models.MataKuliah.id)
+        .where(models.Enrolment.mahasiswa_id == mahasiswa_id)
+        .order_by(models.Enrolment.matakuliah_id)
+    )
+    if after is not None:
+        stmt = stmt.where(models.Enrolment.matakuliah_id > after)
+    return stmt
+
+
+def students_of_course(matakuliah_id, after=None):
+    """Mahasiswa ids enrolled in a course, served by the reverse index."""
+    stmt = (
+        select(models.Enrolment.mahasiswa_id)
+        .where(models.Enrolment.matakuliah_id == matakuliah_id)
+        .order_by(models.Enrolment.mahasiswa_id)
+    )
+    if after is not None:
+        stmt = stmt.where(models.Enrolment.mahasiswa_id > after)
+    return stmt
+
+
+def matakuliah_list(request):
+    try:
+        after, limit = _page_params(request)
+        semester = _int_param(request, 'semester')
+        include = _include_param(request)
+    except BadParam as e:
+        return _bad_request(e)
+
+    stmt = select(*COURSE_COLUMNS).order_by(models.MataKuliah.id)
+    if after is not None:
+        stmt = stmt.where(models.MataKuliah.id > after)
+    kode = request.params.get('kode')
+    if kode:
+        stmt = stmt.where(models.MataKuliah.kode == kode)
+    if semester is not None:
+        stmt = stmt.where(models.MataKuliah.semester == semester)
+    return _page(_fetch_courses(request, stmt, include, limit), limit, 'id')
+
+
+def matakuliah_detail(request):
+    matakuliah_id = _parse_id(request.matchdict['id'])
+    if matakuliah_id is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+    try:
+        include = _include_param(request)
+    except BadParam as e:
+        return _bad_request(e)
+    course = request.dbsession.scalars(
+        select(models.MataKuliah)
+        .where(models.MataKuliah.id == matakuliah_id)
+        .options(*loader_options(include, single=True))).unique().first()
+    if course is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+    return {'status': 'success', 'data': course.to_dict(include)}
+
+
+def matakuliah_mahasiswa(request):
+    matakuliah_id = _parse_id(request.matchdict['id'])
+    if matakuliah_id is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+    try:
+        after, limit = _page_params(request)
+    except BadParam as e:
+        return _bad_request(e)
+    rows = request.dbsession.execute(
+        students_of_course(matakuliah_id, after).limit(limit + 1))
+    return _page([row._asdict() for row in rows], limit, 'mahasiswa_id')
+
+
+def mahasiswa_matakuliah(request):
+    mahasiswa_id = _parse_id(request.matchdict['mahasiswa_id'])
+    if mahasiswa_id is None:
+        return Response(json_body={'error': 'Not found'}, status=404)
+    try:
+        after, limit = _page_params(request)
+        include = _include_param(request)
+    except BadParam as e:
+        return _bad_request(e)
+    courses = _fetch_courses(
+        request, courses_of_student(mahasiswa_id, after), include, limit)
+    return _page(courses, limit, 'id')
+
+
+def includeme(config):
+    config.add_view(matakuliah_list, route_name='matakuliah_list',
+                    renderer='json')
+    config.add_view(matakuliah_detail, route_name='matakuliah_detail',
+                    renderer='json')
+    config.add_view(matakuliah_mahasiswa, route_name='matakuliah_mahasiswa',
+                    renderer='json')
+    config.add_view(mahasiswa_matakuliah, route_name='mahasiswa_matakuliah',
+                    renderer='json')
@@ -0,0 +1,21 @@
+from pyramid_mahasiswa.route_metrics import (
+    pool_gauges,
+    prometheus_response,
+    wants_prometheus,
+)
+
+
+def metrics_view(request):
+    routes = request.registry.get('route_metrics')
+    pool = request.registry['pool_metrics'].snapshot()
+    # Prometheus scrapers: ?format=prometheus or Accept: text/plain
+    if routes is not None and wants_prometheus(request):
+        return prometheus_response(routes, pool_gauges({}, pool))
+    payload = {'pool': pool}
+    if routes is not None:
+        payload['routes'] = routes.snapshot()
+    return payload
+
+
+def includeme(config):
+    config.add_view(metrics_view, route_name='metrics', renderer='json')
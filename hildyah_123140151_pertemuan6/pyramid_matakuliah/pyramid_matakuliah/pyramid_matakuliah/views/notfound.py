@@ -1,7 +1,8 @@
-from pyramid.view import notfound_view_config
-
-
-@notfound_view_config(renderer='../templates/404.jinja2')
 def notfound_view(request):
     request.response.status = 404
     return {}
+
+
+def includeme(config):
+    config.add_notfound_view(notfound_view,
+                             renderer='../templates/404.jinja2')
@@ -14,6 +14,8 @@ requires = [
     'pyramid >= 1.9',
     'pyramid_debugtoolbar',
     'pyramid_jinja2',
+    # pool metrics, SQL profiler and route metrics
+    'pyramid_mahasiswa',
     'pyramid_retry',
     'pyramid_tm',
     'SQLAlchemy',